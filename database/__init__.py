@@ -4,20 +4,44 @@ Módulo de banco de dados para simulações F1 2025.
 
 from .connection import (
     get_connection,
+    get_shared_connection,
+    get_cursor,
+    session_cursor,
+    read_lock,
+    close_shared_connection,
+    write_connection,
     table_exists,
     table_count,
     is_populated,
+    hash_parameters,
+    create_simulation_runs_table,
+    record_simulation_run,
+    clear_simulation_run,
+    get_simulation_run,
     create_cenarios_empate_table,
     DB_PATH,
-    DATA_DIR
+    DATA_DIR,
+    TABELA_EXECUCOES
 )
 
 __all__ = [
     'get_connection',
+    'get_shared_connection',
+    'get_cursor',
+    'session_cursor',
+    'read_lock',
+    'close_shared_connection',
+    'write_connection',
     'table_exists',
     'table_count',
     'is_populated',
+    'hash_parameters',
+    'create_simulation_runs_table',
+    'record_simulation_run',
+    'clear_simulation_run',
+    'get_simulation_run',
     'create_cenarios_empate_table',
     'DB_PATH',
-    'DATA_DIR'
+    'DATA_DIR',
+    'TABELA_EXECUCOES'
 ]
@@ -2,8 +2,26 @@
 Módulo de conexão com banco de dados DuckDB.
 
 Gerencia conexão, criação de tabelas e verificação de estado.
+
+O dashboard só lê: cada processo abre uma única conexão somente leitura
+(get_shared_connection) e cada sessão usa seu próprio cursor dela
+(session_cursor). Vários processos podem abrir o mesmo arquivo em modo
+somente leitura ao mesmo tempo; a escrita fica restrita ao build
+(write_connection ou get_connection fora do dashboard).
+
+Dentro de um processo, as consultas rodam sob read_lock e o build sob
+write_connection: a escrita espera as consultas em andamento terminarem
+antes de fechar a conexão compartilhada, e novas consultas esperam a
+escrita terminar.
 """
 
+import hashlib
+import json
+import threading
+from collections.abc import MutableMapping
+from contextlib import AbstractContextManager, contextmanager
+from typing import Iterator
+
 import duckdb
 from pathlib import Path
 
@@ -11,18 +29,218 @@ from pathlib import Path
 DATA_DIR = Path(__file__).parent.parent / 'data'
 DB_PATH = DATA_DIR / 'f1_simulations.duckdb'
 
+# Metadados das simulações: uma linha por tabela construída
+TABELA_EXECUCOES = 'simulation_runs'
+
+# Conexão somente leitura compartilhada pelo processo (ver get_shared_connection)
+_compartilhada: duckdb.DuckDBPyConnection | None = None
+
+# Incrementada a cada fechamento da conexão compartilhada: cursores de
+# gerações anteriores estão fechados (ver session_cursor)
+_geracao = 0
+
+# Protege a conexão compartilhada; fica com a escrita durante write_connection
+_trava = threading.RLock()
+
+
+class _TravaLeituraEscrita:
+    """
+    Várias leituras ao mesmo tempo ou uma escrita.
+
+    Uma escrita pendente barra novas leituras, para o build não esperar
+    indefinidamente, e espera as leituras em andamento. Leituras aninhadas
+    na mesma thread e leituras da thread que escreve não esperam.
+    """
+
+    def __init__(self) -> None:
+        self._condicao = threading.Condition()
+        self._leitores = 0
+        self._escritas_pendentes = 0
+        self._escritor: int | None = None
+        self._local = threading.local()
+
+    @contextmanager
+    def leitura(self) -> Iterator[None]:
+        """Mantém a leitura enquanto o bloco roda."""
+        profundidade = getattr(self._local, 'leituras', 0)
+        if profundidade or self._escritor == threading.get_ident():
+            self._local.leituras = profundidade + 1
+            try:
+                yield
+            finally:
+                self._local.leituras = profundidade
+            return
 
-def get_connection() -> duckdb.DuckDBPyConnection:
+        with self._condicao:
+            self._condicao.wait_for(
+                lambda: self._escritor is None and not self._escritas_pendentes
+            )
+            self._leitores += 1
+        self._local.leituras = 1
+        try:
+            yield
+        finally:
+            self._local.leituras = 0
+            with self._condicao:
+                self._leitores -= 1
+                self._condicao.notify_all()
+
+    @contextmanager
+    def escrita(self) -> Iterator[None]:
+        """Mantém a escrita exclusiva enquanto o bloco roda."""
+        thread = threading.get_ident()
+        if self._escritor == thread:
+            yield
+            return
+        if getattr(self._local, 'leituras', 0):
+            raise RuntimeError("Escrita pedida dentro de uma leitura da mesma thread")
+
+        with self._condicao:
+            self._escritas_pendentes += 1
+            try:
+                self._condicao.wait_for(lambda: self._escritor is None and not self._leitores)
+            finally:
+                self._escritas_pendentes -= 1
+            self._escritor = thread
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._escritor = None
+                self._condicao.notify_all()
+
+
+# Consultas (read_lock) x build (write_connection) dentro do processo
+_leitura_escrita = _TravaLeituraEscrita()
+
+
+def get_connection(read_only: bool = False) -> duckdb.DuckDBPyConnection:
     """
     Retorna conexão com o banco de dados DuckDB.
 
     Cria o diretório data/ se não existir.
 
+    Args:
+        read_only: Abre em modo somente leitura (cria o arquivo vazio se
+            ainda não existir, pois o DuckDB não abre arquivo inexistente
+            nesse modo)
+
     Returns:
         Conexão DuckDB persistente.
     """
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    return duckdb.connect(str(DB_PATH))
+    if read_only and not DB_PATH.exists():
+        duckdb.connect(str(DB_PATH)).close()
+    return duckdb.connect(str(DB_PATH), read_only=read_only)
+
+
+def get_shared_connection() -> duckdb.DuckDBPyConnection:
+    """
+    Retorna a conexão somente leitura compartilhada pelo processo.
+
+    Aberta na primeira chamada e reaberta após write_connection. Não use
+    a conexão diretamente em várias threads: peça um cursor (get_cursor
+    ou session_cursor).
+
+    Returns:
+        Conexão DuckDB somente leitura.
+    """
+    global _compartilhada
+    with _trava:
+        if _compartilhada is None:
+            _compartilhada = get_connection(read_only=True)
+        return _compartilhada
+
+
+def get_cursor() -> duckdb.DuckDBPyConnection:
+    """
+    Retorna um novo cursor da conexão compartilhada.
+
+    Cursores consultam em paralelo sobre o mesmo banco aberto; cada um deve
+    ser usado por uma thread de cada vez.
+
+    Returns:
+        Cursor DuckDB somente leitura.
+    """
+    return get_shared_connection().cursor()
+
+
+def session_cursor(
+    estado: MutableMapping,
+    chave: str = 'cursor_duckdb',
+) -> duckdb.DuckDBPyConnection:
+    """
+    Retorna o cursor de uma sessão, guardado em estado.
+
+    O cursor é guardado com a geração da conexão compartilhada. Se a
+    conexão foi fechada desde então (ex: write_connection em um build pelo
+    mesmo processo), o cursor guardado está fechado e é recriado antes de
+    ser devolvido. Durante uma escrita, espera o fim dela.
+
+    Args:
+        estado: Estado da sessão (ex: st.session_state)
+        chave: Chave do cursor em estado
+
+    Returns:
+        Cursor DuckDB somente leitura da sessão.
+    """
+    with _trava:
+        cursor, geracao = estado.get(chave, (None, None))
+        if cursor is None or geracao != _geracao:
+            cursor = get_shared_connection().cursor()
+            estado[chave] = (cursor, _geracao)
+        return cursor
+
+
+def read_lock() -> AbstractContextManager[None]:
+    """
+    Mantém uma leitura enquanto as consultas do bloco rodam.
+
+    Envolva a consulta e a leitura do resultado: write_connection espera
+    o bloco terminar antes de fechar a conexão compartilhada. Também serve
+    de decorador (@read_lock()).
+
+    Returns:
+        Gerenciador de contexto da leitura.
+    """
+    return _leitura_escrita.leitura()
+
+
+def close_shared_connection() -> None:
+    """Fecha a conexão compartilhada; a próxima leitura a reabre."""
+    global _compartilhada, _geracao
+    with _trava:
+        if _compartilhada is not None:
+            _compartilhada.close()
+            _compartilhada = None
+            _geracao += 1
+
+
+@contextmanager
+def write_connection() -> Iterator[duckdb.DuckDBPyConnection]:
+    """
+    Conexão de escrita para o build dentro do processo do dashboard.
+
+    O DuckDB não abre o mesmo arquivo com e sem read_only no mesmo
+    processo, então a conexão compartilhada precisa ser fechada. Antes
+    disso a escrita espera as consultas em andamento (read_lock)
+    terminarem; consultas novas e cursores novos esperam até o fim da
+    escrita.
+
+    Yields:
+        Conexão DuckDB de leitura e escrita (fechada ao sair).
+
+    Raises:
+        duckdb.IOException: Se outro processo mantém o arquivo aberto (o
+            DuckDB trava o arquivo inteiro para a escrita)
+    """
+    with _leitura_escrita.escrita(), _trava:
+        close_shared_connection()
+        conn = get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
 
 
 def table_exists(conn: duckdb.DuckDBPyConnection, table_name: str) -> bool:
@@ -60,18 +278,133 @@ def table_count(conn: duckdb.DuckDBPyConnection, table_name: str) -> int:
     return result[0]
 
 
-def is_populated(conn: duckdb.DuckDBPyConnection, table_name: str) -> bool:
+def is_populated(
+    conn: duckdb.DuckDBPyConnection,
+    table_name: str,
+    params_hash: str | None = None,
+    engine_version: int | None = None,
+) -> bool:
     """
-    Verifica se uma tabela existe e contém dados.
+    Verifica se uma tabela foi construída e está atualizada.
+
+    Consulta só a linha da tabela em simulation_runs (sem COUNT(*) na
+    tabela simulada). Com params_hash/engine_version, uma execução com
+    parâmetros ou versão diferentes conta como desatualizada.
 
     Args:
         conn: Conexão DuckDB
         table_name: Nome da tabela
+        params_hash: Hash dos parâmetros atuais (ver hash_parameters)
+        engine_version: Versão atual do simulador
+
+    Returns:
+        True se a tabela tem registros e corresponde aos parâmetros, False
+        caso contrário.
+    """
+    run = get_simulation_run(conn, table_name)
+    return (
+        run is not None
+        and run['num_linhas'] > 0
+        and params_hash in (None, run['hash_parametros'])
+        and engine_version in (None, run['versao_motor'])
+    )
+
+
+def hash_parameters(parametros: dict) -> str:
+    """
+    Calcula o hash dos parâmetros de uma simulação.
+
+    Args:
+        parametros: Dicionário serializável em JSON (chaves ordenadas)
 
     Returns:
-        True se a tabela existe e tem registros, False caso contrário.
+        Hash SHA-256 hexadecimal.
+    """
+    return hashlib.sha256(json.dumps(parametros, sort_keys=True).encode()).hexdigest()
+
+
+def create_simulation_runs_table(conn: duckdb.DuckDBPyConnection) -> None:
     """
-    return table_exists(conn, table_name) and table_count(conn, table_name) > 0
+    Cria a tabela simulation_runs se não existir.
+
+    Uma linha por tabela simulada, substituída a cada build.
+
+    Args:
+        conn: Conexão DuckDB
+    """
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABELA_EXECUCOES} (
+            tabela VARCHAR PRIMARY KEY,
+            hash_parametros VARCHAR NOT NULL,
+            versao_motor INTEGER NOT NULL,
+            num_linhas BIGINT NOT NULL,
+            construido_em TIMESTAMP NOT NULL,
+            duracao_segundos DOUBLE NOT NULL
+        )
+    """)
+
+
+def record_simulation_run(
+    conn: duckdb.DuckDBPyConnection,
+    table_name: str,
+    params_hash: str,
+    engine_version: int,
+    row_count: int,
+    duration: float,
+) -> None:
+    """
+    Registra (ou substitui) a execução que construiu uma tabela.
+
+    Args:
+        conn: Conexão DuckDB de escrita
+        table_name: Nome da tabela construída
+        params_hash: Hash dos parâmetros (ver hash_parameters)
+        engine_version: Versão do simulador
+        row_count: Registros gravados
+        duration: Duração do build em segundos
+    """
+    create_simulation_runs_table(conn)
+    conn.execute(
+        f"INSERT OR REPLACE INTO {TABELA_EXECUCOES} VALUES (?, ?, ?, ?, now(), ?)",
+        [table_name, params_hash, engine_version, row_count, duration]
+    )
+
+
+def clear_simulation_run(conn: duckdb.DuckDBPyConnection, table_name: str) -> None:
+    """
+    Remove o registro de uma tabela (início de um build).
+
+    Args:
+        conn: Conexão DuckDB de escrita
+        table_name: Nome da tabela
+    """
+    create_simulation_runs_table(conn)
+    conn.execute(f"DELETE FROM {TABELA_EXECUCOES} WHERE tabela = ?", [table_name])
+
+
+def get_simulation_run(conn: duckdb.DuckDBPyConnection, table_name: str) -> dict | None:
+    """
+    Retorna a execução registrada de uma tabela.
+
+    Args:
+        conn: Conexão DuckDB (pode ser somente leitura)
+        table_name: Nome da tabela
+
+    Returns:
+        Dicionário com as colunas de simulation_runs, ou None se a tabela
+        nunca foi construída (ou simulation_runs ainda não existe).
+    """
+    try:
+        cursor = conn.execute(
+            f"SELECT * FROM {TABELA_EXECUCOES} WHERE tabela = ?", [table_name]
+        )
+    except duckdb.CatalogException:
+        return None
+
+    linha = cursor.fetchone()
+    if linha is None:
+        return None
+    return dict(zip([c[0] for c in cursor.description], linha))
 
 
 def create_cenarios_empate_table(conn: duckdb.DuckDBPyConnection) -> None:
@@ -35,7 +35,11 @@ st.set_page_config(
 
 def main():
     # Garantir que o banco está populado
-    ensure_populated()
+    try:
+        ensure_populated()
+    except RuntimeError as erro:
+        st.error(str(erro))
+        st.stop()
 
     # Header
     st.title("🏁 Cenários de Empate para Última Etapa")
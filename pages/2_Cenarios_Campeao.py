@@ -11,9 +11,12 @@ from components.driver_card import cards_pilotos
 from simulations.cenarios_campeao.filters import (
     carregar_estatisticas_resumo,
     carregar_cenarios_vitoria,
+    carregar_exemplos_cenario,
     carregar_opcoes_filtros,
     metricas_resumo,
     cards_chances,
+    carregar_chances_estratificadas,
+    carregar_condicoes_titulo,
     label_piloto,
     label_metodo,
     label_posicao,
@@ -24,6 +27,7 @@ from simulations.cenarios_campeao.charts import (
     grafico_sunburst_metodo,
     grafico_metodos_decisao,
     grafico_boxplot_pontos,
+    grafico_histograma_pontos,
     grafico_comparativo_ranges,
     grafico_detalhamento_piloto,
     grafico_delta_pontos_necessarios,
@@ -36,8 +40,12 @@ from simulations.cenarios_campeao.simulator import (
     TERCEIROS_ATUAIS,
     FORA_PONTOS,
 )
+from simulations.cenarios_campeao.exemplos import TAMANHO_PAGINA
 from config.settings import PONTOS_SPRINT, PONTOS_CORRIDA
 
+# Condições de título listadas por piloto (as demais são contadas)
+CONDICOES_EXIBIDAS = 10
+
 
 # =============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -216,6 +224,47 @@ def tab_como_ganhar():
         with c3:
             st.metric("Total de Combinações Vitoriosas", f"{stats_piloto['total_comb']:,}".replace(',', '.'))
 
+        # Resultados concretos por trás de um cenário
+        with st.expander("🔎 Ver resultados de um cenário"):
+            cenario = st.number_input(
+                "Cenário (posição na lista, do mais frequente):",
+                min_value=1, max_value=len(df_cenarios), value=1, key='cenario_exemplo'
+            )
+            linha = df_cenarios.iloc[cenario - 1]
+            total = int(linha['num_combinacoes'])
+            paginas = (total - 1) // TAMANHO_PAGINA + 1
+
+            pagina = st.number_input(
+                f"Página (de {paginas:,}):".replace(',', '.'),
+                min_value=1, max_value=paginas, value=1, key='pagina_exemplo'
+            )
+            st.caption(f"{total:,} combinações produzem este cenário".replace(',', '.'))
+            st.dataframe(
+                carregar_exemplos_cenario(linha, pagina - 1),
+                hide_index=True, use_container_width=True
+            )
+
+    # Condições mínimas que garantem o título
+    st.subheader("✅ O Que Garante o Título")
+    condicoes = carregar_condicoes_titulo()[piloto_selecionado]
+
+    if not condicoes:
+        st.info("Nenhuma combinação de resultados garante o título.")
+    else:
+        proprias = [c for c in condicoes if not c.limites_rivais]
+        if proprias:
+            st.success(f"Depende só de si: {len(proprias)} condições suficientes.")
+        else:
+            st.warning("Não depende só de si: as condições limitam os pontos dos rivais.")
+
+        exibidas = condicoes[:CONDICOES_EXIBIDAS]
+        st.markdown('\n'.join(f"- {c.descrever()}" for c in exibidas))
+
+        # Variações agrupadas por margem e condições além das exibidas
+        omitidas = sum(c.variacoes + 1 for c in condicoes) - len(exibidas)
+        if omitidas:
+            st.caption(f"{omitidas:,} condições omitidas.".replace(',', '.'))
+
 
 def tab_simulador():
     """Tab: Simulador E Se?"""
@@ -402,6 +451,7 @@ def tab_comparativo():
     # Boxplot
     st.subheader("Distribuição de Pontos Finais")
     st.plotly_chart(grafico_boxplot_pontos(), use_container_width=True)
+    st.plotly_chart(grafico_histograma_pontos(), use_container_width=True)
 
     st.markdown("---")
 
@@ -487,6 +537,16 @@ def main():
     st.subheader("📊 Chances de Título")
     cards_chances()
 
+    with st.expander("🎲 Com o grid completo (modelo Plackett–Luce)"):
+        estimativa = carregar_chances_estratificadas()
+        amostras = f"{estimativa.amostras:,}".replace(',', '.')
+        st.caption(
+            f"Todos os 20 pilotos disputam posições, com forças estimadas pelo desempenho "
+            f"recente. Amostragem estratificada: {amostras} amostras em "
+            f"{estimativa.estratos} estratos; ± é o intervalo de 95%."
+        )
+        cards_chances(estimativa)
+
     st.markdown("---")
 
     # Tabs
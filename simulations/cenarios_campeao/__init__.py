@@ -8,19 +8,58 @@ para determinar cenários de campeonato entre Norris, Piastri e Verstappen.
 from .simulator import (
     executar,
     simular_cenarios,
+    simular_deltas,
+    reavaliar_campeao,
+    HistogramaDeltas,
+    ReducaoPontos,
+    Campeonato,
+    Evento,
+    CAMPEONATO,
     gerar_estatisticas,
     imprimir_estatisticas,
     criar_tabela,
     PONTOS_ATUAIS,
     VITORIAS_ATUAIS,
+    MOTORES,
+    MOTOR_AUTOMATICO,
+    escolher_motor,
+    EVENTOS,
+    METODOS,
 )
+from .condicional import simular_condicional
+from .monte_carlo import simular_monte_carlo, executar_monte_carlo
+from .estratificado import estimar_chances, comparar_forcas
+from .condicoes import condicoes_titulo, resolver_piloto
+from .agregado import simular_totais
+from .exemplos import IndiceCombinacoes
 
 __all__ = [
     'executar',
     'simular_cenarios',
+    'simular_deltas',
+    'reavaliar_campeao',
+    'HistogramaDeltas',
+    'ReducaoPontos',
+    'Campeonato',
+    'Evento',
+    'CAMPEONATO',
     'gerar_estatisticas',
     'imprimir_estatisticas',
     'criar_tabela',
     'PONTOS_ATUAIS',
     'VITORIAS_ATUAIS',
+    'MOTORES',
+    'MOTOR_AUTOMATICO',
+    'escolher_motor',
+    'EVENTOS',
+    'METODOS',
+    'simular_condicional',
+    'simular_monte_carlo',
+    'executar_monte_carlo',
+    'estimar_chances',
+    'comparar_forcas',
+    'condicoes_titulo',
+    'resolver_piloto',
+    'simular_totais',
+    'IndiceCombinacoes',
 ]
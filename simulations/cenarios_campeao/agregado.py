@@ -0,0 +1,243 @@
+"""
+Totais por campeão e método sem estados finais para Cenários de Campeão F1 2025.
+
+A maior parte do dashboard só precisa das chances por campeão e por método.
+Aqui o último evento não é convoluído: cada estado do prefixo (os eventos
+anteriores, ex: Sprint e Race Qatar) é combinado com os deltas do último
+evento e o resultado vai direto para os acumuladores (pilotos x métodos),
+sem materializar estados_finais nem escrever a tabela.
+
+Como os pontos decidem quase todos os títulos, estados do prefixo e deltas
+do último evento são agrupados pelos pontos. Cada par de grupos cujo
+máximo de pontos finais é único define o campeão por 'pontos' somando só
+os pesos dos grupos; apenas os pares com empate no topo são expandidos
+estado a estado para o desempate completo (determinar_campeoes).
+
+A memória não é constante: o histograma do prefixo fica inteiro em memória
+(189.175 estados no problema padrão), junto com os índices dos grupos e dos
+pares empatados. O que o último evento acrescenta é limitado pelo lote
+(tamanho_lote linhas expandidas por vez), não pelo número de estados finais.
+"""
+
+from dataclasses import fields, replace
+
+import numpy as np
+
+from simulations.cenarios_campeao.codec import CodecEstado
+from simulations.cenarios_campeao.ponderado import Probabilidades
+from simulations.cenarios_campeao.simulator import (
+    CAMPEONATO,
+    LOTE_DECODIFICACAO,
+    METODOS,
+    Campeonato,
+    Delta,
+    _convoluir_numpy,
+    _gerar_deltas_eventos,
+    _gerar_pesos_eventos,
+    determinar_campeoes,
+    resumo_totais,
+)
+
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Linhas (pares de grupos ou estados expandidos) por lote do último evento.
+# No problema padrão: ~65 MB de pico contra ~210 MB com LOTE_DECODIFICACAO,
+# no mesmo tempo
+LOTE_TOTAIS = 100_000
+
+
+# =============================================================================
+# AGRUPAMENTO POR PONTOS
+# =============================================================================
+
+def agrupar_pontos(pontos: np.ndarray, pesos: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Agrupa linhas pelo vetor de pontos dos pilotos.
+
+    Args:
+        pontos: Array (n, pilotos) de pontos
+        pesos: Array (n,) de combinações ou probabilidades de cada linha
+
+    Returns:
+        (grupos, ordem, inicios, tamanhos, somas): vetores de pontos únicos
+        (g, pilotos), permutação que deixa as linhas de cada grupo
+        contíguas, início e tamanho de cada grupo nessa ordem e soma dos
+        pesos de cada grupo
+    """
+    grupos, inverso = np.unique(pontos, axis=0, return_inverse=True)
+    inverso = inverso.ravel()
+    ordem = np.argsort(inverso, kind='stable')
+    tamanhos = np.bincount(inverso, minlength=len(grupos))
+    inicios = np.r_[0, np.cumsum(tamanhos)[:-1]]
+    somas = np.add.reduceat(pesos[ordem], inicios)
+    return grupos, ordem, inicios, tamanhos, somas
+
+
+def _pontos_prefixo(codec: CodecEstado, chaves: np.ndarray, num_pilotos: int) -> np.ndarray:
+    """Pontos (n, pilotos) dos estados do prefixo, decodificados em lotes."""
+    num_campos = len(fields(Delta))
+    pontos = np.empty((len(chaves), num_pilotos), dtype=np.int64)
+    for inicio in range(0, len(chaves), LOTE_DECODIFICACAO):
+        linhas = codec.decodificar(chaves[inicio:inicio + LOTE_DECODIFICACAO])
+        pontos[inicio:inicio + len(linhas)] = linhas[:, ::num_campos]
+    return pontos
+
+
+def _pares_em_lotes(tamanhos: np.ndarray, limite: int):
+    """Fatias de pares consecutivos com até limite linhas expandidas (mín. 1 par)."""
+    acumulado = np.cumsum(tamanhos)
+    inicio = 0
+    while inicio < len(tamanhos):
+        base = acumulado[inicio - 1] if inicio else 0
+        fim = max(inicio + 1, int(np.searchsorted(acumulado, base + limite, side='right')))
+        yield slice(inicio, fim)
+        inicio = fim
+
+
+# =============================================================================
+# ACUMULAÇÃO DO ÚLTIMO EVENTO
+# =============================================================================
+
+def totais_ultimo_evento(
+    codec: CodecEstado,
+    chaves: np.ndarray,
+    contagens: np.ndarray,
+    deltas_ultimo: np.ndarray,
+    pesos_ultimo: np.ndarray,
+    atual: np.ndarray,
+    pilotos: tuple[str, ...],
+    tamanho_lote: int = LOTE_TOTAIS,
+) -> np.ndarray:
+    """
+    Soma por (campeão, método) de todos os pares prefixo x último evento.
+
+    Args:
+        codec: Codec dos estados do prefixo
+        chaves: Estados do prefixo codificados por codec
+        contagens: Combinações (ou probabilidade) de cada estado do prefixo
+        deltas_ultimo: Array (m, pilotos * 4) de deltas do último evento
+        pesos_ultimo: Array (m,) de pesos dos deltas do último evento
+        atual: Classificação atual (pilotos, 4)
+        pilotos: Nomes dos pilotos, na ordem das colunas
+        tamanho_lote: Pares de grupos ou estados expandidos por lote
+
+    Returns:
+        Array (pilotos, métodos) de combinações ou probabilidades
+    """
+    num_pilotos = len(pilotos)
+    num_campos = len(fields(Delta))
+    totais = np.zeros(num_pilotos * len(METODOS), dtype=contagens.dtype)
+
+    # Grupos de pontos do prefixo (com a classificação atual) e do último evento
+    pontos_prefixo = _pontos_prefixo(codec, chaves, num_pilotos) + atual[:, 0]
+    grupos_p, ordem_p, inicios_p, tamanhos_p, somas_p = agrupar_pontos(pontos_prefixo, contagens)
+    deltas_ultimo = deltas_ultimo.reshape(len(deltas_ultimo), num_pilotos, num_campos)
+    grupos_u, ordem_u, inicios_u, tamanhos_u, somas_u = agrupar_pontos(
+        deltas_ultimo[:, :, 0].astype(np.int64), pesos_ultimo
+    )
+
+    # Pares de grupos: máximo único de pontos decide por 'pontos'
+    empates_p, empates_u = [], []
+    passo = max(1, tamanho_lote // len(grupos_u))
+    for bloco in range(0, len(grupos_p), passo):
+        indices_p = np.arange(bloco, min(bloco + passo, len(grupos_p)))
+        finais = grupos_p[indices_p, None, :] + grupos_u[None, :, :]
+        topo = finais.max(axis=2, keepdims=True)
+        unico = (finais == topo).sum(axis=2) == 1
+
+        campeoes = finais.argmax(axis=2)
+        pesos = somas_p[indices_p, None] * somas_u[None, :]
+        np.add.at(totais, campeoes[unico] * len(METODOS), pesos[unico])
+
+        linhas, colunas = np.nonzero(~unico)
+        empates_p.append(indices_p[linhas])
+        empates_u.append(colunas)
+
+    # Pares com empate no topo: expansão estado a estado
+    empates_p = np.concatenate(empates_p)
+    empates_u = np.concatenate(empates_u)
+    expandidos = tamanhos_p[empates_p] * tamanhos_u[empates_u]
+
+    for fatia in _pares_em_lotes(expandidos, tamanho_lote):
+        par = np.repeat(np.arange(fatia.stop - fatia.start), expandidos[fatia])
+        deslocamento = np.arange(len(par)) - np.repeat(
+            np.cumsum(expandidos[fatia]) - expandidos[fatia], expandidos[fatia]
+        )
+        gp, gu = empates_p[fatia][par], empates_u[fatia][par]
+        linhas_p = ordem_p[inicios_p[gp] + deslocamento // tamanhos_u[gu]]
+        linhas_u = ordem_u[inicios_u[gu] + deslocamento % tamanhos_u[gu]]
+
+        finais = codec.decodificar(chaves[linhas_p]).reshape(-1, num_pilotos, num_campos) \
+            + deltas_ultimo[linhas_u] + atual
+        campeoes, metodos = determinar_campeoes(finais, pilotos)
+        np.add.at(totais, campeoes * len(METODOS) + metodos,
+                  contagens[linhas_p] * pesos_ultimo[linhas_u])
+
+    return totais.reshape(num_pilotos, len(METODOS))
+
+
+# =============================================================================
+# SIMULAÇÃO
+# =============================================================================
+
+def simular_totais(
+    campeonato: Campeonato = CAMPEONATO,
+    usar_cache: bool = True,
+    probabilidades: Probabilidades | None = None,
+    tamanho_lote: int = LOTE_TOTAIS,
+) -> dict:
+    """
+    Chances por campeão e método sem gerar a tabela de cenários.
+
+    Convolui os eventos do prefixo (com o cache de estágios, ver
+    simular_deltas) e acumula o último evento direto nos totais. O
+    histograma do prefixo fica inteiro em memória; os estados finais nunca
+    são materializados, e o último evento é processado em lotes de
+    tamanho_lote.
+
+    Args:
+        campeonato: Pilotos, eventos e classificação (padrão: CAMPEONATO)
+        usar_cache: Reaproveita estágios do prefixo salvos em disco (apenas
+            sem probabilidades)
+        probabilidades: Distribuições de posição para o modo ponderado
+            (ver simular_deltas); None conta combinações
+        tamanho_lote: Linhas por lote do último evento (ver LOTE_TOTAIS)
+
+    Returns:
+        Dicionário de reavaliar_campeao (total_combinacoes, por_campeao,
+        por_metodo, campeao_metodo)
+    """
+    deltas_eventos = _gerar_deltas_eventos(campeonato, 'numpy')
+    pilotos = campeonato.pilotos
+
+    if probabilidades is None:
+        pesos_eventos = None
+        pesos_ultimo = np.ones(len(deltas_eventos[-1]), dtype=np.int64)
+    else:
+        pesos_eventos = _gerar_pesos_eventos(campeonato, probabilidades)
+        pesos_ultimo = pesos_eventos[-1]
+        usar_cache = False
+
+    codec = CodecEstado.para_eventos(deltas_eventos)
+
+    print("\n[2/3] Convoluindo eventos do prefixo...")
+    if len(campeonato.eventos) > 1:
+        chaves, contagens = _convoluir_numpy(
+            replace(campeonato, eventos=campeonato.eventos[:-1]), deltas_eventos[:-1], codec,
+            usar_cache=usar_cache, pesos_eventos=pesos_eventos,
+        )
+    else:
+        # Um único evento: prefixo vazio, um estado sem deltas
+        chaves = codec.codificar(np.zeros((1, codec.num_colunas), dtype=np.int16))
+        contagens = np.ones(1, dtype=pesos_ultimo.dtype)
+
+    print(f"\n[3/3] Acumulando {campeonato.eventos[-1].nome} nos totais...")
+    print(f"  Estados do prefixo: {len(chaves):,} x {len(pesos_ultimo):,} resultados")
+    totais = totais_ultimo_evento(
+        codec, chaves, contagens, deltas_eventos[-1], pesos_ultimo,
+        campeonato.classificacao(), pilotos, tamanho_lote,
+    )
+    return resumo_totais(totais, pilotos)
@@ -0,0 +1,198 @@
+"""
+Cache em disco dos estágios de convolução de Cenários de Campeão F1 2025.
+
+Cada estágio (histograma de deltas após os k primeiros eventos) é salvo em
+um arquivo .npz identificado por um hash encadeado das definições dos
+eventos, dos pilotos e das tabelas de pontos. O histograma de deltas não
+depende da classificação atual, então mudar os pontos atuais reaproveita
+todo o cache, e acrescentar um evento reaproveita o prefixo já calculado.
+
+No mesmo diretório fica a redução por pontos de cada histograma final
+(<hash>.pontos.npz, ver simulator.ReducaoPontos), que reavaliar_campeao
+usa para pontuar novas classificações sem percorrer todos os estados.
+Ela é identificada pelo hash do conteúdo do histograma (hash_histograma),
+não pelo dos eventos: seus índices só valem para aqueles estados, naquela
+ordem.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+from database.connection import DATA_DIR
+from simulations.cenarios_campeao.codec import CodecEstado
+
+
+# Diretório dos arquivos de estágio
+CACHE_DIR = DATA_DIR / 'cache'
+
+# Incrementar quando o formato dos arquivos ou a regra de deltas mudar
+VERSAO_CACHE = 2
+
+
+def hashes_prefixos(eventos: list, pilotos: list[str]) -> list[str]:
+    """
+    Calcula o hash de cada prefixo da sequência de eventos.
+
+    O hash do prefixo k encadeia o hash do prefixo k-1 com a definição do
+    evento k (posições que pontuam e tabela de pontos), de modo que
+    prefixos iguais têm o mesmo hash mesmo que a sequência continue
+    diferente.
+
+    Args:
+        eventos: Sequência de Evento
+        pilotos: Pilotos na ordem das colunas de estado
+
+    Returns:
+        Lista com um hash hexadecimal por prefixo (1..len(eventos))
+    """
+    anterior = json.dumps({'versao': VERSAO_CACHE, 'pilotos': list(pilotos)})
+    hashes = []
+
+    for evento in eventos:
+        definicao = json.dumps({
+            'anterior': anterior,
+            'posicoes': list(evento.posicoes),
+            'pontos': sorted(evento.tabela_pontos.items()),
+        })
+        anterior = hashlib.sha256(definicao.encode()).hexdigest()
+        hashes.append(anterior)
+
+    return hashes
+
+
+def salvar_estagio(
+    hash_prefixo: str,
+    estados: np.ndarray,
+    contagens: np.ndarray,
+    codec: CodecEstado,
+) -> None:
+    """
+    Salva o histograma de um estágio em CACHE_DIR/<hash>.npz.
+
+    Args:
+        hash_prefixo: Hash do prefixo de eventos (ver hashes_prefixos)
+        estados: Estados codificados por codec
+        contagens: Combinações por estado
+        codec: Codec usado para codificar os estados
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    destino = CACHE_DIR / f'{hash_prefixo}.npz'
+    temporario = destino.with_suffix('.tmp.npz')
+
+    # Escrita atômica: outro processo nunca lê um arquivo pela metade
+    np.savez(temporario, estados=estados, contagens=contagens, maximos=codec.maximos)
+    temporario.replace(destino)
+
+
+def carregar_estagio(
+    hash_prefixo: str,
+    codec: CodecEstado,
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """
+    Carrega o histograma de um estágio, recodificado para o codec atual.
+
+    O arquivo pode ter sido gerado com um codec diferente (por exemplo,
+    dimensionado para menos eventos); nesse caso os estados são
+    decodificados e codificados novamente.
+
+    Returns:
+        (estados, contagens) ou None se o estágio não está em cache
+    """
+    arquivo = CACHE_DIR / f'{hash_prefixo}.npz'
+    if not arquivo.exists():
+        return None
+
+    with np.load(arquivo) as dados:
+        estados = dados['estados']
+        contagens = dados['contagens']
+        maximos = dados['maximos']
+
+    if not np.array_equal(maximos, codec.maximos):
+        estados = codec.codificar(CodecEstado(maximos).decodificar(estados))
+
+    return estados, contagens
+
+
+def carregar_maior_prefixo(
+    hashes: list[str],
+    codec: CodecEstado,
+) -> tuple[int, tuple[np.ndarray, np.ndarray] | None]:
+    """
+    Procura o maior prefixo de eventos já presente no cache.
+
+    Args:
+        hashes: Hashes dos prefixos (ver hashes_prefixos)
+        codec: Codec atual
+
+    Returns:
+        (k, histograma): número de eventos cobertos e (estados, contagens),
+        ou (0, None) se nenhum prefixo está em cache
+    """
+    for k in range(len(hashes), 0, -1):
+        histograma = carregar_estagio(hashes[k - 1], codec)
+        if histograma is not None:
+            return k, histograma
+    return 0, None
+
+
+def hash_histograma(chaves: np.ndarray, contagens: np.ndarray, codec: CodecEstado) -> str:
+    """
+    Calcula o hash do conteúdo de um histograma.
+
+    Cobre o codec e os bytes (e tipos) de estados e contagens, na ordem em
+    que estão: reordenar os estados, mudar uma contagem ou passar de
+    combinações para probabilidades muda o hash. Custa ~0,2 s para os
+    ~7,9M estados do problema completo.
+
+    Args:
+        chaves: Estados codificados por codec
+        contagens: Combinações ou probabilidade por estado
+        codec: Codec dos estados
+
+    Returns:
+        Hash hexadecimal
+    """
+    h = hashlib.sha256()
+    for array in (codec.maximos, chaves, contagens):
+        h.update(f'{array.dtype.str}{array.shape}'.encode())
+        h.update(np.ascontiguousarray(array).data)
+    return h.hexdigest()
+
+
+def salvar_reducao(hash_conteudo: str, **arrays: np.ndarray) -> None:
+    """
+    Salva a redução por pontos de um histograma em CACHE_DIR/<hash>.pontos.npz.
+
+    Os índices de estados da redução se referem à ordem dos estados do
+    histograma de hash_conteudo.
+
+    Args:
+        hash_conteudo: Hash do histograma (ver hash_histograma)
+        **arrays: Campos da redução (ver simulator.ReducaoPontos)
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    destino = CACHE_DIR / f'{hash_conteudo}.pontos.npz'
+    temporario = destino.with_suffix('.tmp.npz')
+
+    np.savez(temporario, **arrays)
+    temporario.replace(destino)
+
+
+def carregar_reducao(hash_conteudo: str) -> dict[str, np.ndarray] | None:
+    """
+    Carrega a redução por pontos de um histograma.
+
+    Args:
+        hash_conteudo: Hash do histograma (ver hash_histograma)
+
+    Returns:
+        Campos da redução, ou None se não está em cache
+    """
+    arquivo = CACHE_DIR / f'{hash_conteudo}.pontos.npz'
+    if not arquivo.exists():
+        return None
+
+    with np.load(arquivo) as dados:
+        return {nome: dados[nome] for nome in dados.files}
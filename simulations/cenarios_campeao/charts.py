@@ -13,7 +13,8 @@ from simulations.cenarios_campeao.filters import (
     label_metodo,
     label_piloto,
     carregar_estatisticas_resumo,
-    carregar_distribuicao_pontos,
+    carregar_estatisticas_pontos,
+    carregar_histograma_pontos,
 )
 
 
@@ -184,28 +185,31 @@ def grafico_boxplot_pontos() -> go.Figure:
     """
     Boxplot mostrando distribuição de pontos finais por piloto.
 
+    Quartis e limites ponderados por combinações, pré-calculados no banco
+    (carregar_estatisticas_pontos): só alguns números por piloto chegam ao
+    navegador.
+
     Returns:
         Figura Plotly
     """
-    df = carregar_distribuicao_pontos()
+    df = carregar_estatisticas_pontos().set_index('piloto')
 
     fig = go.Figure()
 
-    for piloto, col in [
-        ('norris', 'pts_final_norris'),
-        ('piastri', 'pts_final_piastri'),
-        ('verstappen', 'pts_final_verstappen'),
-    ]:
-        # Expandir considerando num_combinacoes (amostragem ponderada)
-        # Para performance, usar quartis aproximados
-        pontos = df[col].values
-        pesos = df['num_combinacoes'].values
+    for piloto in ['norris', 'piastri', 'verstappen']:
+        caixa = df.loc[piloto]
 
         fig.add_trace(go.Box(
-            y=pontos,
+            x=[label_piloto(piloto)],
+            q1=[caixa['q1']],
+            median=[caixa['mediana']],
+            q3=[caixa['q3']],
+            lowerfence=[caixa['limite_inferior']],
+            upperfence=[caixa['limite_superior']],
+            mean=[caixa['media']],
+            boxmean=True,
             name=label_piloto(piloto),
             marker_color=CORES_PILOTO[piloto],
-            boxpoints='outliers',
         ))
 
     fig.update_layout(
@@ -219,6 +223,51 @@ def grafico_boxplot_pontos() -> go.Figure:
     return fig
 
 
+def grafico_histograma_pontos(largura: int = 5) -> go.Figure:
+    """
+    Histograma dos pontos finais de cada piloto, ponderado por combinações.
+
+    Args:
+        largura: Largura de cada faixa, em pontos
+
+    Returns:
+        Figura Plotly
+    """
+    df = carregar_histograma_pontos(largura)
+
+    fig = go.Figure()
+
+    for piloto in ['norris', 'piastri', 'verstappen']:
+        df_piloto = df[df['piloto'] == piloto]
+
+        fig.add_trace(go.Bar(
+            x=df_piloto['faixa'] + largura / 2,
+            y=df_piloto['pct'],
+            width=largura,
+            name=label_piloto(piloto),
+            marker_color=CORES_PILOTO[piloto],
+            opacity=0.6,
+            customdata=df_piloto.assign(fim=df_piloto['faixa'] + largura - 1)[['faixa', 'fim']],
+            hovertemplate=(
+                f"<b>{label_piloto(piloto)}</b><br>"
+                "%{customdata[0]}–%{customdata[1]} pts<br>"
+                "%{y:.2f}% das combinações<extra></extra>"
+            ),
+        ))
+
+    fig.update_layout(
+        title="Pontos Finais por Faixa",
+        xaxis_title="Pontos",
+        yaxis_title="% das Combinações",
+        barmode='overlay',
+        height=350,
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='center', x=0.5),
+        margin=dict(l=20, r=20, t=80, b=20),
+    )
+
+    return fig
+
+
 def grafico_comparativo_ranges() -> go.Figure:
     """
     Gráfico comparativo mostrando range de pontos de cada piloto.
@@ -226,20 +275,16 @@ def grafico_comparativo_ranges() -> go.Figure:
     Returns:
         Figura Plotly
     """
-    df = carregar_distribuicao_pontos()
+    df = carregar_estatisticas_pontos().set_index('piloto')
 
     data = []
-    for piloto, col in [
-        ('norris', 'pts_final_norris'),
-        ('piastri', 'pts_final_piastri'),
-        ('verstappen', 'pts_final_verstappen'),
-    ]:
+    for piloto in ['norris', 'piastri', 'verstappen']:
         data.append({
             'piloto': label_piloto(piloto),
             'piloto_key': piloto,
-            'min': df[col].min(),
-            'max': df[col].max(),
-            'media': (df[col] * df['num_combinacoes']).sum() / df['num_combinacoes'].sum(),
+            'min': df.loc[piloto, 'minimo'],
+            'max': df.loc[piloto, 'maximo'],
+            'media': df.loc[piloto, 'media'],
         })
 
     df_ranges = pd.DataFrame(data)
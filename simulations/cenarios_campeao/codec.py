@@ -0,0 +1,83 @@
+"""
+Codec de estados para Cenários de Campeão F1 2025.
+
+Empacota as estatísticas acumuladas de todos os pilotos (pontos, vitórias,
+segundos e terceiros) em uma única chave int64, com um dígito em base
+mista por coluna. Como a base de cada dígito é o máximo atingível somando
+todos os eventos mais um, chaves podem ser somadas diretamente sem
+transporte entre dígitos.
+"""
+
+from math import prod
+
+import numpy as np
+
+
+# Maior chave representável em int64 (+1)
+LIMITE_CHAVE = 2 ** 63
+
+
+class CodecEstado:
+    """
+    Converte linhas de deltas (n, colunas) em chaves int64 e vice-versa.
+
+    A primeira coluna é o dígito mais significativo, de modo que a ordem
+    das chaves coincide com a ordem lexicográfica das linhas.
+
+    Quando o produto das bases não cabe em int64 o codec fica no modo não
+    compacto: codificar/decodificar devolvem as próprias linhas e a
+    convolução usa o caminho por linhas.
+    """
+
+    def __init__(self, maximos: np.ndarray):
+        """
+        Args:
+            maximos: Valor máximo atingível de cada coluna
+        """
+        maximos = np.asarray(maximos, dtype=np.int64)
+        bases = maximos + 1
+
+        self.maximos = maximos
+        self.bases = bases
+        self.compacto = prod(int(b) for b in bases) < LIMITE_CHAVE
+        self.pesos = np.r_[np.cumprod(bases[::-1])[::-1][1:], 1].astype(np.int64) \
+            if self.compacto else None
+
+    @classmethod
+    def para_eventos(cls, deltas_eventos: list[np.ndarray]) -> 'CodecEstado':
+        """
+        Cria o codec dimensionado para a soma de uma sequência de eventos.
+
+        Args:
+            deltas_eventos: Arrays (m, colunas) de deltas de cada evento
+
+        Returns:
+            Codec cujos dígitos comportam o acúmulo de todos os eventos
+        """
+        maximos = sum(d.max(axis=0).astype(np.int64) for d in deltas_eventos)
+        return cls(maximos)
+
+    @property
+    def num_colunas(self) -> int:
+        """Número de colunas de uma linha decodificada."""
+        return len(self.maximos)
+
+    def codificar(self, linhas: np.ndarray) -> np.ndarray:
+        """
+        Empacota linhas (n, colunas) em chaves (n,) int64.
+
+        No modo não compacto, devolve as linhas sem alteração.
+        """
+        if not self.compacto:
+            return linhas
+        return linhas.astype(np.int64) @ self.pesos
+
+    def decodificar(self, chaves: np.ndarray) -> np.ndarray:
+        """
+        Desempacota chaves (n,) em linhas (n, colunas) int16.
+
+        No modo não compacto, devolve as linhas sem alteração.
+        """
+        if not self.compacto:
+            return chaves
+        return (chaves[:, None] // self.pesos % self.bases).astype(np.int16)
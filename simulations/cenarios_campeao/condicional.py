@@ -0,0 +1,164 @@
+"""
+Re-simulação condicional para Cenários de Campeão F1 2025.
+
+Quando parte dos resultados já é conhecida (ex: a Sprint Qatar terminou),
+as chances de título passam a ser condicionais a esses resultados. Em vez
+de editar a classificação e refazer tudo com executar(force=True):
+
+- Eventos com resultado completo (todos os pilotos) viram um único delta
+  fixo, somado à classificação atual.
+- Eventos com resultado parcial (só alguns pilotos) mantêm apenas as
+  combinações compatíveis com as posições conhecidas.
+- Só os eventos restantes são convoluídos; se nenhum deles foi filtrado,
+  o cache de estágios (ver cache) é reaproveitado.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+
+from simulations.cenarios_campeao.codec import CodecEstado
+from simulations.cenarios_campeao.simulator import (
+    CAMPEONATO,
+    FORA_PONTOS,
+    Campeonato,
+    HistogramaDeltas,
+    _convoluir_numpy,
+    gerar_posicoes,
+    posicoes_para_deltas,
+    reavaliar_campeao,
+)
+
+
+def filtrar_posicoes(
+    grade: np.ndarray,
+    evento_posicoes: list[int],
+    conhecidas: dict[int, int],
+) -> np.ndarray:
+    """
+    Mantém as combinações de posições compatíveis com os resultados conhecidos.
+
+    Posições fora de evento_posicoes (ex: 12º) equivalem a FORA_PONTOS.
+
+    Args:
+        grade: Array (m, pilotos) de gerar_posicoes
+        evento_posicoes: Posições que pontuam no evento
+        conhecidas: {índice do piloto: posição de chegada}
+
+    Returns:
+        Linhas de grade compatíveis com conhecidas
+    """
+    compativeis = np.ones(len(grade), dtype=bool)
+    for indice, posicao in conhecidas.items():
+        alvo = posicao if posicao in evento_posicoes else FORA_PONTOS
+        compativeis &= grade[:, indice] == alvo
+    return grade[compativeis]
+
+
+def deltas_condicionais(
+    campeonato: Campeonato,
+    resultados: dict[str, dict[str, int]],
+) -> tuple[np.ndarray, list[int], list[np.ndarray]]:
+    """
+    Separa os eventos em delta fixo (resultado completo) e eventos restantes.
+
+    Args:
+        campeonato: Pilotos e eventos restantes
+        resultados: {nome do evento: {piloto: posição}} já conhecidos
+
+    Returns:
+        (fixo, restantes, deltas_restantes): soma (pilotos, 4) dos deltas dos
+        eventos com resultado completo, índices dos demais eventos em
+        campeonato.eventos e seus deltas (filtrados se parcialmente conhecidos)
+
+    Raises:
+        ValueError: Se um evento ou piloto não existe no campeonato, ou se
+            as posições conhecidas de um evento são incompatíveis entre si
+    """
+    pilotos = campeonato.pilotos
+    nomes = [e.nome for e in campeonato.eventos]
+
+    for nome, posicoes in resultados.items():
+        if nome not in nomes:
+            raise ValueError(f"Evento desconhecido: {nome!r}. Opções: {', '.join(nomes)}")
+        desconhecidos = set(posicoes) - set(pilotos)
+        if desconhecidos:
+            raise ValueError(f"Pilotos fora do campeonato em {nome!r}: {sorted(desconhecidos)}")
+
+    fixo = np.zeros_like(campeonato.classificacao())
+    restantes, deltas_restantes = [], []
+
+    for k, evento in enumerate(campeonato.eventos):
+        grade = gerar_posicoes(evento, len(pilotos))
+        conhecidas = {pilotos.index(p): pos for p, pos in resultados.get(evento.nome, {}).items()}
+        grade = filtrar_posicoes(grade, evento.posicoes, conhecidas)
+
+        if len(grade) == 0:
+            raise ValueError(f"Posições incompatíveis em {evento.nome!r}: {resultados[evento.nome]}")
+
+        deltas = posicoes_para_deltas(evento, grade)
+        if len(conhecidas) == len(pilotos):
+            fixo += deltas[0].reshape(fixo.shape)
+        else:
+            restantes.append(k)
+            deltas_restantes.append(deltas)
+
+    return fixo, restantes, deltas_restantes
+
+
+def simular_condicional(
+    resultados: dict[str, dict[str, int]],
+    campeonato: Campeonato = CAMPEONATO,
+    usar_cache: bool = True,
+) -> dict:
+    """
+    Recalcula as chances de título dados resultados já conhecidos.
+
+    Exemplo: simular_condicional({'Sprint Qatar': {'norris': 3,
+    'piastri': 1, 'verstappen': 2}}) convolui só as duas corridas
+    restantes sobre a classificação após a sprint.
+
+    Args:
+        resultados: {nome do evento: {piloto: posição}}, para qualquer
+            subconjunto de eventos e pilotos. Posições que não pontuam
+            (ex: 11 ou 99) equivalem a fora dos pontos.
+        campeonato: Pilotos, eventos e classificação antes dos resultados
+        usar_cache: Reaproveita estágios salvos em disco quando nenhum
+            evento restante tem resultado parcial
+
+    Returns:
+        Dicionário de reavaliar_campeao acrescido de probabilidades
+        {piloto: fração das combinações restantes}
+
+    Raises:
+        ValueError: Ver deltas_condicionais
+    """
+    fixo, restantes, deltas_restantes = deltas_condicionais(campeonato, resultados)
+
+    print(f"  Delta fixo: {len(campeonato.eventos) - len(restantes)} eventos conhecidos")
+    print(f"  Eventos a convoluir: {', '.join(campeonato.eventos[k].nome for k in restantes) or '-'}")
+
+    if restantes:
+        eventos = tuple(campeonato.eventos[k] for k in restantes)
+        parcial = any(campeonato.eventos[k].nome in resultados for k in restantes)
+        codec = CodecEstado.para_eventos(deltas_restantes)
+        chaves, contagens = _convoluir_numpy(
+            replace(campeonato, eventos=eventos), deltas_restantes, codec,
+            usar_cache=usar_cache and not parcial,
+        )
+    else:
+        # Campeonato encerrado: um único estado sem deltas restantes
+        codec = CodecEstado(np.zeros(fixo.size, dtype=np.int64))
+        chaves, contagens = np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.int64)
+
+    histograma = HistogramaDeltas(chaves, contagens, codec, campeonato.pilotos)
+    atual = campeonato.classificacao() + fixo
+    pontos, vitorias, segundos, terceiros = (
+        dict(zip(campeonato.pilotos, coluna.tolist())) for coluna in atual.T
+    )
+
+    resumo = reavaliar_campeao(histograma, pontos, vitorias, segundos, terceiros)
+    resumo['probabilidades'] = {
+        p: total / resumo['total_combinacoes'] for p, total in resumo['por_campeao'].items()
+    }
+    return resumo
@@ -0,0 +1,356 @@
+"""
+Condições de título ("do que o piloto X precisa") para Cenários de Campeão F1 2025.
+
+Para cada piloto, devolve as condições mínimas que garantem o título: as
+posições próprias em cada evento ("P3 ou melhor") e, quando os resultados
+próprios não bastam, o máximo de pontos que cada rival pode somar.
+
+Não enumera o espaço completo de combinações, só as posições do piloto:
+
+- Índice de dominância: para cada evento e posição do piloto, os deltas
+  disponíveis a um rival. Somados ao longo dos eventos, os deltas do rival
+  são reduzidos ao melhor desempate (vitórias, 2º, 3º) por total de pontos;
+  qualquer outro resultado com os mesmos pontos é dominado.
+- Grade de posições próprias: para cada combinação exata de posições do
+  piloto (~1 mil no campeonato padrão), o limite de pontos de cada rival.
+  Terminar mais à frente não é monotônico para o rival (libera a posição
+  que o piloto deixou), então o limite de "P_x ou melhor" é o mínimo dos
+  limites exatos sobre todas as posições iguais ou melhores em cada evento:
+  o mínimo acumulado ao longo de cada eixo da grade.
+- Fronteira de Pareto: só ficam as condições que nenhuma outra, menos
+  exigente em todos os eventos e limites, também garante.
+- Margens: na fronteira, o limite de cada rival acompanha os pontos que as
+  posições do piloto garantem (limite = pontos garantidos + margem). As
+  condições com os mesmos rivais e as mesmas margens são variações de uma
+  só regra e viram uma condição representativa (a de menos pontos
+  garantidos), com o número de variações omitidas.
+
+O módulo não guarda estado: o dashboard cacheia o resultado na camada da
+página (ver filters.carregar_condicoes_titulo).
+"""
+
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from math import prod
+
+import numpy as np
+
+from simulations.cenarios_campeao.codec import LIMITE_CHAVE
+from simulations.cenarios_campeao.simulator import (
+    CAMPEONATO,
+    FORA_PONTOS,
+    Campeonato,
+    Evento,
+)
+
+
+# Limite de pontos de um rival que não precisa de condição
+SEM_LIMITE = np.iinfo(np.int64).max
+
+
+# =============================================================================
+# ESTRUTURAS DE DADOS
+# =============================================================================
+
+@dataclass(frozen=True)
+class CondicaoTitulo:
+    """
+    Condição suficiente para o título.
+
+    O piloto é campeão em qualquer combinação em que termina cada evento na
+    posição indicada ou melhor e cada rival limitado soma no máximo os
+    pontos indicados. O limite vale para todas essas posições, não só para
+    as indicadas (ver resolver_piloto).
+
+    Com variacoes > 0, a condição representa outras tantas da fronteira,
+    com posições que garantem mais pontos ao piloto; em cada uma, o limite
+    de cada rival são os pontos que aquelas posições garantem ao piloto
+    mais a margem.
+    """
+    piloto: str
+    posicoes: tuple[tuple[str, int | None], ...]  # (evento, posição máxima); None = qualquer
+    limites_rivais: tuple[tuple[str, int], ...]  # (rival, pontos máximos nos eventos restantes)
+    margens: tuple[tuple[str, int], ...] = ()  # (rival, limite − pontos garantidos pelas posições)
+    variacoes: int = 0  # condições com as mesmas margens omitidas
+
+    def descrever(self) -> str:
+        """Texto curto da condição (ex: 'Race Qatar: P2 ou melhor; piastri ≤ 18 pts')."""
+        partes = [
+            f"{evento}: {'qualquer' if pos is None else f'P{pos} ou melhor'}"
+            for evento, pos in self.posicoes
+        ]
+        partes += [f"{rival} ≤ {pts} pts" for rival, pts in self.limites_rivais]
+        texto = '; '.join(partes)
+        if self.variacoes:
+            margens = ', '.join(f"{rival} {margem:+d}" for rival, margem in self.margens)
+            texto += (
+                f" (+{self.variacoes} variações com posições que garantem mais pontos a "
+                f"{self.piloto}; limite = pontos garantidos + margem: {margens})"
+            )
+        return texto
+
+
+# =============================================================================
+# ÍNDICE DE DOMINÂNCIA
+# =============================================================================
+
+def _delta_posicao(evento: Evento, posicao: int) -> np.ndarray:
+    """(pontos, vitória, segundo, terceiro) de uma posição."""
+    pontos = evento.tabela_pontos.get(posicao, 0) if posicao != FORA_PONTOS else 0
+    return np.array([pontos, posicao == 1, posicao == 2, posicao == 3], dtype=np.int64)
+
+
+def _reduzir(deltas: np.ndarray) -> np.ndarray:
+    """
+    Mantém, para cada total de pontos, só o melhor desempate.
+
+    Ordena por (pontos, vitórias, 2º, 3º) e fica com a última linha de cada
+    total de pontos: as demais perdem para ela em qualquer comparação.
+    """
+    ordem = np.lexsort(deltas.T[::-1])
+    deltas = deltas[ordem]
+    ultimos = np.r_[deltas[1:, 0] != deltas[:-1, 0], True]
+    return deltas[ultimos]
+
+
+def indice_rivais(evento: Evento) -> dict[int, np.ndarray]:
+    """
+    Deltas disponíveis a um rival para cada posição do piloto no evento.
+
+    O rival não pode repetir uma posição que pontua ocupada pelo piloto;
+    fora dos pontos é sempre possível.
+
+    Returns:
+        {posição do piloto: array (k, 4) de deltas do rival}
+    """
+    todas = list(evento.posicoes) + [FORA_PONTOS]
+    return {
+        propria: _reduzir(np.array([
+            _delta_posicao(evento, p) for p in todas if p == FORA_PONTOS or p != propria
+        ]))
+        for propria in todas
+    }
+
+
+# =============================================================================
+# AVALIAÇÃO
+# =============================================================================
+
+def _chave(estatisticas: np.ndarray, ordem_nome: int, bases: np.ndarray) -> np.ndarray:
+    """
+    Chave escalar de desempate em base mista (como em determinar_campeoes).
+
+    bases tem uma base por estatística e, por último, o número de pilotos:
+    a ordem do nome desempata o empate total.
+    """
+    chave = np.zeros(estatisticas.shape[:-1], dtype=np.int64)
+    for c in range(estatisticas.shape[-1]):
+        chave = chave * bases[c] + estatisticas[..., c]
+    return chave * bases[-1] + ordem_nome
+
+
+def _limite_rival(
+    chave_piloto: int,
+    atual_rival: np.ndarray,
+    deltas_rival: np.ndarray,
+    ordem_rival: int,
+    bases: np.ndarray,
+) -> int | None:
+    """
+    Máximo de pontos que o rival pode somar sem tirar o título do piloto.
+
+    Returns:
+        None se nenhum resultado do rival supera o piloto; senão o maior
+        total de pontos P tal que todo resultado com até P pontos perde
+        (-1 se nem zero pontos bastam)
+    """
+    chaves = _chave(atual_rival + deltas_rival, ordem_rival, bases)
+    vencedores = deltas_rival[chaves > chave_piloto]
+    if len(vencedores) == 0:
+        return None
+    return int(vencedores[:, 0].min()) - 1
+
+
+def _limites(
+    chave_piloto: int,
+    atual: np.ndarray,
+    ordem_nome: np.ndarray,
+    indice: int,
+    deltas_rival: np.ndarray,
+    bases: np.ndarray,
+) -> np.ndarray:
+    """
+    Limite de pontos de cada piloto contra o piloto indice.
+
+    Returns:
+        Array (pilotos,) com o limite de _limite_rival, SEM_LIMITE para
+        rivais sem condição e para o próprio piloto
+    """
+    limites = np.full(len(atual), SEM_LIMITE)
+    for i in range(len(atual)):
+        if i != indice:
+            limite = _limite_rival(chave_piloto, atual[i], deltas_rival, ordem_nome[i], bases)
+            limites[i] = SEM_LIMITE if limite is None else limite
+    return limites
+
+
+def _fronteira(linhas: np.ndarray) -> np.ndarray:
+    """
+    Linhas não dominadas (fronteira de Pareto), sem repetições.
+
+    Cada linha tem valores em que maior é menos exigente (posição máxima,
+    limite de pontos); a domina b se a >= b em todas as colunas.
+    """
+    linhas = np.unique(linhas, axis=0)
+    domina = (linhas[:, None, :] >= linhas[None, :, :]).all(axis=2)
+    np.fill_diagonal(domina, False)
+    return linhas[~domina.any(axis=0)]
+
+
+def _agrupar_margens(condicoes: list[CondicaoTitulo]) -> list[CondicaoTitulo]:
+    """
+    Junta as condições com os mesmos rivais limitados e as mesmas margens.
+
+    Mantém a primeira de cada grupo (a lista chega ordenada pelos pontos
+    garantidos ao piloto) com o número das demais em variacoes; condições
+    sem rivais não têm margem e ficam todas.
+    """
+    grupos: dict[tuple, list[CondicaoTitulo]] = {}
+    for condicao in condicoes:
+        chave = condicao.margens if condicao.limites_rivais else (condicao,)
+        grupos.setdefault(chave, []).append(condicao)
+    return [replace(membros[0], variacoes=len(membros) - 1) for membros in grupos.values()]
+
+
+# =============================================================================
+# GRADE DE POSIÇÕES
+# =============================================================================
+
+def resolver_piloto(
+    piloto: str,
+    campeonato: Campeonato = CAMPEONATO,
+    com_rivais: bool = True,
+    agrupar: bool = True,
+) -> list[CondicaoTitulo]:
+    """
+    Condições mínimas que garantem o título a um piloto.
+
+    Calcula o limite exato de cada rival em cada combinação de posições do
+    piloto e, para cada condição "P_x ou melhor", fica com o menor limite
+    entre todas as posições que ela admite: toda combinação que atende à
+    condição dá o título. No campeonato padrão leva ~0,25 s por piloto.
+
+    Args:
+        piloto: Piloto de campeonato.pilotos
+        campeonato: Pilotos, eventos restantes e classificação
+        com_rivais: Se False, só condições sobre os resultados do próprio
+            piloto (vazio se ele não depende só de si)
+        agrupar: Junta as condições com as mesmas margens (ver
+            _agrupar_margens); False devolve a fronteira inteira
+
+    Returns:
+        Fronteira de Pareto das condições (agrupada por margens), das menos
+        às mais exigentes
+
+    Raises:
+        ValueError: Se o piloto não está no campeonato ou a chave de
+            desempate não cabe em int64
+    """
+    if piloto not in campeonato.pilotos:
+        raise ValueError(f"Piloto fora do campeonato: {piloto!r}")
+
+    pilotos = campeonato.pilotos
+    indice = pilotos.index(piloto)
+    eventos = campeonato.eventos
+    atual = campeonato.classificacao()
+    ordem_nome = np.argsort(np.argsort(pilotos))
+    opcoes_eventos = [list(e.posicoes) + [FORA_PONTOS] for e in eventos]
+    indices_rivais = [indice_rivais(e) for e in eventos]
+
+    # Bases da chave de desempate: o máximo de cada estatística e a ordem do nome
+    maximos = sum(_delta_posicao(e, e.posicoes[0]) for e in eventos) + len(eventos)
+    bases = np.r_[atual.max(axis=0) + maximos + 1, len(pilotos)]
+    if prod(int(b) for b in bases) >= LIMITE_CHAVE:
+        raise ValueError("Chave de desempate não cabe em int64; reduza o número de eventos")
+
+    @lru_cache(maxsize=None)
+    def somar_rivais(posicoes: tuple[int, ...]) -> np.ndarray:
+        """Deltas do rival somados evento a evento, reduzidos por dominância."""
+        if not posicoes:
+            return np.zeros((1, 4), dtype=np.int64)
+        anteriores = somar_rivais(posicoes[:-1])
+        opcoes = indices_rivais[len(posicoes) - 1][posicoes[-1]]
+        return _reduzir((anteriores[:, None, :] + opcoes[None, :, :]).reshape(-1, 4))
+
+    def avaliar(posicoes: tuple[int, ...]) -> np.ndarray:
+        """Limites dos rivais para posições exatas do piloto."""
+        proprio = sum(_delta_posicao(e, p) for e, p in zip(eventos, posicoes))
+        chave = int(_chave(atual[indice] + proprio, ordem_nome[indice], bases))
+        return _limites(chave, atual, ordem_nome, indice, somar_rivais(posicoes), bases)
+
+    # Limites exatos em cada ponto da grade de posições próprias
+    forma = tuple(len(o) for o in opcoes_eventos)
+    limites_grade = np.empty(forma + (len(pilotos),), dtype=np.int64)
+    for indices in np.ndindex(*forma):
+        limites_grade[indices] = avaliar(tuple(o[i] for o, i in zip(opcoes_eventos, indices)))
+
+    # "P_x ou melhor": mínimo sobre todas as posições iguais ou melhores
+    for eixo in range(len(eventos)):
+        limites_grade = np.minimum.accumulate(limites_grade, axis=eixo)
+
+    validas = (limites_grade >= 0).all(axis=-1)
+    if not com_rivais:
+        validas &= (limites_grade == SEM_LIMITE).all(axis=-1)
+    if not validas.any():
+        return []
+
+    # Linhas: posição máxima por evento + limite por piloto (maior = menos exigente)
+    grade = np.stack(np.meshgrid(*opcoes_eventos, indexing='ij'), axis=-1)
+    linhas = np.concatenate([grade[validas], limites_grade[validas]], axis=1)
+
+    # Da condição com menos pontos garantidos ao piloto para a com mais
+    fronteira = _fronteira(linhas)
+    garantidos = [sum(int(_delta_posicao(e, p)[0]) for e, p in zip(eventos, linha))
+                  for linha in fronteira]
+
+    condicoes = []
+    for indice_linha in np.argsort(garantidos, kind='stable'):
+        linha = fronteira[indice_linha]
+        limites = [
+            (r, int(lim)) for r, lim in zip(pilotos, linha[len(eventos):]) if lim != SEM_LIMITE
+        ]
+        condicoes.append(CondicaoTitulo(
+            piloto=piloto,
+            posicoes=tuple(
+                (e.nome, None if p == FORA_PONTOS else int(p))
+                for e, p in zip(eventos, linha[:len(eventos)])
+            ),
+            limites_rivais=tuple(limites),
+            margens=tuple((r, lim - garantidos[indice_linha]) for r, lim in limites),
+        ))
+
+    if agrupar:
+        condicoes = _agrupar_margens(condicoes)
+    return sorted(condicoes, key=lambda c: (
+        len(c.limites_rivais),
+        -sum(FORA_PONTOS if p is None else p for _, p in c.posicoes),
+    ))
+
+
+def condicoes_titulo(
+    campeonato: Campeonato = CAMPEONATO,
+    com_rivais: bool = True,
+    agrupar: bool = True,
+) -> dict[str, list[CondicaoTitulo]]:
+    """
+    Condições mínimas de título de todos os pilotos.
+
+    Args:
+        campeonato: Pilotos, eventos restantes e classificação
+        com_rivais: Ver resolver_piloto
+        agrupar: Ver resolver_piloto
+
+    Returns:
+        {piloto: condições de resolver_piloto}
+    """
+    return {p: resolver_piloto(p, campeonato, com_rivais, agrupar) for p in campeonato.pilotos}
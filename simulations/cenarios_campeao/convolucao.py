@@ -0,0 +1,181 @@
+"""
+Motor vetorizado de convolução para Cenários de Campeão F1 2025.
+
+Representa os estados como arrays inteiros NumPy e combina eventos por
+broadcasting, agregando estados repetidos por ordenação. Os estados podem
+ser chaves int64 empacotadas pelo CodecEstado (1 dimensão, caminho
+principal) ou linhas com uma coluna por estatística de cada piloto
+(2 dimensões, usado quando os campos não cabem em uma chave).
+"""
+
+from concurrent.futures import Executor
+
+import numpy as np
+
+
+# Máximo de estados materializados por bloco de broadcasting
+LINHAS_POR_BLOCO = 2_000_000
+
+
+def agregar(estados: np.ndarray, contagens: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Agrupa estados repetidos somando suas contagens.
+
+    Args:
+        estados: Chaves (n,) ou linhas (n, colunas), um estado por posição
+        contagens: Array (n,) com o número de combinações de cada estado
+
+    Returns:
+        (estados_unicos, contagens_somadas), em ordem crescente
+    """
+    if estados.ndim == 1:
+        return _agregar_chaves(estados, contagens)
+
+    # Chave escalar por linha em base mista (base = máximo da coluna + 1)
+    bases = estados.max(axis=0).astype(np.int64) + 1
+    if np.prod(bases.astype(float)) >= 2 ** 63:
+        # Sem espaço em int64: agrupamento lexicográfico direto (mais lento)
+        unicos, inverso = np.unique(estados, axis=0, return_inverse=True)
+        somas = np.zeros(len(unicos), dtype=contagens.dtype)
+        np.add.at(somas, inverso.ravel(), contagens)
+        return unicos, somas
+
+    pesos = np.cumprod(np.r_[bases[1:], 1][::-1])[::-1]
+    chaves = estados.astype(np.int64) @ pesos
+
+    ordem = np.argsort(chaves, kind='stable')
+    inicios = _inicios_grupos(chaves[ordem])
+    return estados[ordem[inicios]], np.add.reduceat(contagens[ordem], inicios)
+
+
+def _agregar_chaves(chaves: np.ndarray, contagens: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Agrupa chaves escalares repetidas somando suas contagens."""
+    ordem = np.argsort(chaves, kind='stable')
+    chaves = chaves[ordem]
+    inicios = _inicios_grupos(chaves)
+    return chaves[inicios], np.add.reduceat(contagens[ordem], inicios)
+
+
+def _inicios_grupos(chaves_ordenadas: np.ndarray) -> np.ndarray:
+    """Índices onde começa cada grupo de chaves iguais em um array ordenado."""
+    return np.flatnonzero(np.r_[True, chaves_ordenadas[1:] != chaves_ordenadas[:-1]])
+
+
+def convoluir(
+    estados: np.ndarray,
+    contagens: np.ndarray,
+    deltas_evento: np.ndarray,
+    pesos_evento: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Combina estados acumulados com todos os resultados de um evento.
+
+    Cada estado é somado a cada delta do evento por broadcasting, em blocos
+    de no máximo LINHAS_POR_BLOCO linhas para limitar a memória. Os parciais
+    de cada bloco são fundidos à medida que são produzidos.
+
+    Chaves empacotadas são somadas diretamente: o CodecEstado garante que
+    nenhum campo transborda para o vizinho.
+
+    Com pesos_evento, cada delta contribui contagem × peso em vez de
+    contagem (massa de probabilidade em float64 no modo ponderado).
+
+    Args:
+        estados: Chaves (n,) ou linhas (n, colunas) de estados acumulados
+        contagens: Array (n,) de combinações (ou probabilidade) por estado
+        deltas_evento: Deltas válidos do evento, no mesmo formato de estados
+        pesos_evento: Peso (m,) de cada delta; None equivale a peso 1
+
+    Returns:
+        (estados, contagens) agregados após o evento
+    """
+    num_deltas = len(deltas_evento)
+    passo = max(1, LINHAS_POR_BLOCO // num_deltas)
+    parciais: list[tuple[np.ndarray, np.ndarray]] = []
+
+    for inicio in range(0, len(estados), passo):
+        bloco = estados[inicio:inicio + passo]
+        somados = np.expand_dims(bloco, 1) + np.expand_dims(deltas_evento, 0)
+        somados = somados.reshape((-1,) + estados.shape[1:])
+        if pesos_evento is None:
+            pesos = np.repeat(contagens[inicio:inicio + passo], num_deltas)
+        else:
+            pesos = np.outer(contagens[inicio:inicio + passo], pesos_evento).ravel()
+        _empilhar(parciais, agregar(somados, pesos))
+
+    return fundir(parciais)
+
+
+def convoluir_paralelo(
+    estados: np.ndarray,
+    contagens: np.ndarray,
+    deltas_evento: np.ndarray,
+    executor: Executor,
+    num_fatias: int,
+    pesos_evento: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Versão de convoluir que distribui os estados entre processos.
+
+    Os estados são divididos em fatias contíguas, cada fatia é convoluída
+    em um processo do executor e os histogramas parciais são fundidos.
+    O resultado é idêntico ao de convoluir.
+
+    Args:
+        estados: Chaves (n,) ou linhas (n, colunas) de estados acumulados
+        contagens: Array (n,) de combinações por estado
+        deltas_evento: Deltas válidos do evento, no mesmo formato de estados
+        executor: Pool de processos (ex: ProcessPoolExecutor)
+        num_fatias: Número de fatias em que os estados são divididos
+        pesos_evento: Peso de cada delta (ver convoluir)
+
+    Returns:
+        (estados, contagens) agregados após o evento
+    """
+    limites = np.linspace(0, len(estados), num_fatias + 1).astype(int)
+    futuros = [
+        executor.submit(
+            convoluir, estados[ini:fim], contagens[ini:fim], deltas_evento, pesos_evento
+        )
+        for ini, fim in zip(limites[:-1], limites[1:])
+        if fim > ini
+    ]
+
+    parciais: list[tuple[np.ndarray, np.ndarray]] = []
+    for futuro in futuros:
+        _empilhar(parciais, futuro.result())
+
+    return fundir(parciais)
+
+
+def fundir(parciais: list[tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Funde histogramas parciais (estados, contagens) em um único histograma.
+
+    Args:
+        parciais: Lista não vazia de pares (estados, contagens)
+
+    Returns:
+        (estados, contagens) agregados
+    """
+    parciais = list(parciais)
+    while len(parciais) >= 2:
+        (e2, c2), (e1, c1) = parciais.pop(), parciais.pop()
+        parciais.append(agregar(np.concatenate([e1, e2]), np.concatenate([c1, c2])))
+    return parciais[0]
+
+
+def _empilhar(
+    parciais: list[tuple[np.ndarray, np.ndarray]],
+    parcial: tuple[np.ndarray, np.ndarray],
+) -> None:
+    """
+    Adiciona um parcial à pilha com intercalação hierárquica.
+
+    Funde parciais de tamanho semelhante à medida que chegam, mantendo a
+    memória proporcional ao resultado final.
+    """
+    parciais.append(parcial)
+    while len(parciais) >= 2 and len(parciais[-1][0]) * 2 >= len(parciais[-2][0]):
+        (e2, c2), (e1, c1) = parciais.pop(), parciais.pop()
+        parciais.append(agregar(np.concatenate([e1, e2]), np.concatenate([c1, c2])))
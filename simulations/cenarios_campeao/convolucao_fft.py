@@ -0,0 +1,196 @@
+"""
+Convolução por FFT para Cenários de Campeão F1 2025.
+
+Representa o histograma de estados como cubos densos de contagens sobre as
+colunas de pontos (um eixo por piloto), indexados por uma chave esparsa com
+as demais colunas (vitórias, segundos e terceiros). Combinar um evento vira
+uma convolução N-D por chave, calculada como produto de espectros
+(numpy.fft.rfftn), então o custo cresce com o volume dos cubos e não com o
+produto do número de estados pelo número de deltas.
+
+Os espectros são calculados em float64; para que o arredondamento de volta a
+inteiros seja exato, as contagens são divididas em fatias de bits (limbs)
+pequenas o bastante para que nenhuma soma parcial passe de LIMITE_EXATO.
+
+Só compensa quando os cubos são densos: densidade() estima quantas
+combinações brutas caem em cada célula dos cubos antes do último evento.
+"""
+
+from math import prod
+
+import numpy as np
+
+
+# Maior valor de uma convolução parcial arredondado com segurança em float64
+LIMITE_EXATO = 2 ** 40
+
+# Erro máximo de arredondamento tolerado antes de acusar perda de exatidão
+TOLERANCIA_ARREDONDAMENTO = 0.25
+
+
+def convoluir_fft(
+    deltas_eventos: list[np.ndarray],
+    colunas_densas: list[int],
+    maximos: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convolui uma sequência de eventos por FFT.
+
+    Args:
+        deltas_eventos: Arrays (m, colunas) de deltas de cada evento
+        colunas_densas: Colunas representadas como eixos dos cubos densos
+            (tipicamente os pontos de cada piloto)
+        maximos: Máximo atingível de cada coluna somando todos os eventos
+
+    Returns:
+        (linhas, contagens): estados (n, colunas) int16 e combinações, sem
+        ordem definida
+    """
+    maximos = np.asarray(maximos, dtype=np.int64)
+    colunas_esparsas = [c for c in range(len(maximos)) if c not in colunas_densas]
+
+    forma = tuple(int(m) + 1 for m in maximos[colunas_densas])
+    forma_fft = tuple(_tamanho_rapido(n) for n in forma)
+    eixos = tuple(range(len(forma)))
+    bases = maximos[colunas_esparsas] + 1
+    pesos = np.r_[np.cumprod(bases[::-1])[::-1][1:], 1].astype(np.int64)
+
+    def separar(deltas: np.ndarray) -> dict[int, np.ndarray]:
+        """Agrupa deltas por chave esparsa em cubos densos de contagens."""
+        chaves = deltas[:, colunas_esparsas].astype(np.int64) @ pesos
+        cubos = {}
+        for chave in np.unique(chaves):
+            cubo = np.zeros(forma, dtype=np.int64)
+            np.add.at(cubo, tuple(deltas[chaves == chave][:, colunas_densas].T), 1)
+            cubos[int(chave)] = cubo
+        return cubos
+
+    estado = separar(deltas_eventos[0])
+
+    for k, deltas in enumerate(deltas_eventos[1:], start=1):
+        evento = {
+            chave: np.fft.rfftn(cubo, forma_fft, eixos) for chave, cubo in separar(deltas).items()
+        }
+        ultimo = k == len(deltas_eventos) - 1
+
+        # Fatias de bits das contagens do estado (1 fatia em casos usuais)
+        bits_fatia = (LIMITE_EXATO // len(deltas)).bit_length() - 1
+        maior = max(int(cubo.max()) for cubo in estado.values())
+        num_fatias = max(1, -(-maior.bit_length() // bits_fatia))
+        mascara = (1 << bits_fatia) - 1
+
+        espectros = {
+            chave: [
+                np.fft.rfftn((cubo >> (bits_fatia * i)) & mascara, forma_fft, eixos)
+                for i in range(num_fatias)
+            ]
+            for chave, cubo in estado.items()
+        }
+        estado = None
+
+        # Pares (chave do estado, chave do evento) agrupados pela chave somada
+        pares: dict[int, list[tuple[int, int]]] = {}
+        for c1 in espectros:
+            for c2 in evento:
+                pares.setdefault(c1 + c2, []).append((c1, c2))
+
+        novo_estado = {}
+        linhas, contagens = [], []
+        for chave, lista in pares.items():
+            cubo = np.zeros(forma, dtype=np.int64)
+            for i in range(num_fatias):
+                espectro = sum(espectros[c1][i] * evento[c2] for c1, c2 in lista)
+                parcial = np.fft.irfftn(espectro, forma_fft, eixos)[tuple(slice(n) for n in forma)]
+                cubo += _arredondar(parcial) << (bits_fatia * i)
+
+            if ultimo:
+                linhas.append(_extrair_linhas(cubo, chave, colunas_densas, colunas_esparsas,
+                                              pesos, bases))
+                contagens.append(cubo[cubo != 0])
+            else:
+                novo_estado[chave] = cubo
+
+        estado = novo_estado
+
+    if len(deltas_eventos) == 1:
+        linhas = [
+            _extrair_linhas(cubo, chave, colunas_densas, colunas_esparsas, pesos, bases)
+            for chave, cubo in estado.items()
+        ]
+        contagens = [cubo[cubo != 0] for cubo in estado.values()]
+
+    return np.concatenate(linhas), np.concatenate(contagens)
+
+
+def densidade(deltas_eventos: list[np.ndarray], colunas_densas: list[int]) -> float:
+    """
+    Combinações brutas por célula dos cubos antes do último evento.
+
+    O número de células é o de chaves esparsas atingíveis vezes o volume dos
+    cubos de pontos; acima de 1 há mais combinações que células e os cubos
+    tendem a ficar cheios, o caso em que a FFT supera a convolução por linhas.
+
+    Args:
+        deltas_eventos: Arrays (m, colunas) de deltas de cada evento
+        colunas_densas: Colunas representadas como eixos dos cubos densos
+
+    Returns:
+        Razão combinações / células (0 com um único evento, sem convolução)
+    """
+    anteriores = deltas_eventos[:-1]
+    if not anteriores:
+        return 0.0
+
+    colunas_esparsas = [
+        c for c in range(deltas_eventos[0].shape[1]) if c not in colunas_densas
+    ]
+    maximos = sum(d.max(axis=0).astype(np.int64) for d in anteriores)
+    bases = maximos[colunas_esparsas] + 1
+    pesos = np.r_[np.cumprod(bases[::-1])[::-1][1:], 1].astype(np.int64)
+
+    chaves = np.zeros(1, dtype=np.int64)
+    for deltas in anteriores:
+        chaves_evento = np.unique(deltas[:, colunas_esparsas].astype(np.int64) @ pesos)
+        chaves = np.unique((chaves[:, None] + chaves_evento[None, :]).ravel())
+
+    combinacoes = prod(len(d) for d in anteriores)
+    celulas = len(chaves) * prod(int(m) + 1 for m in maximos[colunas_densas])
+    return combinacoes / celulas
+
+
+def _arredondar(valores: np.ndarray) -> np.ndarray:
+    """Arredonda um resultado de FFT para int64, verificando a exatidão."""
+    arredondados = np.rint(valores)
+    if valores.size and np.abs(valores - arredondados).max() > TOLERANCIA_ARREDONDAMENTO:
+        raise ArithmeticError("Erro de arredondamento da FFT acima da tolerância")
+    return arredondados.astype(np.int64)
+
+
+def _extrair_linhas(
+    cubo: np.ndarray,
+    chave: int,
+    colunas_densas: list[int],
+    colunas_esparsas: list[int],
+    pesos: np.ndarray,
+    bases: np.ndarray,
+) -> np.ndarray:
+    """Converte as células não nulas de um cubo em linhas (n, colunas) int16."""
+    coordenadas = np.argwhere(cubo != 0)
+    linhas = np.empty((len(coordenadas), len(colunas_densas) + len(colunas_esparsas)),
+                      dtype=np.int16)
+    linhas[:, colunas_densas] = coordenadas
+    linhas[:, colunas_esparsas] = chave // pesos % bases
+    return linhas
+
+
+def _tamanho_rapido(n: int) -> int:
+    """Menor tamanho >= n da forma 2^a * 3^b * 5^c (FFT rápida)."""
+    tamanho = n
+    while True:
+        resto = tamanho
+        for fator in (2, 3, 5):
+            while resto % fator == 0:
+                resto //= fator
+        if resto == 1:
+            return tamanho
+        tamanho += 1
@@ -0,0 +1,71 @@
+"""
+Convolução em SQL para Cenários de Campeão F1 2025.
+
+Alternativa aos motores em Python: os deltas de cada evento viram tabelas
+temporárias no DuckDB e cada evento é combinado com os estados acumulados
+por CROSS JOIN seguido de GROUP BY com SUM das contagens. Junção e
+agregação rodam no executor do DuckDB, em todos os núcleos.
+"""
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+
+
+def registrar_deltas(
+    conn: duckdb.DuckDBPyConnection,
+    tabela: str,
+    deltas: np.ndarray,
+    colunas: list[str],
+) -> None:
+    """
+    Cria uma tabela temporária com os deltas únicos de um evento.
+
+    Args:
+        conn: Conexão DuckDB
+        tabela: Nome da tabela temporária
+        deltas: Array (m, colunas) de deltas do evento
+        colunas: Nome de cada coluna de deltas
+    """
+    conn.register('_deltas_evento', pa.table({c: deltas[:, j] for j, c in enumerate(colunas)}))
+    try:
+        conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {tabela} AS
+            SELECT {', '.join(colunas)}, COUNT(*)::BIGINT AS num_combinacoes
+            FROM _deltas_evento
+            GROUP BY ALL
+        """)
+    finally:
+        conn.unregister('_deltas_evento')
+
+
+def convoluir_sql(
+    conn: duckdb.DuckDBPyConnection,
+    estados: str,
+    deltas: str,
+    destino: str,
+    colunas: list[str],
+) -> int:
+    """
+    Combina os estados acumulados com todos os deltas de um evento.
+
+    Args:
+        conn: Conexão DuckDB
+        estados: Tabela de estados acumulados (colunas + num_combinacoes)
+        deltas: Tabela de deltas do evento (ver registrar_deltas)
+        destino: Tabela temporária criada com os estados após o evento
+        colunas: Colunas de deltas, comuns às duas tabelas
+
+    Returns:
+        Número de estados únicos em destino
+    """
+    somas = ', '.join(f'e.{c} + d.{c} AS {c}' for c in colunas)
+    conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE {destino} AS
+        SELECT {somas},
+               SUM(e.num_combinacoes * d.num_combinacoes)::BIGINT AS num_combinacoes
+        FROM {estados} e
+        CROSS JOIN {deltas} d
+        GROUP BY ALL
+    """)
+    return conn.execute(f"SELECT COUNT(*) FROM {destino}").fetchone()[0]
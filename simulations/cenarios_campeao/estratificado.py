@@ -0,0 +1,432 @@
+"""
+Amostragem estratificada com intervalos de confiança para Cenários de Campeão F1 2025.
+
+Estima as chances de título do modelo de Plackett–Luce (ver monte_carlo)
+com erro padrão por piloto, gastando menos amostras que a força bruta:
+
+- Estratos: as primeiras posições (profundidade) do primeiro evento
+  restante. Em Plackett–Luce a probabilidade de cada prefixo é exata
+  (produto de força / força restante) e, dado o prefixo, o resto da ordem
+  volta a ser Plackett–Luce, então cada estrato é amostrado diretamente.
+- Alocação de Neyman: uma rodada piloto estima o desvio de cada estrato e
+  as rodadas seguintes distribuem as amostras necessárias para a meia
+  largura pedida do intervalo de 95%.
+- Variáveis antitéticas: cada amostra é um par (U, 1 − U) de uniformes,
+  convertidos em ruído Gumbel.
+- Números aleatórios comuns: cada bloco usa uma semente derivada de
+  (semente, estrato, bloco). Cenários comparados em comparar_forcas usam os
+  mesmos uniformes, e a diferença entre eles tem variância menor.
+
+Os blocos são independentes e rodam em paralelo; o resultado não depende
+do número de processos.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from itertools import permutations
+
+import numpy as np
+
+from simulations.cenarios_campeao.monte_carlo import FORCAS_GRID, Z_95, tabela_pontos_grid
+from simulations.cenarios_campeao.simulator import (
+    CAMPEONATO,
+    Campeonato,
+    determinar_campeoes,
+)
+
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Posições do primeiro evento que definem o estrato (20 × 19 = 380 estratos)
+PROFUNDIDADE_PADRAO = 2
+
+# Amostras por estrato na rodada piloto
+AMOSTRAS_PILOTO = 32
+
+# Mínimo de amostras por estrato (média e variância amostral definidas)
+AMOSTRAS_MINIMAS = 2
+
+# Amostras (pares antitéticos) por bloco de trabalho
+AMOSTRAS_POR_BLOCO = 50_000
+
+# Limite total de amostras somando todas as rodadas
+AMOSTRAS_MAXIMAS = 5_000_000
+
+# Rodadas de realocação após a rodada piloto
+RODADAS_MAXIMAS = 4
+
+# Meia largura alvo do intervalo de 95% de cada chance
+MEIA_LARGURA_PADRAO = 2e-3
+
+
+# =============================================================================
+# ESTRUTURAS DE DADOS
+# =============================================================================
+
+@dataclass(frozen=True, eq=False)
+class Cenario:
+    """Forças de um cenário e seu coeficiente na quantidade estimada."""
+    log_forcas: np.ndarray  # (grid,)
+    pesos_estratos: np.ndarray  # probabilidade de cada estrato neste cenário
+    coeficiente: float  # +1 para a chance, +1/−1 para diferenças
+
+
+@dataclass(frozen=True, eq=False)
+class ResultadoEstratificado:
+    """Estimativas por piloto com erro padrão e intervalo de 95%."""
+    chances: dict[str, float]  # chance (ou diferença de chances) por piloto
+    erros: dict[str, float]  # erro padrão de cada estimativa
+    amostras: int  # total de amostras (pares antitéticos contam como uma)
+    estratos: int
+    convergiu: bool
+
+    def intervalos(self) -> dict[str, tuple[float, float]]:
+        """Intervalo de 95% de cada estimativa."""
+        return {
+            p: (self.chances[p] - Z_95 * self.erros[p], self.chances[p] + Z_95 * self.erros[p])
+            for p in self.chances
+        }
+
+
+# =============================================================================
+# ESTRATOS
+# =============================================================================
+
+def gerar_estratos(tamanho_grid: int, profundidade: int) -> np.ndarray:
+    """
+    Enumera os prefixos ordenados (1º, 2º, ...) do primeiro evento.
+
+    Returns:
+        Array (estratos, profundidade) de índices no grid
+    """
+    return np.array(list(permutations(range(tamanho_grid), profundidade)), dtype=np.int64)
+
+
+def probabilidades_estratos(forcas: np.ndarray, estratos: np.ndarray) -> np.ndarray:
+    """
+    Probabilidade exata de Plackett–Luce de cada prefixo.
+
+    P(a, b, ...) = w_a / S × w_b / (S − w_a) × ...
+
+    Args:
+        forcas: Array (grid,) de forças positivas
+        estratos: Array (estratos, profundidade) de gerar_estratos
+
+    Returns:
+        Array (estratos,) que soma 1
+    """
+    restante = np.full(len(estratos), forcas.sum())
+    probabilidades = np.ones(len(estratos))
+    for j in range(estratos.shape[1]):
+        escolhidos = forcas[estratos[:, j]]
+        probabilidades *= escolhidos / restante
+        restante -= escolhidos
+    return probabilidades
+
+
+# =============================================================================
+# AMOSTRAGEM POR BLOCO
+# =============================================================================
+
+def _posicoes(
+    uniformes: np.ndarray,
+    log_forcas: np.ndarray,
+    indices: np.ndarray,
+    prefixo: np.ndarray | None,
+) -> np.ndarray:
+    """
+    Converte uniformes em posições de Plackett–Luce dos pilotos indices.
+
+    Com prefixo, os pilotos do prefixo ocupam as primeiras posições em
+    ordem e os demais são ordenados pelas notas de Gumbel.
+    """
+    notas = log_forcas - np.log(-np.log(uniformes))
+    if prefixo is not None:
+        notas[:, prefixo] = np.inf
+    posicoes = 1 + (notas[:, :, None] > notas[:, None, indices]).sum(axis=1)
+
+    if prefixo is not None:
+        for j, piloto in enumerate(prefixo):
+            posicoes[:, indices == piloto] = j + 1
+    return posicoes
+
+
+def _indicadores(
+    uniformes_eventos: list[np.ndarray],
+    cenario: Cenario,
+    prefixo: np.ndarray,
+    indices: np.ndarray,
+    tabelas: list[np.ndarray],
+    atual: np.ndarray,
+    pilotos: tuple[str, ...],
+) -> np.ndarray:
+    """Array (n, pilotos) com 1 onde o piloto é campeão em um cenário."""
+    deltas = np.zeros((len(uniformes_eventos[0]),) + atual.shape, dtype=np.int64)
+    for k, (uniformes, tabela) in enumerate(zip(uniformes_eventos, tabelas)):
+        posicoes = _posicoes(uniformes, cenario.log_forcas, indices, prefixo if k == 0 else None)
+        deltas[:, :, 0] += tabela[posicoes]
+        deltas[:, :, 1] += posicoes == 1
+        deltas[:, :, 2] += posicoes == 2
+        deltas[:, :, 3] += posicoes == 3
+
+    campeoes, _ = determinar_campeoes(deltas + atual, pilotos)
+    return np.eye(len(pilotos))[campeoes]
+
+
+def _amostrar_bloco(
+    semente: int,
+    estrato: int,
+    bloco: int,
+    tamanho: int,
+    prefixo: np.ndarray,
+    cenarios: list[Cenario],
+    indices: np.ndarray,
+    tabelas: list[np.ndarray],
+    atual: np.ndarray,
+    pilotos: tuple[str, ...],
+    antitetico: bool,
+) -> tuple[int, np.ndarray, np.ndarray]:
+    """
+    Amostra um bloco de um estrato.
+
+    Cada amostra vale y = Σ coeficiente × P(estrato | cenário) × indicador,
+    de modo que a soma das médias por estrato estima a quantidade pedida.
+
+    Returns:
+        (n, soma de y, soma de y²) por piloto
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(semente, spawn_key=(estrato, bloco)))
+    tamanho_grid = len(cenarios[0].log_forcas)
+    uniformes = [rng.random((tamanho, tamanho_grid)) for _ in tabelas]
+
+    # Variáveis antitéticas: a amostra é a média do par (U, 1 − U)
+    lados = [uniformes, [1 - u for u in uniformes]] if antitetico else [uniformes]
+
+    valores = np.zeros((tamanho, len(pilotos)))
+    for lado in lados:
+        for cenario in cenarios:
+            peso = cenario.coeficiente * cenario.pesos_estratos[estrato] / len(lados)
+            valores += peso * _indicadores(lado, cenario, prefixo, indices, tabelas, atual, pilotos)
+
+    return tamanho, valores.sum(axis=0), (valores ** 2).sum(axis=0)
+
+
+# =============================================================================
+# ESTIMAÇÃO
+# =============================================================================
+
+def _alocacao_neyman(
+    n: np.ndarray,
+    soma: np.ndarray,
+    soma_q: np.ndarray,
+    meia_largura: float,
+) -> np.ndarray:
+    """
+    Amostras por estrato para atingir meia_largura em todos os pilotos.
+
+    Para cada piloto, n_h ∝ σ_h com total (z Σ σ_h / meia_largura)²; a
+    alocação final é o máximo entre pilotos.
+
+    Args:
+        n, soma, soma_q: Momentos acumulados (estratos,) e (estratos, pilotos)
+
+    Returns:
+        Array (estratos,) com o total desejado de amostras por estrato
+    """
+    desvios = _desvios(n, soma, soma_q)
+    totais = (Z_95 * desvios.sum(axis=0) / meia_largura) ** 2
+    fracoes = desvios / np.where(desvios.sum(axis=0) > 0, desvios.sum(axis=0), 1)
+    return np.ceil((fracoes * totais).max(axis=1)).astype(np.int64)
+
+
+def _estimar(
+    campeonato: Campeonato,
+    grid: list[str],
+    cenarios: list[Cenario],
+    estratos: np.ndarray,
+    meia_largura: float,
+    semente: int,
+    antitetico: bool,
+    trabalhadores: int | None,
+    amostras_piloto: int,
+    amostras_maximas: int,
+) -> ResultadoEstratificado:
+    """Rodada piloto + realocações de Neyman até a meia largura pedida."""
+    pilotos = campeonato.pilotos
+    indices = np.array([grid.index(p) for p in pilotos])
+    tabelas = [tabela_pontos_grid(e, len(grid)) for e in campeonato.eventos]
+    atual = campeonato.classificacao()
+
+    num_estratos = len(estratos)
+    n = np.zeros(num_estratos, dtype=np.int64)
+    soma = np.zeros((num_estratos, len(pilotos)))
+    soma_q = np.zeros((num_estratos, len(pilotos)))
+    blocos = np.zeros(num_estratos, dtype=np.int64)
+    alvo = np.full(num_estratos, amostras_piloto)
+
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    contexto = ProcessPoolExecutor(max_workers=trabalhadores) if trabalhadores > 1 else nullcontext()
+    convergiu = False
+
+    with contexto as executor:
+        for rodada in range(RODADAS_MAXIMAS + 1):
+            faltam = np.maximum(alvo - n, 0)
+            orcamento = amostras_maximas - n.sum()
+            if faltam.sum() > orcamento:
+                # O mínimo por estrato vem antes da redistribuição proporcional
+                minimo = np.minimum(faltam, np.maximum(AMOSTRAS_MINIMAS - n, 0))
+                extra = faltam - minimo
+                resto = max(orcamento - minimo.sum(), 0)
+                faltam = minimo + np.floor(extra * resto / max(extra.sum(), 1)).astype(np.int64)
+
+            tarefas = []
+            for h in np.flatnonzero(faltam):
+                for inicio in range(0, faltam[h], AMOSTRAS_POR_BLOCO):
+                    tamanho = min(AMOSTRAS_POR_BLOCO, faltam[h] - inicio)
+                    tarefas.append((semente, h, blocos[h], tamanho, estratos[h], cenarios,
+                                    indices, tabelas, atual, pilotos, antitetico))
+                    blocos[h] += 1
+
+            mapa = map if executor is None else executor.map
+            resultados = mapa(_amostrar_bloco, *zip(*tarefas)) if tarefas else []
+            for tarefa, (tamanho, s, s2) in zip(tarefas, resultados):
+                h = tarefa[1]
+                n[h] += tamanho
+                soma[h] += s
+                soma_q[h] += s2
+
+            variancias = _variancias(n, soma, soma_q)
+            meia = Z_95 * np.sqrt(variancias.max())
+            print(f"  Rodada {rodada}: {n.sum():>10,} amostras | ±{meia:.4%}")
+
+            if meia <= meia_largura:
+                convergiu = True
+                break
+            if n.sum() >= amostras_maximas:
+                break
+            alvo = np.maximum(_alocacao_neyman(n, soma, soma_q, meia_largura), n)
+
+    estimativas = (soma / n[:, None]).sum(axis=0)
+    return ResultadoEstratificado(
+        chances=dict(zip(pilotos, estimativas.tolist())),
+        erros=dict(zip(pilotos, np.sqrt(variancias).tolist())),
+        amostras=int(n.sum()),
+        estratos=num_estratos,
+        convergiu=convergiu,
+    )
+
+
+def _desvios(n: np.ndarray, soma: np.ndarray, soma_q: np.ndarray) -> np.ndarray:
+    """Desvio padrão amostral (estratos, pilotos) a partir dos momentos."""
+    media = soma / n[:, None]
+    return np.sqrt(np.maximum(soma_q / n[:, None] - media ** 2, 0) * n[:, None] / (n[:, None] - 1))
+
+
+def _variancias(n: np.ndarray, soma: np.ndarray, soma_q: np.ndarray) -> np.ndarray:
+    """Variância do estimador estratificado por piloto: Σ s_h² / n_h."""
+    return (_desvios(n, soma, soma_q) ** 2 / n[:, None]).sum(axis=0)
+
+
+def _cenario(
+    forcas: dict[str, float],
+    grid: list[str],
+    estratos: np.ndarray,
+    coeficiente: float,
+) -> Cenario:
+    """Monta um cenário com as forças na ordem do grid."""
+    valores = np.array([forcas[p] for p in grid], dtype=np.float64)
+    if valores.min() <= 0:
+        raise ValueError("Forças de Plackett–Luce devem ser positivas")
+    return Cenario(np.log(valores), probabilidades_estratos(valores, estratos), coeficiente)
+
+
+def estimar_chances(
+    campeonato: Campeonato = CAMPEONATO,
+    forcas: dict[str, float] = FORCAS_GRID,
+    profundidade: int = PROFUNDIDADE_PADRAO,
+    meia_largura: float = MEIA_LARGURA_PADRAO,
+    semente: int = 2025,
+    antitetico: bool = True,
+    trabalhadores: int | None = 1,
+    amostras_piloto: int = AMOSTRAS_PILOTO,
+    amostras_maximas: int = AMOSTRAS_MAXIMAS,
+) -> ResultadoEstratificado:
+    """
+    Estima as chances de título com amostragem estratificada.
+
+    Args:
+        campeonato: Pilotos da disputa, eventos restantes e classificação
+        forcas: Força de Plackett–Luce de cada piloto do grid
+        profundidade: Posições do primeiro evento que definem o estrato
+        meia_largura: Meia largura alvo do intervalo de 95% de cada chance
+        semente: Semente base; blocos usam (semente, estrato, bloco)
+        antitetico: Usa pares antitéticos (U, 1 − U)
+        trabalhadores: Processos para os blocos (None = todos os núcleos)
+        amostras_piloto: Amostras por estrato na rodada piloto (>= 2)
+        amostras_maximas: Limite total de amostras; cada estrato recebe ao
+            menos AMOSTRAS_MINIMAS mesmo que o limite seja menor
+
+    Returns:
+        Chances com erro padrão por piloto
+
+    Raises:
+        ValueError: Se um piloto da disputa não está em forcas ou alguma
+            força não é positiva
+    """
+    ausentes = [p for p in campeonato.pilotos if p not in forcas]
+    if ausentes:
+        raise ValueError(f"Pilotos da disputa sem força no grid: {ausentes}")
+
+    grid = list(forcas)
+    estratos = gerar_estratos(len(grid), profundidade)
+    print(f"\n[Estratificado] {len(estratos):,} estratos (top {profundidade} de "
+          f"{campeonato.eventos[0].nome}), alvo ±{meia_largura:.2%}")
+
+    return _estimar(
+        campeonato, grid, [_cenario(forcas, grid, estratos, 1.0)], estratos, meia_largura,
+        semente, antitetico, trabalhadores, max(AMOSTRAS_MINIMAS, amostras_piloto), amostras_maximas,
+    )
+
+
+def comparar_forcas(
+    forcas_a: dict[str, float],
+    forcas_b: dict[str, float],
+    campeonato: Campeonato = CAMPEONATO,
+    profundidade: int = PROFUNDIDADE_PADRAO,
+    meia_largura: float = MEIA_LARGURA_PADRAO,
+    semente: int = 2025,
+    antitetico: bool = True,
+    trabalhadores: int | None = 1,
+    amostras_piloto: int = AMOSTRAS_PILOTO,
+    amostras_maximas: int = AMOSTRAS_MAXIMAS,
+) -> ResultadoEstratificado:
+    """
+    Estima a diferença de chances (a − b) com números aleatórios comuns.
+
+    Os dois cenários são avaliados sobre os mesmos uniformes em cada
+    estrato, então a variância da diferença desconta a covariância entre
+    eles. Argumentos como em estimar_chances; os dois dicionários de forças
+    devem ter os mesmos pilotos.
+
+    Returns:
+        Diferenças de chance por piloto com erro padrão
+    """
+    if set(forcas_a) != set(forcas_b):
+        raise ValueError("Os dois cenários devem ter o mesmo grid")
+    ausentes = [p for p in campeonato.pilotos if p not in forcas_a]
+    if ausentes:
+        raise ValueError(f"Pilotos da disputa sem força no grid: {ausentes}")
+
+    grid = list(forcas_a)
+    estratos = gerar_estratos(len(grid), profundidade)
+    cenarios = [_cenario(forcas_a, grid, estratos, 1.0), _cenario(forcas_b, grid, estratos, -1.0)]
+    print(f"\n[Estratificado] Diferença entre cenários, {len(estratos):,} estratos")
+
+    return _estimar(
+        campeonato, grid, cenarios, estratos, meia_largura, semente, antitetico,
+        trabalhadores, max(AMOSTRAS_MINIMAS, amostras_piloto), amostras_maximas,
+    )
@@ -0,0 +1,196 @@
+"""
+Resultados concretos por trás de um estado de Cenários de Campeão F1 2025.
+
+A tabela cenarios_campeao guarda só o estado (deltas somados) e quantas
+combinações o produzem. Aqui as combinações de posições de um estado são
+geradas sob demanda, sem reenumerar o espaço bruto (~550M):
+
+- Índice por evento: cada delta único aponta para as linhas de posições
+  que o produzem (gerar_posicoes + posicoes_para_deltas).
+- Histogramas de sufixo: para cada k, os deltas somados dos eventos k..n
+  e suas contagens. Com eles, cada escolha de delta no evento k sabe
+  quantas combinações completam o estado, o que permite pular direto para
+  qualquer página sem gerar as anteriores.
+"""
+
+from dataclasses import fields
+from itertools import islice
+from typing import Iterator
+
+import numpy as np
+
+from simulations.cenarios_campeao.codec import CodecEstado
+from simulations.cenarios_campeao.convolucao import agregar, convoluir
+from simulations.cenarios_campeao.simulator import (
+    CAMPEONATO,
+    ESTATISTICAS_TABELA,
+    Campeonato,
+    Delta,
+    gerar_posicoes,
+    posicoes_para_deltas,
+)
+
+
+# Combinações por página na listagem do dashboard
+TAMANHO_PAGINA = 20
+
+# Resultado concreto: {evento: {piloto: posição}} (FORA_PONTOS = fora dos pontos)
+Combinacao = dict[str, dict[str, int]]
+
+
+def estado_da_linha(linha, pilotos: tuple[str, ...] = CAMPEONATO.pilotos) -> np.ndarray:
+    """
+    Extrai o estado (pilotos, 4) das colunas delta_* de uma linha da tabela.
+
+    Args:
+        linha: Linha de cenarios_campeao (dict ou pd.Series)
+        pilotos: Pilotos do campeonato, na ordem do estado
+
+    Returns:
+        Array (pilotos, 4) de pontos, vitórias, segundos e terceiros ganhos
+    """
+    return np.array(
+        [[linha[f'delta_{estatistica}_{p}'] for estatistica, _ in ESTATISTICAS_TABELA]
+         for p in pilotos],
+        dtype=np.int64,
+    )
+
+
+class IndiceCombinacoes:
+    """
+    Busca inversa: estado -> combinações de posições que o produzem.
+
+    Construído uma vez por campeonato (só depende de pilotos e eventos, não
+    da classificação). O custo é a convolução dos eventos 2..n, menor que a
+    simulação completa.
+    """
+
+    def __init__(self, campeonato: Campeonato = CAMPEONATO):
+        """
+        Args:
+            campeonato: Pilotos e eventos restantes
+
+        Raises:
+            ValueError: Se os estados não cabem em uma chave int64
+        """
+        self.campeonato = campeonato
+        num_pilotos = len(campeonato.pilotos)
+        grades = [gerar_posicoes(e, num_pilotos) for e in campeonato.eventos]
+        deltas_eventos = [posicoes_para_deltas(e, g) for e, g in zip(campeonato.eventos, grades)]
+        self.codec = CodecEstado.para_eventos(deltas_eventos)
+        if not self.codec.compacto:
+            raise ValueError("Estados não cabem em uma chave int64: reduza pilotos ou eventos")
+
+        # Índice por evento: deltas únicos e, para cada um, suas linhas de posições
+        self.eventos = []
+        for grade, deltas in zip(grades, deltas_eventos):
+            chaves = self.codec.codificar(deltas)
+            ordem = np.argsort(chaves, kind='stable')
+            unicas, inicios, tamanhos = np.unique(chaves[ordem], return_index=True, return_counts=True)
+            self.eventos.append((
+                deltas[ordem[inicios]].astype(np.int64), unicas, grade[ordem], inicios, tamanhos,
+            ))
+
+        # Histogramas de sufixo (k..n) para k >= 1, do último evento para o segundo;
+        # o sufixo completo (k = 0) seria o histograma final e não é necessário
+        self.sufixos = [None] * len(deltas_eventos)
+        estados, contagens = self.eventos[-1][1], self.eventos[-1][4].astype(np.int64)
+        self.sufixos[-1] = (estados, contagens)
+        for k in range(len(deltas_eventos) - 2, 0, -1):
+            estados, contagens = convoluir(estados, contagens, self.codec.codificar(deltas_eventos[k]))
+            self.sufixos[k] = agregar(estados, contagens)
+
+    def _contar_sufixo(self, k: int, restos: np.ndarray) -> np.ndarray:
+        """Combinações dos eventos k..n que somam cada linha de restos (0 se nenhuma)."""
+        contagens = np.zeros(len(restos), dtype=np.int64)
+        validos = (restos >= 0).all(axis=1) & (restos <= self.codec.maximos).all(axis=1)
+        if not validos.any():
+            return contagens
+
+        estados, somas = self.sufixos[k]
+        chaves = self.codec.codificar(restos[validos])
+        posicao = np.minimum(np.searchsorted(estados, chaves), len(estados) - 1)
+        encontrados = estados[posicao] == chaves
+        contagens[np.flatnonzero(validos)[encontrados]] = somas[posicao[encontrados]]
+        return contagens
+
+    def _candidatos(self, k: int, alvo: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Deltas do evento k que ainda permitem chegar a alvo.
+
+        Returns:
+            (candidatos, completam, restos): índices dos deltas únicos do
+            evento, combinações dos eventos k+1..n que completam cada um e
+            o que falta somar depois de cada delta único
+        """
+        restos = alvo - self.eventos[k][0]
+        if k == len(self.eventos) - 1:
+            candidatos = np.flatnonzero((restos == 0).all(axis=1))
+            return candidatos, np.ones(len(candidatos), dtype=np.int64), restos
+
+        completam = self._contar_sufixo(k + 1, restos)
+        candidatos = np.flatnonzero(completam)
+        return candidatos, completam[candidatos], restos
+
+    def contar(self, estado: np.ndarray) -> int:
+        """Número de combinações que produzem o estado (pilotos, 4)."""
+        candidatos, completam, _ = self._candidatos(0, np.asarray(estado, dtype=np.int64).reshape(-1))
+        return int((self.eventos[0][4][candidatos] * completam).sum())
+
+    def _gerar(self, k: int, alvo: np.ndarray, pular: int) -> Iterator[tuple[np.ndarray, ...]]:
+        """Linhas de posições dos eventos k..n que somam alvo, a partir da pular-ésima."""
+        _, _, grade, inicios, tamanhos = self.eventos[k]
+        candidatos, completam, restos = self._candidatos(k, alvo)
+
+        for c, por_linha in zip(candidatos, completam):
+            por_linha = int(por_linha)
+            if pular >= tamanhos[c] * por_linha:
+                pular -= int(tamanhos[c]) * por_linha
+                continue
+
+            # Pula linhas inteiras deste delta; o resto vai para o sufixo
+            primeira, pular = divmod(pular, por_linha)
+            for linha in grade[inicios[c] + primeira:inicios[c] + tamanhos[c]]:
+                if k == len(self.eventos) - 1:
+                    yield (linha,)
+                else:
+                    for sufixo in self._gerar(k + 1, restos[c], pular):
+                        yield (linha,) + sufixo
+                pular = 0
+
+    def combinacoes(self, estado: np.ndarray, inicio: int = 0) -> Iterator[Combinacao]:
+        """
+        Gera, sob demanda, as combinações de posições que produzem o estado.
+
+        A ordem é determinística; inicio pula as primeiras combinações sem
+        gerá-las.
+
+        Args:
+            estado: Array (pilotos, 4) de deltas (ver estado_da_linha)
+            inicio: Índice da primeira combinação gerada
+
+        Yields:
+            {evento: {piloto: posição}}
+
+        Raises:
+            ValueError: Se o estado não tem uma linha de 4 estatísticas por piloto
+        """
+        if len(np.asarray(estado).reshape(-1)) != len(self.campeonato.pilotos) * len(fields(Delta)):
+            raise ValueError(f"Estado deve ter forma ({len(self.campeonato.pilotos)}, 4)")
+
+        alvo = np.asarray(estado, dtype=np.int64).reshape(-1)
+        pilotos = self.campeonato.pilotos
+        for linhas in self._gerar(0, alvo, inicio):
+            yield {
+                evento.nome: dict(zip(pilotos, map(int, linha)))
+                for evento, linha in zip(self.campeonato.eventos, linhas)
+            }
+
+    def pagina(
+        self,
+        estado: np.ndarray,
+        pagina: int = 0,
+        tamanho: int = TAMANHO_PAGINA,
+    ) -> list[Combinacao]:
+        """Combinações [pagina * tamanho, (pagina + 1) * tamanho) do estado."""
+        return list(islice(self.combinacoes(estado, pagina * tamanho), tamanho))
@@ -5,9 +5,23 @@ Gerencia conexão com banco, filtros da sidebar e funções auxiliares.
 
 import streamlit as st
 import pandas as pd
+import pyarrow.compute as pc
 import duckdb
 
-from database.connection import get_connection
+from database.connection import read_lock, session_cursor
+from simulations.cenarios_campeao.simulator import NIVEIS_RESUMO
+from simulations.cenarios_campeao.monte_carlo import Z_95
+from simulations.cenarios_campeao.condicoes import CondicaoTitulo, condicoes_titulo
+from simulations.cenarios_campeao.estratificado import (
+    MEIA_LARGURA_PADRAO,
+    ResultadoEstratificado,
+    estimar_chances,
+)
+from simulations.cenarios_campeao.exemplos import (
+    IndiceCombinacoes,
+    TAMANHO_PAGINA,
+    estado_da_linha,
+)
 
 
 # =============================================================================
@@ -54,10 +68,20 @@ def label_posicao(posicao: int) -> str:
 # CONEXÃO CACHE
 # =============================================================================
 
-@st.cache_resource
 def get_db_connection():
-    """Retorna conexão com banco de dados (cacheada)."""
-    return get_connection()
+    """
+    Retorna o cursor somente leitura da sessão (conexão compartilhada).
+
+    Quem consulta roda sob @read_lock(), para um build no mesmo processo
+    não fechar a conexão no meio da consulta.
+    """
+    return session_cursor(st.session_state)
+
+
+@st.cache_resource
+def get_indice_combinacoes() -> IndiceCombinacoes:
+    """Retorna o índice de combinações por estado (construído uma vez)."""
+    return IndiceCombinacoes()
 
 
 # =============================================================================
@@ -65,91 +89,134 @@ def get_db_connection():
 # =============================================================================
 
 @st.cache_data(ttl=300)
+@read_lock()
 def carregar_estatisticas_resumo() -> dict:
     """
     Carrega estatísticas resumo do banco.
 
+    Uma única consulta a resumo_cenarios (todos os agrupamentos, gerados
+    por GROUPING SETS no build) devolve uma tabela Arrow, separada aqui por
+    nível.
+
     Returns:
         Dicionário com estatísticas por campeão e totais
     """
     conn = get_db_connection()
 
-    # Total geral
-    totais = conn.execute("""
-        SELECT COUNT(*) as estados, SUM(num_combinacoes) as combinacoes
-        FROM cenarios_campeao
-    """).fetchone()
+    resumo = conn.execute("""
+        SELECT nivel, campeao, metodo_decisao, combinacoes, estados, pct
+        FROM resumo_cenarios
+        ORDER BY nivel, combinacoes DESC
+    """).fetch_arrow_table()
 
-    # Por campeão
-    por_campeao = conn.execute("""
-        SELECT
-            campeao,
-            SUM(num_combinacoes) as combinacoes,
-            COUNT(*) as estados,
-            ROUND(100.0 * SUM(num_combinacoes) /
-                  (SELECT SUM(num_combinacoes) FROM cenarios_campeao), 2) as chance
-        FROM cenarios_campeao
-        GROUP BY campeao
-        ORDER BY combinacoes DESC
-    """).fetchdf()
+    def nivel(nome: str, colunas: list[str], casas: int) -> pd.DataFrame:
+        linhas = resumo.filter(pc.equal(resumo['nivel'], NIVEIS_RESUMO[nome]))
+        df = linhas.select(colunas + ['pct']).to_pandas()
+        df['pct'] = df['pct'].round(casas)
+        return df
 
-    # Por método
-    por_metodo = conn.execute("""
-        SELECT
-            metodo_decisao,
-            SUM(num_combinacoes) as combinacoes,
-            ROUND(100.0 * SUM(num_combinacoes) /
-                  (SELECT SUM(num_combinacoes) FROM cenarios_campeao), 2) as pct
-        FROM cenarios_campeao
-        GROUP BY metodo_decisao
-        ORDER BY combinacoes DESC
-    """).fetchdf()
+    total = nivel('total', ['combinacoes', 'estados'], 2)
 
-    # Campeão x Método
-    campeao_metodo = conn.execute("""
-        SELECT
-            campeao,
-            metodo_decisao,
-            SUM(num_combinacoes) as combinacoes,
-            ROUND(100.0 * SUM(num_combinacoes) /
-                  (SELECT SUM(num_combinacoes) FROM cenarios_campeao), 4) as pct
-        FROM cenarios_campeao
-        GROUP BY campeao, metodo_decisao
-        ORDER BY campeao, combinacoes DESC
-    """).fetchdf()
+    por_campeao = nivel('campeao', ['campeao', 'combinacoes', 'estados'], 2)
+    por_campeao = por_campeao.rename(columns={'pct': 'chance'})
 
     return {
-        'total_estados': totais[0],
-        'total_combinacoes': totais[1],
+        'total_estados': int(total['estados'].iloc[0]),
+        'total_combinacoes': int(total['combinacoes'].iloc[0]),
         'por_campeao': por_campeao,
-        'por_metodo': por_metodo,
-        'campeao_metodo': campeao_metodo,
+        'por_metodo': nivel('metodo', ['metodo_decisao', 'combinacoes'], 2),
+        'campeao_metodo': nivel('campeao_metodo', ['campeao', 'metodo_decisao', 'combinacoes'], 4)
+            .sort_values(['campeao', 'combinacoes'], ascending=[True, False], ignore_index=True),
     }
 
 
 @st.cache_data(ttl=300)
-def carregar_distribuicao_pontos() -> pd.DataFrame:
+@read_lock()
+def carregar_estatisticas_pontos() -> pd.DataFrame:
     """
-    Carrega distribuição de pontos finais por piloto.
+    Carrega estatísticas de caixa dos pontos finais de cada piloto.
+
+    Calculadas no DuckDB sobre distribuicao_pontos, ponderadas por
+    combinações: os quartis são a primeira pontuação cuja fração acumulada
+    alcança 25%, 50% e 75%, e os limites são as pontuações extremas dentro
+    de 1,5 x IQR dos quartis (bigodes de Tukey). Devolve uma linha por
+    piloto em vez da distribuição.
 
     Returns:
-        DataFrame com ranges de pontos e contagens ponderadas
+        DataFrame (piloto, combinacoes, minimo, q1, mediana, q3, maximo,
+        limite_inferior, limite_superior, media)
     """
     conn = get_db_connection()
 
     df = conn.execute("""
+        WITH acumulado AS (
+            SELECT
+                piloto,
+                pontos,
+                combinacoes,
+                SUM(combinacoes) OVER (PARTITION BY piloto ORDER BY pontos)
+                    / SUM(combinacoes) OVER (PARTITION BY piloto) AS fracao
+            FROM distribuicao_pontos
+        ),
+        caixas AS (
+            SELECT
+                piloto,
+                SUM(combinacoes)::BIGINT AS combinacoes,
+                MIN(pontos) AS minimo,
+                MIN(pontos) FILTER (WHERE fracao >= 0.25) AS q1,
+                MIN(pontos) FILTER (WHERE fracao >= 0.5) AS mediana,
+                MIN(pontos) FILTER (WHERE fracao >= 0.75) AS q3,
+                MAX(pontos) AS maximo,
+                SUM(pontos * combinacoes) / SUM(combinacoes) AS media
+            FROM acumulado
+            GROUP BY piloto
+        )
         SELECT
-            pts_final_norris,
-            pts_final_piastri,
-            pts_final_verstappen,
-            num_combinacoes
-        FROM cenarios_campeao
+            c.piloto, c.combinacoes, c.minimo, c.q1, c.mediana, c.q3, c.maximo,
+            MIN(a.pontos) FILTER (WHERE a.pontos >= c.q1 - 1.5 * (c.q3 - c.q1)) AS limite_inferior,
+            MAX(a.pontos) FILTER (WHERE a.pontos <= c.q3 + 1.5 * (c.q3 - c.q1)) AS limite_superior,
+            c.media
+        FROM caixas c
+        JOIN acumulado a USING (piloto)
+        GROUP BY ALL
+        ORDER BY c.piloto
+    """).fetchdf()
+
+    return df
+
+
+@st.cache_data(ttl=300)
+@read_lock()
+def carregar_histograma_pontos(largura: int = 5) -> pd.DataFrame:
+    """
+    Carrega histograma ponderado dos pontos finais de cada piloto.
+
+    Args:
+        largura: Largura de cada faixa, em pontos
+
+    Returns:
+        DataFrame (piloto, faixa, combinacoes, pct), uma linha por faixa não
+        vazia; faixa é o início da faixa [faixa, faixa + largura)
+    """
+    conn = get_db_connection()
+
+    largura = max(1, int(largura))
+    df = conn.execute(f"""
+        SELECT
+            piloto,
+            (pontos // {largura}) * {largura} AS faixa,
+            SUM(combinacoes)::BIGINT AS combinacoes,
+            100.0 * SUM(combinacoes) / SUM(SUM(combinacoes)) OVER (PARTITION BY piloto) AS pct
+        FROM distribuicao_pontos
+        GROUP BY piloto, faixa
+        ORDER BY piloto, faixa
     """).fetchdf()
 
     return df
 
 
 @st.cache_data(ttl=300)
+@read_lock()
 def carregar_cenarios_vitoria(piloto: str) -> pd.DataFrame:
     """
     Carrega cenários em que um piloto específico é campeão.
@@ -173,6 +240,7 @@ def carregar_cenarios_vitoria(piloto: str) -> pd.DataFrame:
 
 
 @st.cache_data(ttl=300)
+@read_lock()
 def carregar_cenarios_filtrados(
     campeao: str | None = None,
     metodo: str | None = None,
@@ -236,7 +304,37 @@ def carregar_cenarios_filtrados(
     return conn.execute(query).fetchdf()
 
 
+def carregar_exemplos_cenario(
+    linha: pd.Series,
+    pagina: int = 0,
+    tamanho: int = TAMANHO_PAGINA,
+) -> pd.DataFrame:
+    """
+    Carrega uma página das combinações de posições por trás de um cenário.
+
+    Args:
+        linha: Linha de cenarios_campeao (colunas delta_*)
+        pagina: Página, a partir de 0
+        tamanho: Combinações por página
+
+    Returns:
+        DataFrame com uma linha por combinação e uma coluna por evento e piloto
+    """
+    indice = get_indice_combinacoes()
+    combinacoes = indice.pagina(estado_da_linha(linha), pagina, tamanho)
+
+    return pd.DataFrame([
+        {
+            f"{evento} · {label_piloto(piloto)}": label_posicao(posicao)
+            for evento, posicoes in combinacao.items()
+            for piloto, posicao in posicoes.items()
+        }
+        for combinacao in combinacoes
+    ])
+
+
 @st.cache_data(ttl=300)
+@read_lock()
 def carregar_opcoes_filtros() -> dict:
     """
     Carrega opções disponíveis para filtros.
@@ -267,6 +365,42 @@ def carregar_opcoes_filtros() -> dict:
     }
 
 
+@st.cache_data(show_spinner="Amostrando o grid completo...")
+def carregar_chances_estratificadas(
+    meia_largura: float = MEIA_LARGURA_PADRAO,
+) -> ResultadoEstratificado:
+    """
+    Estima as chances com o grid completo (Plackett–Luce, ver estratificado).
+
+    Não depende do banco: a semente fixa torna o resultado reprodutível, e o
+    cache guarda a estimativa enquanto o processo vive.
+
+    Args:
+        meia_largura: Meia largura alvo do intervalo de 95% de cada chance
+
+    Returns:
+        Chances com erro padrão por piloto
+    """
+    return estimar_chances(meia_largura=meia_largura)
+
+
+@st.cache_data(max_entries=2)
+def carregar_condicoes_titulo(com_rivais: bool = True) -> dict[str, list[CondicaoTitulo]]:
+    """
+    Condições mínimas de título de cada piloto (ver condicoes.condicoes_titulo).
+
+    Só dependem da classificação e dos eventos em código, não do banco; o
+    cache é limitado às duas variantes de com_rivais.
+
+    Args:
+        com_rivais: Inclui condições que limitam os pontos dos rivais
+
+    Returns:
+        {piloto: condições}
+    """
+    return condicoes_titulo(com_rivais=com_rivais)
+
+
 # =============================================================================
 # SIDEBAR FILTROS
 # =============================================================================
@@ -354,10 +488,24 @@ def metricas_resumo() -> None:
             )
 
 
-def cards_chances() -> None:
-    """Exibe cards com chances de cada piloto."""
-    stats = carregar_estatisticas_resumo()
-    df = stats['por_campeao']
+def cards_chances(estimativa: ResultadoEstratificado | None = None) -> None:
+    """
+    Exibe cards com chances de cada piloto.
+
+    Args:
+        estimativa: Chances estimadas por amostragem (ex:
+            carregar_chances_estratificadas), exibidas com o intervalo de 95%
+            (± Z_95 × erro padrão). None exibe as chances exatas do banco.
+    """
+    if estimativa is None:
+        df = carregar_estatisticas_resumo()['por_campeao']
+        erros = {}
+    else:
+        df = pd.DataFrame({
+            'campeao': list(estimativa.chances),
+            'chance': [100 * c for c in estimativa.chances.values()],
+        }).sort_values('chance', ascending=False, ignore_index=True)
+        erros = estimativa.erros
 
     cols = st.columns(3)
 
@@ -372,6 +520,12 @@ def cards_chances() -> None:
     for i, (_, row) in enumerate(df.iterrows()):
         piloto = row['campeao']
         cor = cores_piloto.get(piloto, '#888888')
+        margem = ''
+        if piloto in erros:
+            margem = f'<span style="font-size: 18px;"> ± {100 * Z_95 * erros[piloto]:.2f}</span>'
+            detalhe = 'intervalo de 95%'
+        else:
+            detalhe = f"{int(row['combinacoes']):,} combinações"
 
         with cols[i]:
             st.markdown(f"""
@@ -384,10 +538,10 @@ def cards_chances() -> None:
             ">
                 <h2 style="margin: 0; color: #4A4A4A;">{label_piloto(piloto)}</h2>
                 <p style="font-size: 42px; font-weight: bold; margin: 10px 0; color: {cor};">
-                    {row['chance']:.2f}%
+                    {row['chance']:.2f}%{margem}
                 </p>
                 <p style="font-size: 14px; color: #666; margin: 0;">
-                    {int(row['combinacoes']):,} combinações
+                    {detalhe}
                 </p>
             </div>
             """.replace(',', '.'), unsafe_allow_html=True)
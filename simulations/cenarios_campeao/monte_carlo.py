@@ -0,0 +1,324 @@
+"""
+Simulação Monte Carlo com o grid completo para Cenários de Campeão F1 2025.
+
+A enumeração exata trata os outros 17 carros como "fora dos pontos" e os
+ignora. Aqui cada evento restante sorteia a ordem de chegada dos 20 pilotos
+por um modelo de Plackett–Luce (força por piloto), em lotes vetorizados:
+pelo truque de Gumbel, somar ruído Gumbel ao log da força e ordenar equivale
+a sortear a ordem de Plackett–Luce.
+
+As posições dos pilotos da disputa viram deltas empacotados (CodecEstado) e
+alimentam um histograma acumulado de estados, no mesmo formato de
+HistogramaDeltas: num_combinacoes passa a ser o número de amostras de cada
+estado e a tabela gravada tem o mesmo esquema de cenarios_campeao.
+"""
+
+import inspect
+import time
+from dataclasses import dataclass
+
+import duckdb
+import numpy as np
+
+from simulations.cenarios_campeao.codec import CodecEstado
+from simulations.cenarios_campeao.convolucao import agregar, fundir
+from simulations.cenarios_campeao.simulator import (
+    CAMPEONATO,
+    Campeonato,
+    Evento,
+    VERSAO_SIMULADOR,
+    HistogramaDeltas,
+    criar_tabela,
+    criar_tabelas_resumo,
+    determinar_campeoes,
+    gerar_estatisticas,
+    hash_campeonato,
+    leitor_cenarios,
+    popular_banco,
+)
+
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Forças de Plackett–Luce do grid 2025 (estimativa pelo desempenho recente).
+# Só as razões importam: P(vencer) = força / soma das forças em disputa.
+FORCAS_GRID = {
+    'norris': 10.0,
+    'piastri': 8.0,
+    'verstappen': 10.0,
+    'russell': 5.0,
+    'leclerc': 4.0,
+    'hamilton': 2.5,
+    'antonelli': 2.5,
+    'albon': 1.2,
+    'hadjar': 1.0,
+    'sainz': 1.0,
+    'alonso': 1.0,
+    'hulkenberg': 0.8,
+    'bearman': 0.8,
+    'lawson': 0.7,
+    'tsunoda': 0.6,
+    'ocon': 0.6,
+    'gasly': 0.5,
+    'stroll': 0.5,
+    'bortoleto': 0.5,
+    'colapinto': 0.4,
+}
+
+# Tabela com os cenários amostrados (mesmo esquema de cenarios_campeao)
+TABELA_MONTE_CARLO = 'cenarios_campeao_mc'
+
+# Prefixo dos resumos da tabela amostrada (mc_resumo_campeao etc.)
+PREFIXO_MONTE_CARLO = 'mc_'
+
+# Amostras (temporadas simuladas) por lote vetorizado
+AMOSTRAS_POR_LOTE = 250_000
+
+# Limite de amostras quando a convergência não é atingida antes
+AMOSTRAS_MAXIMAS = 20_000_000
+
+# Meia largura máxima do intervalo de 95% de cada chance para parar
+TOLERANCIA_PADRAO = 1e-3
+
+# Quantil normal do intervalo de confiança de 95%
+Z_95 = 1.96
+
+
+# =============================================================================
+# ESTRUTURAS DE DADOS
+# =============================================================================
+
+@dataclass(frozen=True, eq=False)
+class ResultadoMonteCarlo:
+    """Histograma amostrado e diagnóstico de convergência."""
+    histograma: HistogramaDeltas  # contagens = amostras por estado
+    amostras: int
+    chances: dict[str, float]  # fração das amostras em que cada piloto é campeão
+    erros: dict[str, float]  # erro padrão de cada chance
+    convergiu: bool
+
+
+# =============================================================================
+# AMOSTRAGEM
+# =============================================================================
+
+def amostrar_posicoes(
+    rng: np.random.Generator,
+    log_forcas: np.ndarray,
+    indices: np.ndarray,
+    tamanho: int,
+) -> np.ndarray:
+    """
+    Sorteia ordens de chegada de Plackett–Luce e devolve posições selecionadas.
+
+    Args:
+        rng: Gerador NumPy
+        log_forcas: Array (grid,) com o log da força de cada piloto
+        indices: Índices no grid dos pilotos cujas posições interessam
+        tamanho: Número de ordens sorteadas
+
+    Returns:
+        Array (tamanho, len(indices)) com posições de 1 a grid
+    """
+    notas = log_forcas + rng.gumbel(size=(tamanho, len(log_forcas)))
+    alvo = notas[:, indices]
+    return 1 + (notas[:, :, None] > alvo[:, None, :]).sum(axis=1)
+
+
+def tabela_pontos_grid(evento: Evento, tamanho_grid: int) -> np.ndarray:
+    """Pontos de cada posição de chegada (índice 0 não usado)."""
+    tabela = np.zeros(tamanho_grid + 1, dtype=np.int16)
+    for posicao in evento.posicoes:
+        if posicao <= tamanho_grid:
+            tabela[posicao] = evento.tabela_pontos.get(posicao, 0)
+    return tabela
+
+
+def amostrar_deltas(
+    rng: np.random.Generator,
+    campeonato: Campeonato,
+    log_forcas: np.ndarray,
+    indices: np.ndarray,
+    tabelas: list[np.ndarray],
+    tamanho: int,
+) -> np.ndarray:
+    """
+    Sorteia todos os eventos restantes e soma os deltas dos pilotos da disputa.
+
+    Returns:
+        Array (tamanho, pilotos, 4) int16 com pontos, vitórias, segundos e
+        terceiros ganhos
+    """
+    deltas = np.zeros((tamanho, len(campeonato.pilotos), 4), dtype=np.int16)
+    for tabela in tabelas:
+        posicoes = amostrar_posicoes(rng, log_forcas, indices, tamanho)
+        deltas[:, :, 0] += tabela[posicoes]
+        deltas[:, :, 1] += posicoes == 1
+        deltas[:, :, 2] += posicoes == 2
+        deltas[:, :, 3] += posicoes == 3
+    return deltas
+
+
+def simular_monte_carlo(
+    campeonato: Campeonato = CAMPEONATO,
+    forcas: dict[str, float] = FORCAS_GRID,
+    semente: int | None = 2025,
+    amostras_maximas: int = AMOSTRAS_MAXIMAS,
+    amostras_por_lote: int = AMOSTRAS_POR_LOTE,
+    tolerancia: float = TOLERANCIA_PADRAO,
+) -> ResultadoMonteCarlo:
+    """
+    Simula temporadas com o grid completo até convergir.
+
+    Cada lote sorteia amostras_por_lote temporadas, determina o campeão de
+    cada uma e funde os estados no histograma acumulado. Para quando a meia
+    largura do intervalo de 95% de todas as chances fica abaixo de
+    tolerancia ou ao atingir amostras_maximas.
+
+    Args:
+        campeonato: Pilotos da disputa, eventos restantes e classificação
+        forcas: Força de Plackett–Luce de cada piloto do grid
+        semente: Semente do gerador (None = não reprodutível)
+        amostras_maximas: Limite de temporadas simuladas
+        amostras_por_lote: Temporadas por lote vetorizado
+        tolerancia: Meia largura máxima do intervalo de 95% das chances
+
+    Returns:
+        Histograma de estados amostrados com chances e erros padrão
+
+    Raises:
+        ValueError: Se um piloto da disputa não está em forcas ou alguma
+            força não é positiva
+    """
+    grid = list(forcas)
+    ausentes = [p for p in campeonato.pilotos if p not in forcas]
+    if ausentes:
+        raise ValueError(f"Pilotos da disputa sem força no grid: {ausentes}")
+    if min(forcas.values()) <= 0:
+        raise ValueError("Forças de Plackett–Luce devem ser positivas")
+
+    log_forcas = np.log(np.array([forcas[p] for p in grid], dtype=np.float64))
+    indices = np.array([grid.index(p) for p in campeonato.pilotos])
+    tabelas = [tabela_pontos_grid(e, len(grid)) for e in campeonato.eventos]
+
+    # Codec dimensionado para o máximo de cada coluna somando os eventos
+    maximos_evento = [[int(t.max()), 1, 1, 1] * len(campeonato.pilotos) for t in tabelas]
+    codec = CodecEstado(np.sum(maximos_evento, axis=0))
+
+    print(f"\n[Monte Carlo] Grid de {len(grid)} pilotos, {len(campeonato.eventos)} eventos")
+    print(f"  Semente: {semente}, tolerância: ±{tolerancia:.2%}")
+
+    rng = np.random.default_rng(semente)
+    atual = campeonato.classificacao()
+    histograma = None
+    vitorias = np.zeros(len(campeonato.pilotos), dtype=np.int64)
+    amostras = 0
+    convergiu = False
+
+    while amostras < amostras_maximas:
+        tamanho = min(amostras_por_lote, amostras_maximas - amostras)
+        deltas = amostrar_deltas(rng, campeonato, log_forcas, indices, tabelas, tamanho)
+        campeoes, _ = determinar_campeoes(deltas + atual, campeonato.pilotos)
+
+        chaves = codec.codificar(deltas.reshape(tamanho, -1))
+        lote = agregar(chaves, np.ones(tamanho, dtype=np.int64))
+        histograma = lote if histograma is None else fundir([histograma, lote])
+        vitorias += np.bincount(campeoes, minlength=len(campeonato.pilotos))
+        amostras += tamanho
+
+        chances = vitorias / amostras
+        erros = np.sqrt(chances * (1 - chances) / amostras)
+        meia_largura = Z_95 * erros.max()
+        print(f"  {amostras:>12,} amostras | {len(histograma[0]):>9,} estados | ±{meia_largura:.4%}")
+
+        if meia_largura <= tolerancia:
+            convergiu = True
+            break
+
+    return ResultadoMonteCarlo(
+        histograma=HistogramaDeltas(*histograma, codec, campeonato.pilotos),
+        amostras=amostras,
+        chances=dict(zip(campeonato.pilotos, chances.tolist())),
+        erros=dict(zip(campeonato.pilotos, erros.tolist())),
+        convergiu=convergiu,
+    )
+
+
+# =============================================================================
+# EXECUÇÃO PRINCIPAL
+# =============================================================================
+
+def executar_monte_carlo(
+    conn: duckdb.DuckDBPyConnection,
+    campeonato: Campeonato = CAMPEONATO,
+    tabela: str = TABELA_MONTE_CARLO,
+    prefixo: str = PREFIXO_MONTE_CARLO,
+    force: bool = False,
+    **opcoes,
+) -> dict:
+    """
+    Simula por Monte Carlo e grava os estados e seus resumos.
+
+    A tabela tem o esquema de cenarios_campeao, com num_combinacoes igual ao
+    número de amostras de cada estado, e pode ser lida pelas mesmas
+    consultas do dashboard. Como em executar, os resumos (criar_tabelas_resumo
+    com prefixo) e o registro em simulation_runs são gravados na mesma
+    transação; sem force, uma execução registrada com os mesmos parâmetros
+    (campeonato, forças, semente e limites de amostragem) é reaproveitada.
+    Sem semente a amostragem não é reprodutível e sempre é refeita.
+
+    Args:
+        conn: Conexão DuckDB
+        campeonato: Pilotos, eventos e classificação
+        tabela: Tabela de destino (recriada)
+        prefixo: Prefixo dos resumos da tabela (ver criar_tabelas_resumo)
+        force: Se True, recalcula mesmo que a execução registrada esteja atual
+        **opcoes: Repassadas a simular_monte_carlo
+
+    Returns:
+        Estatísticas dos resumos (ver gerar_estatisticas), com num_combinacoes
+        contando amostras
+    """
+    from database.connection import (
+        clear_simulation_run,
+        get_simulation_run,
+        hash_parameters,
+        is_populated,
+        record_simulation_run,
+    )
+
+    argumentos = inspect.signature(simular_monte_carlo).bind(campeonato, **opcoes)
+    argumentos.apply_defaults()
+    amostragem = {k: v for k, v in argumentos.arguments.items() if k != 'campeonato'}
+    parametros = hash_parameters({'campeonato': hash_campeonato(campeonato), **amostragem})
+    reprodutivel = amostragem['semente'] is not None
+
+    if not force and reprodutivel and is_populated(conn, tabela, parametros, VERSAO_SIMULADOR):
+        print(f"Tabela '{tabela}' já populada. Use force=True para recalcular.")
+        return gerar_estatisticas(conn, prefixo)
+    if not force and get_simulation_run(conn, tabela) is not None:
+        print(f"Tabela '{tabela}' desatualizada (parâmetros, semente ou versão). Recalculando...")
+
+    inicio = time.perf_counter()
+    resultado = simular_monte_carlo(campeonato, **opcoes)
+    if not resultado.convergiu:
+        print("  Aviso: limite de amostras atingido antes da tolerância")
+
+    # Sem registro até o fim: um build interrompido não conta como pronto
+    clear_simulation_run(conn, tabela)
+    conn.execute(f"DROP TABLE IF EXISTS {tabela}")
+    criar_tabela(conn, campeonato.pilotos, tabela)
+    popular_banco(conn, leitor_cenarios(resultado.histograma, campeonato), tabela)
+
+    # Resumos e registro da execução na mesma transação
+    conn.execute("BEGIN TRANSACTION")
+    criar_tabelas_resumo(conn, campeonato.pilotos, tabela, prefixo)
+    num_linhas = conn.execute(f"SELECT SUM(estados) FROM {prefixo}resumo_campeao").fetchone()[0]
+    record_simulation_run(
+        conn, tabela, parametros, VERSAO_SIMULADOR, num_linhas, time.perf_counter() - inicio
+    )
+    conn.execute("COMMIT")
+
+    return gerar_estatisticas(conn, prefixo)
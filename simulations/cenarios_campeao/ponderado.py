@@ -0,0 +1,94 @@
+"""
+Modo ponderado (probabilidades não uniformes) para Cenários de Campeão F1 2025.
+
+No modo padrão cada combinação de posições vale 1 (num_combinacoes), como
+se todas fossem igualmente prováveis. No modo ponderado cada piloto tem uma
+distribuição de probabilidade sobre as posições de chegada de cada evento e
+a convolução acumula massa de probabilidade (float64) por estado.
+
+As marginais dos pilotos são tratadas como independentes e a regra de
+colisão (dois pilotos não dividem uma posição que pontua) é imposta por
+condicionamento: a probabilidade de uma combinação válida é o produto das
+marginais, renormalizado sobre as combinações válidas do evento.
+"""
+
+import numpy as np
+
+
+# Probabilidades por evento: {evento: {piloto: {posição: probabilidade}}}
+Probabilidades = dict[str, dict[str, dict[int, float]]]
+
+
+def marginal_posicoes(
+    posicoes: list[int],
+    fora_pontos: int,
+    distribuicao: dict[int, float] | None,
+) -> np.ndarray:
+    """
+    Marginal de um piloto indexada pela posição (0..fora_pontos).
+
+    Posições que não pontuam no evento (ex: 11º a 20º) somam sua massa em
+    fora_pontos. Sem distribuição, todas as posições de posicoes e
+    fora_pontos têm o mesmo peso (equivale ao modo por contagem).
+
+    Args:
+        posicoes: Posições que pontuam no evento
+        fora_pontos: Código de "fora dos pontos"
+        distribuicao: {posição: probabilidade} do piloto, ou None
+
+    Returns:
+        Array (fora_pontos + 1,) normalizado para somar 1
+
+    Raises:
+        ValueError: Se a distribuição tem valores negativos ou soma zero
+    """
+    marginal = np.zeros(fora_pontos + 1)
+
+    if distribuicao is None:
+        marginal[list(posicoes) + [fora_pontos]] = 1.0
+    else:
+        for posicao, probabilidade in distribuicao.items():
+            if probabilidade < 0:
+                raise ValueError(f"Probabilidade negativa na posição {posicao}: {probabilidade}")
+            marginal[posicao if posicao in posicoes else fora_pontos] += probabilidade
+
+    total = marginal.sum()
+    if total <= 0:
+        raise ValueError("Distribuição de posições com massa total zero")
+    return marginal / total
+
+
+def pesos_posicoes(
+    grade: np.ndarray,
+    posicoes: list[int],
+    fora_pontos: int,
+    pilotos: tuple[str, ...],
+    distribuicoes: dict[str, dict[int, float]],
+) -> np.ndarray:
+    """
+    Probabilidade de cada combinação válida de posições de um evento.
+
+    Args:
+        grade: Array (m, pilotos) de combinações válidas (ver gerar_posicoes)
+        posicoes: Posições que pontuam no evento
+        fora_pontos: Código de "fora dos pontos"
+        pilotos: Nomes dos pilotos, na ordem das colunas de grade
+        distribuicoes: {piloto: {posição: probabilidade}}; pilotos ausentes
+            usam a distribuição uniforme
+
+    Returns:
+        Array (m,) float64 que soma 1: produto das marginais condicionado à
+        ausência de colisões
+
+    Raises:
+        ValueError: Se nenhuma combinação válida tem probabilidade positiva
+    """
+    pesos = np.ones(len(grade))
+    for i, piloto in enumerate(pilotos):
+        marginal = marginal_posicoes(posicoes, fora_pontos, distribuicoes.get(piloto))
+        pesos *= marginal[grade[:, i]]
+
+    total = pesos.sum()
+    if total <= 0:
+        raise ValueError("Nenhuma combinação válida tem probabilidade positiva")
+    return pesos / total
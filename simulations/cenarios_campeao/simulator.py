@@ -8,14 +8,54 @@ Usa abordagem de agregação por convolução para máxima eficiência:
 - Agrupa por (delta_pontos, delta_vitorias) únicos por piloto
 - Reduz de ~550M combinações brutas para ~dezenas de milhares de estados únicos
 - Armazena também contagem de segundos/terceiros para tie-break completo
+
+Pilotos, eventos e classificação vêm de um Campeonato (padrão: CAMPEONATO);
+qualquer número de pilotos e qualquer sequência de sprints e corridas.
+
+Com probabilidades (ver ponderado), cada estado acumula massa de
+probabilidade em vez do número de combinações.
+
+Motores de convolução disponíveis:
+- 'numpy': chaves int64 empacotadas (CodecEstado) combinadas por broadcasting (padrão)
+- 'counter': Counter de tuplas de deltas em Python puro (referência)
+- 'duckdb': CROSS JOIN + GROUP BY dentro do DuckDB (ver convolucao_sql)
+- 'fft': cubos densos de pontos por chave esparsa, convoluídos por FFT (ver convolucao_fft)
+
+Com motor 'auto' (padrão de executar), escolher_motor usa 'fft' só quando os
+cubos são densos (DENSIDADE_MINIMA_FFT) e 'numpy' nos demais casos.
 """
 
-from itertools import product
-from dataclasses import dataclass
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import cached_property
+from itertools import combinations
+from operator import add
+from typing import Iterator
+from dataclasses import dataclass, fields
 from collections import Counter
+from math import prod
 import duckdb
+import numpy as np
+import pyarrow as pa
 
 from config.settings import PONTOS_SPRINT, PONTOS_CORRIDA
+from simulations.cenarios_campeao.cache import (
+    hashes_prefixos,
+    carregar_maior_prefixo,
+    carregar_reducao,
+    hash_histograma,
+    salvar_estagio,
+    salvar_reducao,
+)
+from simulations.cenarios_campeao.codec import LIMITE_CHAVE, CodecEstado
+from simulations.cenarios_campeao.convolucao import agregar, convoluir, convoluir_paralelo
+from simulations.cenarios_campeao.convolucao_fft import convoluir_fft, densidade
+from simulations.cenarios_campeao.convolucao_sql import convoluir_sql, registrar_deltas
+from simulations.cenarios_campeao.ponderado import Probabilidades, pesos_posicoes
 
 
 # =============================================================================
@@ -61,6 +101,54 @@ POSICOES_CORRIDA = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
 # Código para "fora dos pontos"
 FORA_PONTOS = 99
 
+# Motores de convolução suportados por simular_cenarios
+MOTORES = ('numpy', 'counter', 'duckdb', 'fft')
+
+# Motor escolhido por escolher_motor conforme a densidade dos cubos da FFT
+MOTOR_AUTOMATICO = 'auto'
+
+# Combinações por célula a partir das quais a FFT supera o motor numpy
+# (2 pilotos e 5 eventos: ~15, FFT 1,3x mais rápida; problema padrão: 0,03,
+# FFT ~2x mais lenta)
+DENSIDADE_MINIMA_FFT = 1.0
+
+# Métodos de decisão, na ordem dos critérios de desempate
+METODOS = ('pontos', 'vitorias', 'segundos_lugares', 'terceiros_lugares', 'empate_total')
+
+# Estados decodificados por vez na determinação do campeão
+LOTE_DECODIFICACAO = 500_000
+
+# Nível de cada linha de resumo_cenarios: GROUPING(campeao, metodo_decisao)
+NIVEIS_RESUMO = {
+    'campeao_metodo': 0,
+    'campeao': 1,
+    'metodo': 2,
+    'total': 3,
+}
+
+# Incrementar quando a regra da simulação ou o esquema da tabela mudar (força rebuild)
+VERSAO_SIMULADOR = 3
+
+# Fatias de estados por processo no modo paralelo (balanceamento de carga)
+FATIAS_POR_TRABALHADOR = 4
+
+# Estatísticas por piloto gravadas em cenarios_campeao, na ordem de Delta:
+# (sufixo da coluna, tipo SQL). Finais cabem nos mesmos tipos dos deltas.
+ESTATISTICAS_TABELA = (
+    ('pts', 'SMALLINT'),
+    ('wins', 'TINYINT'),
+    ('seconds', 'TINYINT'),
+    ('thirds', 'TINYINT'),
+)
+
+# Tipos Arrow correspondentes aos tipos SQL da tabela
+TIPOS_ARROW = {
+    'SMALLINT': pa.int16(),
+    'TINYINT': pa.int8(),
+    'BIGINT': pa.int64(),
+    'DOUBLE': pa.float64(),
+}
+
 
 # =============================================================================
 # ESTRUTURAS DE DADOS SIMPLIFICADAS
@@ -76,84 +164,281 @@ class Delta:
 
 
 @dataclass(frozen=True)
-class DeltaTrio:
-    """Delta combinado para os 3 pilotos."""
-    norris: Delta
-    piastri: Delta
-    verstappen: Delta
+class Evento:
+    """Evento restante do campeonato."""
+    nome: str
+    posicoes: list[int]  # posições que pontuam
+    tabela_pontos: dict
 
+    @classmethod
+    def sprint(cls, nome: str) -> 'Evento':
+        """Sprint com a pontuação de config.settings."""
+        return cls(nome, POSICOES_SPRINT, PONTOS_SPRINT)
 
-# =============================================================================
-# GERAÇÃO DE DELTAS
-# =============================================================================
+    @classmethod
+    def corrida(cls, nome: str) -> 'Evento':
+        """Corrida com a pontuação de config.settings."""
+        return cls(nome, POSICOES_CORRIDA, PONTOS_CORRIDA)
+
+
+# Eventos restantes, na ordem em que acontecem
+EVENTOS = [
+    Evento.sprint('Sprint Qatar'),
+    Evento.corrida('Race Qatar'),
+    Evento.corrida('Race Abu Dhabi'),
+]
+
+
+@dataclass(frozen=True)
+class Campeonato:
+    """
+    Disputa de título a simular: pilotos, eventos restantes e classificação.
+
+    Aceita qualquer número de pilotos e qualquer sequência de eventos; os
+    dicionários da classificação têm uma entrada por piloto.
+    """
+    pilotos: tuple[str, ...]
+    eventos: tuple[Evento, ...]
+    pontos: dict[str, int]
+    vitorias: dict[str, int]
+    segundos: dict[str, int]
+    terceiros: dict[str, int]
+
+    def classificacao(self) -> np.ndarray:
+        """Classificação atual em array (pilotos, 4)."""
+        return classificacao_para_array(
+            self.pontos, self.vitorias, self.segundos, self.terceiros, self.pilotos
+        )
+
+
+# Disputa padrão: Norris x Piastri x Verstappen nos eventos restantes
+CAMPEONATO = Campeonato(
+    pilotos=tuple(PILOTOS),
+    eventos=tuple(EVENTOS),
+    pontos=PONTOS_ATUAIS,
+    vitorias=VITORIAS_ATUAIS,
+    segundos=SEGUNDOS_ATUAIS,
+    terceiros=TERCEIROS_ATUAIS,
+)
+
+
+def hash_campeonato(campeonato: Campeonato) -> str:
+    """
+    Hash dos parâmetros que determinam a tabela de cenários.
+
+    Cobre pilotos, eventos (posições e pontos) e classificação atual; muda
+    sempre que PONTOS_ATUAIS ou as tabelas de pontos mudam.
+    """
+    hash_eventos = hashes_prefixos(campeonato.eventos, campeonato.pilotos)[-1]
+    definicao = json.dumps({
+        'eventos': hash_eventos,
+        'classificacao': campeonato.classificacao().tolist(),
+    })
+    return hashlib.sha256(definicao.encode()).hexdigest()
 
-def posicao_para_delta(posicao: int, tabela_pontos: dict) -> Delta:
-    """Converte posição em delta de stats."""
-    return Delta(
-        pontos=tabela_pontos.get(posicao, 0),
-        vitoria=1 if posicao == 1 else 0,
-        segundo=1 if posicao == 2 else 0,
-        terceiro=1 if posicao == 3 else 0,
+
+@dataclass(frozen=True, eq=False)
+class ReducaoPontos:
+    """
+    Histograma agrupado pelo vetor de pontos ganhos pelos pilotos.
+
+    Os pontos são o primeiro critério do desempate: em um grupo cujo
+    máximo de pontos finais é único, o campeão e o método ('pontos') saem
+    da soma do grupo, sem olhar os estados. Só os grupos empatados no topo
+    precisam das vitórias, 2º e 3º de cada estado (ver estados).
+    """
+    grupos: np.ndarray  # (g, pilotos) pontos ganhos de cada grupo
+    somas: np.ndarray  # (g,) combinações ou probabilidade de cada grupo
+    ordem: np.ndarray  # (n,) índices dos estados, com os de cada grupo contíguos
+    inicios: np.ndarray  # (g,) início de cada grupo em ordem
+    tamanhos: np.ndarray  # (g,) estados de cada grupo
+
+    def estados(self, grupos: np.ndarray) -> np.ndarray:
+        """Índices no histograma de todos os estados dos grupos indicados."""
+        tamanhos = self.tamanhos[grupos]
+        deslocamento = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+        return self.ordem[np.repeat(self.inicios[grupos], tamanhos) + deslocamento]
+
+
+@dataclass(frozen=True, eq=False)
+class HistogramaDeltas:
+    """
+    Histograma de deltas finais: estados únicos e suas contagens.
+
+    Não depende da classificação atual; pode ser pontuado para qualquer
+    classificação com reavaliar_campeao.
+    """
+    chaves: np.ndarray  # estados codificados por codec
+    contagens: np.ndarray  # combinações (int64) ou probabilidade (float64) por estado
+    codec: CodecEstado
+    pilotos: tuple[str, ...] = tuple(PILOTOS)  # ordem dos pilotos nos estados
+    usar_cache: bool = False  # guarda a redução no cache de estágios (ver reducao)
+
+    def __len__(self) -> int:
+        return len(self.contagens)
+
+    def deltas(self, inicio: int = 0, fim: int | None = None) -> np.ndarray:
+        """Decodifica os estados [inicio:fim] em array (n, pilotos, 4)."""
+        return self.deltas_indices(slice(inicio, fim))
+
+    def deltas_indices(self, indices: np.ndarray | slice) -> np.ndarray:
+        """Decodifica os estados indicados em array (n, pilotos, 4)."""
+        linhas = self.codec.decodificar(self.chaves[indices])
+        return linhas.reshape(-1, len(self.pilotos), len(fields(Delta)))
+
+    @cached_property
+    def reducao(self) -> ReducaoPontos:
+        """
+        Grupos de pontos do histograma (ver reduzir_pontos).
+
+        Calculados uma vez por histograma. Com usar_cache, a redução é
+        salva no cache de estágios sob o hash do conteúdo do histograma
+        (estados, contagens e codec, na ordem em que estão), e as próximas
+        execuções com o mesmo histograma só a carregam.
+        """
+        if not self.usar_cache:
+            return reduzir_pontos(self)
+
+        conteudo = hash_histograma(self.chaves, self.contagens, self.codec)
+        salva = carregar_reducao(conteudo)
+        if salva is not None:
+            return ReducaoPontos(**salva)
+
+        reducao = reduzir_pontos(self)
+        salvar_reducao(
+            conteudo, grupos=reducao.grupos, somas=reducao.somas,
+            ordem=reducao.ordem, inicios=reducao.inicios, tamanhos=reducao.tamanhos,
+        )
+        return reducao
+
+
+def reduzir_pontos(histograma: HistogramaDeltas) -> ReducaoPontos:
+    """
+    Agrupa os estados do histograma pelo vetor de pontos ganhos.
+
+    Os pontos de cada estado são empacotados em uma chave (CodecEstado só
+    com as colunas de pontos) e os estados são ordenados por essa chave.
+
+    Args:
+        histograma: Histograma de deltas finais
+
+    Returns:
+        Grupos de pontos, com a soma das contagens e os estados de cada um
+    """
+    num_campos = len(fields(Delta))
+    codec_pontos = CodecEstado(histograma.codec.maximos[::num_campos])
+
+    pontos = np.empty((len(histograma), len(histograma.pilotos)), dtype=np.int16)
+    for inicio in range(0, len(histograma), LOTE_DECODIFICACAO):
+        lote = histograma.deltas(inicio, inicio + LOTE_DECODIFICACAO)[:, :, 0]
+        pontos[inicio:inicio + len(lote)] = lote
+
+    if codec_pontos.compacto:
+        chaves = codec_pontos.codificar(pontos)
+    else:
+        _, chaves = np.unique(pontos, axis=0, return_inverse=True)
+        chaves = chaves.ravel()
+
+    tipo_ordem = np.int32 if len(histograma) < 2 ** 31 else np.int64
+    ordem = np.argsort(chaves, kind='stable').astype(tipo_ordem)
+    ordenadas = chaves[ordem]
+    inicios = np.flatnonzero(np.r_[True, ordenadas[1:] != ordenadas[:-1]])
+
+    return ReducaoPontos(
+        grupos=pontos[ordem[inicios]].astype(np.int64),
+        somas=np.add.reduceat(histograma.contagens[ordem], inicios),
+        ordem=ordem,
+        inicios=inicios,
+        tamanhos=np.diff(np.r_[inicios, len(ordem)]),
     )
 
 
-def gerar_deltas_evento(posicoes: list[int], tabela_pontos: dict) -> list[DeltaTrio]:
+# =============================================================================
+# GERAÇÃO DE DELTAS
+# =============================================================================
+
+def gerar_posicoes(evento: Evento, num_pilotos: int) -> np.ndarray:
     """
-    Gera todos os deltas válidos para um evento.
+    Gera todas as combinações válidas de posições de um evento.
 
     Regras:
     - Cada piloto pode ficar em qualquer posição que pontua OU fora dos pontos (99)
     - Se dois ou mais pilotos pontuam, não podem ter a mesma posição
+
+    As combinações seguem a ordem de product(posicoes + [99], repeat=num_pilotos).
+
+    Returns:
+        Array (m, num_pilotos) com a posição de cada piloto
+    """
+    todas_posicoes = list(evento.posicoes) + [FORA_PONTOS]
+    indices = np.indices((len(todas_posicoes),) * num_pilotos).reshape(num_pilotos, -1).T
+    grade = np.array(todas_posicoes)[indices]
+
+    # Posições pontuadas não se repetem (FORA_PONTOS pode ser compartilhada)
+    validas = np.ones(len(grade), dtype=bool)
+    for a, b in combinations(range(num_pilotos), 2):
+        validas &= (grade[:, a] != grade[:, b]) | (grade[:, a] == FORA_PONTOS)
+    return grade[validas]
+
+
+def posicoes_para_deltas(evento: Evento, grade: np.ndarray) -> np.ndarray:
+    """
+    Converte combinações de posições (ver gerar_posicoes) em deltas.
+
+    Returns:
+        Array (m, num_pilotos * 4) int16: (pontos, vitoria, segundo, terceiro)
+        de cada piloto, na ordem dos pilotos
     """
-    todas_posicoes = posicoes + [FORA_PONTOS]
-    deltas = []
+    tabela = np.zeros(FORA_PONTOS + 1, dtype=np.int64)
+    for posicao in evento.posicoes:
+        tabela[posicao] = evento.tabela_pontos.get(posicao, 0)
 
-    for pos_n, pos_p, pos_v in product(todas_posicoes, repeat=3):
-        # Verificar posições não repetidas (exceto FORA_PONTOS)
-        posicoes_dentro = [p for p in [pos_n, pos_p, pos_v] if p != FORA_PONTOS]
-        if len(posicoes_dentro) != len(set(posicoes_dentro)):
-            continue
+    deltas = np.stack([tabela[grade], grade == 1, grade == 2, grade == 3], axis=2)
+    return deltas.reshape(len(grade), -1).astype(np.int16)
 
-        deltas.append(DeltaTrio(
-            norris=posicao_para_delta(pos_n, tabela_pontos),
-            piastri=posicao_para_delta(pos_p, tabela_pontos),
-            verstappen=posicao_para_delta(pos_v, tabela_pontos),
-        ))
 
-    return deltas
+def gerar_deltas(evento: Evento, num_pilotos: int) -> np.ndarray:
+    """
+    Gera todos os deltas válidos de um evento para num_pilotos pilotos.
 
+    Mesma ordem e regras de gerar_posicoes.
 
-def somar_deltas(d1: Delta, d2: Delta) -> Delta:
-    """Soma dois deltas de um piloto."""
-    return Delta(
-        pontos=d1.pontos + d2.pontos,
-        vitoria=d1.vitoria + d2.vitoria,
-        segundo=d1.segundo + d2.segundo,
-        terceiro=d1.terceiro + d2.terceiro,
-    )
+    Returns:
+        Array (m, num_pilotos * 4) int16: (pontos, vitoria, segundo, terceiro)
+        de cada piloto, na ordem dos pilotos
+    """
+    return posicoes_para_deltas(evento, gerar_posicoes(evento, num_pilotos))
 
 
-def somar_delta_trios(t1: DeltaTrio, t2: DeltaTrio) -> DeltaTrio:
-    """Soma dois DeltaTrios."""
-    return DeltaTrio(
-        norris=somar_deltas(t1.norris, t2.norris),
-        piastri=somar_deltas(t1.piastri, t2.piastri),
-        verstappen=somar_deltas(t1.verstappen, t2.verstappen),
-    )
+def colunas_deltas(pilotos: tuple[str, ...] = tuple(PILOTOS)) -> list[str]:
+    """Nomes das colunas de gerar_deltas (ex: delta_pts_norris)."""
+    return [f'delta_{e}_{p}' for p in pilotos for e, _ in ESTATISTICAS_TABELA]
 
 
 # =============================================================================
 # DETERMINAÇÃO DO CAMPEÃO
 # =============================================================================
 
-def determinar_campeao(
-    pts: tuple[int, int, int],
-    wins: tuple[int, int, int],
-    seconds: tuple[int, int, int],
-    thirds: tuple[int, int, int],
-) -> tuple[str, str]:
+def classificacao_para_array(
+    pontos: dict[str, int],
+    vitorias: dict[str, int],
+    segundos: dict[str, int],
+    terceiros: dict[str, int],
+    pilotos: tuple[str, ...] = tuple(PILOTOS),
+) -> np.ndarray:
+    """Converte a classificação em array (pilotos, 4) na ordem de pilotos."""
+    return np.array(
+        [[pontos[p], vitorias[p], segundos[p], terceiros[p]] for p in pilotos],
+        dtype=np.int64,
+    )
+
+
+def determinar_campeoes(
+    finais: np.ndarray,
+    pilotos: tuple[str, ...] = tuple(PILOTOS),
+) -> tuple[np.ndarray, np.ndarray]:
     """
-    Determina o campeão usando sistema de tie-break da F1.
+    Determina o campeão de muitos estados de uma vez (tie-break da F1).
 
     Ordem de critérios:
     1. Mais pontos
@@ -161,232 +446,809 @@ def determinar_campeao(
     3. Mais segundos lugares
     4. Mais terceiros lugares
 
+    Cada piloto recebe uma chave inteira que empilha os critérios em base
+    mista (pontos, vitórias, 2º, 3º e, por último, a ordem do nome: em
+    empate total vence o maior nome). Comparar chaves equivale a comparar
+    as tuplas de critérios, então campeão e vice saem de um único sort.
+
+    Args:
+        finais: Array (n, pilotos, 4) com pontos, vitórias, segundos e
+            terceiros finais de cada piloto
+        pilotos: Nomes dos pilotos, na ordem do eixo 1 de finais
+
+    Returns:
+        (campeoes, metodos): índices em pilotos e em METODOS, arrays (n,)
+    """
+    num_estados, num_pilotos, num_criterios = finais.shape
+    minimos = finais.min(axis=(0, 1))
+    bases = finais.max(axis=(0, 1)) - minimos + 1
+
+    chaves = np.zeros((num_estados, num_pilotos), dtype=np.int64)
+    for c in range(num_criterios):
+        chaves = chaves * bases[c] + (finais[:, :, c] - minimos[c])
+
+    # Desempate final pelo nome (maior nome vence, como em determinar_campeao)
+    ordem_nome = np.argsort(np.argsort(pilotos))
+    chaves = chaves * num_pilotos + ordem_nome
+
+    ordenadas = np.sort(chaves, axis=1)
+    campeoes = np.argmax(chaves, axis=1)
+
+    # Método: primeiro critério em que campeão e vice diferem
+    primeiro = ordenadas[:, -1] // num_pilotos
+    segundo = ordenadas[:, -2] // num_pilotos
+    difere = np.zeros((num_estados, num_criterios), dtype=bool)
+    for c in range(num_criterios - 1, -1, -1):
+        difere[:, c] = (primeiro % bases[c]) != (segundo % bases[c])
+        primeiro //= bases[c]
+        segundo //= bases[c]
+
+    metodos = np.where(difere.any(axis=1), difere.argmax(axis=1), len(METODOS) - 1)
+    return campeoes, metodos
+
+
+def determinar_campeao(
+    pts: tuple[int, ...],
+    wins: tuple[int, ...],
+    seconds: tuple[int, ...],
+    thirds: tuple[int, ...],
+    pilotos: tuple[str, ...] = tuple(PILOTOS),
+) -> tuple[str, str]:
+    """
+    Determina o campeão de um único estado usando sistema de tie-break da F1.
+
+    Atalho escalar para determinar_campeoes (usado pelo simulador "E Se?").
+
     Args:
-        pts: (norris, piastri, verstappen) pontos finais
-        wins: (norris, piastri, verstappen) vitórias finais
-        seconds: (norris, piastri, verstappen) segundos lugares finais
-        thirds: (norris, piastri, verstappen) terceiros lugares finais
+        pts: Pontos finais de cada piloto, na ordem de pilotos
+        wins: Vitórias finais de cada piloto
+        seconds: Segundos lugares finais de cada piloto
+        thirds: Terceiros lugares finais de cada piloto
+        pilotos: Nomes dos pilotos (padrão: norris, piastri, verstappen)
 
     Returns:
         (campeao, metodo): nome do piloto e critério decisivo
     """
-    pilotos = ['norris', 'piastri', 'verstappen']
+    finais = np.array([pts, wins, seconds, thirds], dtype=np.int64).T[None, :, :]
+    campeoes, metodos = determinar_campeoes(finais, pilotos)
+    return pilotos[campeoes[0]], METODOS[metodos[0]]
+
+
+def reavaliar_campeao(
+    histograma: HistogramaDeltas,
+    pontos: dict[str, int] = PONTOS_ATUAIS,
+    vitorias: dict[str, int] = VITORIAS_ATUAIS,
+    segundos: dict[str, int] = SEGUNDOS_ATUAIS,
+    terceiros: dict[str, int] = TERCEIROS_ATUAIS,
+) -> dict:
+    """
+    Pontua o histograma de deltas para uma classificação qualquer.
 
-    # Criar tupla de ranking (maior é melhor)
-    stats = [
-        (pts[i], wins[i], seconds[i], thirds[i], pilotos[i])
-        for i in range(3)
-    ]
+    Permite corrigir a classificação ou aplicar uma punição sem refazer
+    a convolução: só a determinação do campeão é recalculada, sobre os
+    grupos de pontos do histograma (ver ReducaoPontos). Grupos com líder
+    único em pontos são somados direto; só os estados dos grupos
+    empatados no topo passam pelo desempate completo. No problema
+    completo cada chamada custa ~0,1–0,25 s, conforme os empates; a
+    primeira ainda calcula a redução (~2 s) se ela não está em cache.
 
-    # Ordenar por todos os critérios (descendente)
-    stats.sort(reverse=True)
-
-    primeiro = stats[0]
-    segundo = stats[1]
-
-    # Determinar método de decisão
-    if primeiro[0] > segundo[0]:
-        metodo = 'pontos'
-    elif primeiro[1] > segundo[1]:
-        metodo = 'vitorias'
-    elif primeiro[2] > segundo[2]:
-        metodo = 'segundos_lugares'
-    elif primeiro[3] > segundo[3]:
-        metodo = 'terceiros_lugares'
-    else:
-        metodo = 'empate_total'
+    Args:
+        histograma: Histograma de deltas (ver simular_deltas)
+        pontos, vitorias, segundos, terceiros: Classificação atual de cada
+            piloto de histograma.pilotos
+
+    Returns:
+        Dicionário com total_combinacoes, por_campeao {piloto: combinações},
+        por_metodo {método: combinações} e campeao_metodo
+        {(piloto, método): combinações}. Em histogramas ponderados os
+        valores são probabilidades (float) e total_combinacoes é 1.
+    """
+    pilotos = histograma.pilotos
+    atual = classificacao_para_array(pontos, vitorias, segundos, terceiros, pilotos)
+    totais = np.zeros(len(pilotos) * len(METODOS), dtype=histograma.contagens.dtype)
+    reducao = histograma.reducao
+
+    # Grupos com líder único em pontos: campeão por 'pontos' (soma exata em int64)
+    finais = reducao.grupos + atual[:, 0]
+    unico = (finais == finais.max(axis=1, keepdims=True)).sum(axis=1) == 1
+    codigos, somas = agregar(finais[unico].argmax(axis=1) * len(METODOS), reducao.somas[unico])
+    totais[codigos] += somas
 
-    return primeiro[4], metodo
+    # Grupos empatados no topo: desempate completo estado a estado
+    empatados = reducao.estados(np.flatnonzero(~unico))
+    for inicio in range(0, len(empatados), LOTE_DECODIFICACAO):
+        indices = empatados[inicio:inicio + LOTE_DECODIFICACAO]
+        campeoes, metodos = determinar_campeoes(histograma.deltas_indices(indices) + atual, pilotos)
+        codigos, somas = agregar(campeoes * len(METODOS) + metodos, histograma.contagens[indices])
+        totais[codigos] += somas
+
+    return resumo_totais(totais.reshape(len(pilotos), len(METODOS)), pilotos)
+
+
+def resumo_totais(totais: np.ndarray, pilotos: tuple[str, ...]) -> dict:
+    """
+    Monta o dicionário de reavaliar_campeao a partir da matriz de totais.
+
+    Args:
+        totais: Array (pilotos, métodos) de combinações ou probabilidades
+        pilotos: Nomes dos pilotos, na ordem das linhas de totais
+
+    Returns:
+        Dicionário com total_combinacoes, por_campeao, por_metodo e
+        campeao_metodo
+    """
+    return {
+        'total_combinacoes': totais.sum().item(),
+        'por_campeao': {p: totais[i].sum().item() for i, p in enumerate(pilotos)},
+        'por_metodo': {m: totais[:, j].sum().item() for j, m in enumerate(METODOS)},
+        'campeao_metodo': {
+            (p, m): totais[i, j].item()
+            for i, p in enumerate(pilotos)
+            for j, m in enumerate(METODOS)
+            if totais[i, j] > 0
+        },
+    }
 
 
 # =============================================================================
 # SIMULAÇÃO POR CONVOLUÇÃO
 # =============================================================================
 
-def simular_cenarios() -> list[dict]:
+def _convoluir_fatia_counter(
+    estados: list[tuple[tuple[int, ...], int]],
+    deltas_evento: list[tuple[int, ...]],
+) -> Counter[tuple[int, ...]]:
+    """Convolui uma fatia de estados (delta, contagem) com um evento."""
+    parcial: Counter[tuple[int, ...]] = Counter()
+
+    for delta_estado, count_estado in estados:
+        for delta_evento in deltas_evento:
+            parcial[tuple(map(add, delta_estado, delta_evento))] += count_estado
+
+    return parcial
+
+
+def _convoluir_evento_counter(
+    estados: list[tuple[tuple[int, ...], int]],
+    deltas_evento: list[tuple[int, ...]],
+    executor: ProcessPoolExecutor | None,
+    num_fatias: int,
+) -> Counter[tuple[int, ...]]:
     """
-    Simula todos os cenários usando convolução de deltas.
+    Convolui estados com um evento, em série ou fatiando o laço externo.
 
-    Fases:
-    1. Gera deltas para Sprint Qatar, Race Qatar, Race Abu Dhabi
-    2. Convolui Sprint + Race Qatar → estados intermediários
-    3. Convolui intermediários + Abu Dhabi → estados finais
-    4. Determina campeão para cada estado final
+    No modo paralelo cada processo recebe uma fatia contígua de estados e
+    os Counters parciais são somados.
+    """
+    if executor is None:
+        return _convoluir_fatia_counter(estados, deltas_evento)
+
+    tamanho = -(-len(estados) // num_fatias)
+    futuros = [
+        executor.submit(_convoluir_fatia_counter, estados[i:i + tamanho], deltas_evento)
+        for i in range(0, len(estados), tamanho)
+    ]
+
+    total: Counter[tuple[int, ...]] = Counter()
+    for futuro in futuros:
+        total.update(futuro.result())
+    return total
+
+
+def _convoluir_counter(
+    campeonato: Campeonato,
+    deltas_eventos: list[np.ndarray],
+    codec: CodecEstado,
+    executor: ProcessPoolExecutor | None = None,
+    num_fatias: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convolução de referência com Counter de tuplas de deltas.
 
     Returns:
-        Lista de cenários com deltas, pontuação final e campeão
+        (estados, contagens): estados codificados por codec e combinações
     """
-    print("=" * 60)
-    print("SIMULAÇÃO DE CENÁRIOS DE CAMPEONATO F1 2025")
-    print("=" * 60)
+    tuplas_eventos = [list(map(tuple, d.tolist())) for d in deltas_eventos]
+    estados: list[tuple[tuple[int, ...], int]] = [(d, 1) for d in tuplas_eventos[0]]
+
+    for evento, deltas_evento in zip(campeonato.eventos[1:], tuplas_eventos[1:]):
+        parcial = _convoluir_evento_counter(estados, deltas_evento, executor, num_fatias)
+        estados = list(parcial.items())
+        print(f"  + {evento.nome}: {len(estados):,} estados únicos")
+
+    linhas = np.array([delta for delta, _ in estados], dtype=np.int16)
+    contagens = np.fromiter((count for _, count in estados), dtype=np.int64, count=len(estados))
+    return codec.codificar(linhas), contagens
+
+
+def _convoluir_numpy(
+    campeonato: Campeonato,
+    deltas_eventos: list[np.ndarray],
+    codec: CodecEstado,
+    executor: ProcessPoolExecutor | None = None,
+    num_fatias: int = 1,
+    usar_cache: bool = True,
+    pesos_eventos: list[np.ndarray] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convolução vetorizada sobre chaves int64 empacotadas.
 
-    # Gerar deltas para cada evento
-    print("\n[1/4] Gerando deltas por evento...")
-    deltas_sprint = gerar_deltas_evento(POSICOES_SPRINT, PONTOS_SPRINT)
-    deltas_corrida = gerar_deltas_evento(POSICOES_CORRIDA, PONTOS_CORRIDA)
+    Os estados circulam como chaves do CodecEstado (8 bytes por estado);
+    a decodificação em colunas fica para a escrita da tabela. Com cache,
+    parte do maior prefixo de eventos já salvo em disco e salva cada
+    estágio calculado. Com pesos_eventos (modo ponderado), as contagens
+    são massa de probabilidade float64.
+
+    Returns:
+        (estados, contagens): estados codificados por codec e combinações
+    """
+    eventos = campeonato.eventos
+    chaves_eventos = [codec.codificar(d) for d in deltas_eventos]
+    hashes = hashes_prefixos(eventos, campeonato.pilotos)
+
+    inicio, histograma = carregar_maior_prefixo(hashes, codec) if usar_cache else (0, None)
+    if histograma is None:
+        inicio = 1
+        estados = chaves_eventos[0]
+        contagens = np.ones(len(estados), dtype=np.int64) if pesos_eventos is None \
+            else pesos_eventos[0]
+    else:
+        estados, contagens = histograma
+        print(f"  Cache: {inicio} de {len(eventos)} eventos já calculados")
+
+    for k in range(inicio, len(eventos)):
+        pesos = None if pesos_eventos is None else pesos_eventos[k]
+        if executor is None:
+            estados, contagens = convoluir(estados, contagens, chaves_eventos[k], pesos)
+        else:
+            estados, contagens = convoluir_paralelo(
+                estados, contagens, chaves_eventos[k], executor, num_fatias, pesos
+            )
+        print(f"  + {eventos[k].nome}: {len(estados):,} estados únicos")
+
+        if usar_cache:
+            salvar_estagio(hashes[k], estados, contagens, codec)
+
+    return estados, contagens
+
+
+def _convoluir_duckdb(
+    conn: duckdb.DuckDBPyConnection,
+    campeonato: Campeonato,
+    deltas_eventos: list[np.ndarray],
+) -> str:
+    """
+    Convolução em SQL: cada evento é um CROSS JOIN + GROUP BY no DuckDB.
 
-    print(f"  Sprint Qatar: {len(deltas_sprint)} combinações")
-    print(f"  Race Qatar: {len(deltas_corrida)} combinações")
-    print(f"  Race Abu Dhabi: {len(deltas_corrida)} combinações")
-    print(f"  Espaço bruto: {len(deltas_sprint) * len(deltas_corrida) ** 2:,}")
+    Os estágios intermediários são tabelas temporárias descartadas assim
+    que o estágio seguinte é criado.
 
-    # Fase 1: Convolução Sprint Qatar + Race Qatar
-    print("\n[2/4] Convoluindo Sprint Qatar + Race Qatar...")
-    estados_qatar: Counter[DeltaTrio] = Counter()
+    Returns:
+        Nome da tabela temporária com os estados finais (colunas_deltas()
+        e num_combinacoes)
+    """
+    eventos = campeonato.eventos
+    colunas = colunas_deltas(campeonato.pilotos)
+    for k, deltas in enumerate(deltas_eventos):
+        registrar_deltas(conn, f'deltas_evento_{k}', deltas, colunas)
+
+    estados = 'deltas_evento_0'
+    for k in range(1, len(eventos)):
+        destino = f'estagio_{k}'
+        num_estados = convoluir_sql(conn, estados, f'deltas_evento_{k}', destino, colunas)
+        conn.execute(f"DROP TABLE IF EXISTS {estados}")
+        conn.execute(f"DROP TABLE deltas_evento_{k}")
+        estados = destino
+        print(f"  + {eventos[k].nome}: {num_estados:,} estados únicos")
+
+    return estados
+
+
+def _convoluir_fft(
+    campeonato: Campeonato,
+    deltas_eventos: list[np.ndarray],
+    codec: CodecEstado,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convolução por FFT: pontos de cada piloto como eixos de cubos densos.
 
-    for ds in deltas_sprint:
-        for dr in deltas_corrida:
-            delta_combinado = somar_delta_trios(ds, dr)
-            estados_qatar[delta_combinado] += 1
+    Vitórias, segundos e terceiros formam a chave esparsa de cada cubo
+    (ver convolucao_fft). O custo cresce com o volume dos cubos de pontos.
 
-    print(f"  Estados únicos após Qatar: {len(estados_qatar):,}")
+    Returns:
+        (estados, contagens): estados codificados por codec e combinações
+    """
+    num_campos = len(fields(Delta))
+    colunas_pontos = [i * num_campos for i in range(len(campeonato.pilotos))]
 
-    # Fase 2: Convolução com Abu Dhabi
-    print("\n[3/4] Convoluindo com Race Abu Dhabi...")
-    estados_finais: Counter[DeltaTrio] = Counter()
+    linhas, contagens = convoluir_fft(deltas_eventos, colunas_pontos, codec.maximos)
+    estados, contagens = agregar(codec.codificar(linhas), contagens)
+    print(f"  + {campeonato.eventos[-1].nome}: {len(estados):,} estados únicos")
 
-    for delta_qatar, count_qatar in estados_qatar.items():
-        for da in deltas_corrida:
-            delta_final = somar_delta_trios(delta_qatar, da)
-            estados_finais[delta_final] += count_qatar
+    return estados, contagens
 
-    print(f"  Estados finais únicos: {len(estados_finais):,}")
 
-    # Fase 3: Determinar campeão para cada estado
-    print("\n[4/4] Determinando campeão para cada estado...")
-    cenarios = []
+def _gerar_deltas_eventos(campeonato: Campeonato, motor: str) -> list[np.ndarray]:
+    """
+    Fase 1: gera os deltas de cada evento do campeonato.
 
-    for delta, num_combinacoes in estados_finais.items():
-        # Calcular stats finais
-        pts_final = (
-            PONTOS_ATUAIS['norris'] + delta.norris.pontos,
-            PONTOS_ATUAIS['piastri'] + delta.piastri.pontos,
-            PONTOS_ATUAIS['verstappen'] + delta.verstappen.pontos,
-        )
-        wins_final = (
-            VITORIAS_ATUAIS['norris'] + delta.norris.vitoria,
-            VITORIAS_ATUAIS['piastri'] + delta.piastri.vitoria,
-            VITORIAS_ATUAIS['verstappen'] + delta.verstappen.vitoria,
+    Raises:
+        ValueError: Se o total de combinações não cabe nas contagens int64
+    """
+    print(f"\n[1/3] Gerando deltas por evento (motor: {motor})...")
+    print(f"  Pilotos: {', '.join(campeonato.pilotos)}")
+    num_pilotos = len(campeonato.pilotos)
+    deltas_eventos = [gerar_deltas(e, num_pilotos) for e in campeonato.eventos]
+
+    for evento, deltas in zip(campeonato.eventos, deltas_eventos):
+        print(f"  {evento.nome}: {len(deltas)} combinações")
+
+    espaco = prod(len(d) for d in deltas_eventos)
+    print(f"  Espaço bruto: {espaco:,}")
+    if espaco >= LIMITE_CHAVE:
+        raise ValueError(
+            f"Espaço bruto de {espaco:.2e} combinações não cabe em contagens int64; "
+            "reduza o número de pilotos ou de eventos"
         )
-        seconds_final = (
-            SEGUNDOS_ATUAIS['norris'] + delta.norris.segundo,
-            SEGUNDOS_ATUAIS['piastri'] + delta.piastri.segundo,
-            SEGUNDOS_ATUAIS['verstappen'] + delta.verstappen.segundo,
+
+    return deltas_eventos
+
+
+def escolher_motor(campeonato: Campeonato, deltas_eventos: list[np.ndarray]) -> str:
+    """
+    Escolhe o motor de convolução para o motor 'auto'.
+
+    A FFT só compensa com cubos de pontos densos (ver convolucao_fft.densidade);
+    com poucas combinações por célula, o motor numpy é mais rápido.
+
+    Returns:
+        'fft' se a densidade atinge DENSIDADE_MINIMA_FFT, senão 'numpy'
+    """
+    num_campos = len(fields(Delta))
+    colunas_pontos = [i * num_campos for i in range(len(campeonato.pilotos))]
+    valor = densidade(deltas_eventos, colunas_pontos)
+    motor = 'fft' if valor >= DENSIDADE_MINIMA_FFT else 'numpy'
+    print(f"  Densidade dos cubos: {valor:.3g} combinações/célula → motor '{motor}'")
+    return motor
+
+
+def _gerar_pesos_eventos(
+    campeonato: Campeonato,
+    probabilidades: Probabilidades,
+) -> list[np.ndarray]:
+    """
+    Gera a probabilidade de cada delta de cada evento (modo ponderado).
+
+    Os pesos seguem a ordem de gerar_deltas. Eventos e pilotos ausentes de
+    probabilidades usam a distribuição uniforme.
+
+    Raises:
+        ValueError: Se um evento ou piloto não existe no campeonato
+    """
+    nomes = [e.nome for e in campeonato.eventos]
+    for nome, distribuicoes in probabilidades.items():
+        if nome not in nomes:
+            raise ValueError(f"Evento desconhecido: {nome!r}. Opções: {', '.join(nomes)}")
+        desconhecidos = set(distribuicoes) - set(campeonato.pilotos)
+        if desconhecidos:
+            raise ValueError(f"Pilotos fora do campeonato em {nome!r}: {sorted(desconhecidos)}")
+
+    return [
+        pesos_posicoes(
+            gerar_posicoes(evento, len(campeonato.pilotos)), evento.posicoes, FORA_PONTOS,
+            campeonato.pilotos, probabilidades.get(evento.nome, {}),
         )
-        thirds_final = (
-            TERCEIROS_ATUAIS['norris'] + delta.norris.terceiro,
-            TERCEIROS_ATUAIS['piastri'] + delta.piastri.terceiro,
-            TERCEIROS_ATUAIS['verstappen'] + delta.verstappen.terceiro,
+        for evento in campeonato.eventos
+    ]
+
+
+def simular_deltas(
+    motor: str = 'numpy',
+    trabalhadores: int | None = 1,
+    usar_cache: bool = True,
+    campeonato: Campeonato = CAMPEONATO,
+    probabilidades: Probabilidades | None = None,
+) -> HistogramaDeltas:
+    """
+    Calcula o histograma de deltas finais, independente da classificação.
+
+    Fases:
+    1. Gera deltas para cada evento do campeonato
+    2. Convolui os eventos em sequência → estados finais
+
+    Args:
+        motor: Motor de convolução ('numpy', 'counter', 'duckdb' ou 'fft',
+            ver MOTORES), ou 'auto' para escolher_motor
+        trabalhadores: Processos para as fases de convolução. 1 executa em
+            série; None usa todos os núcleos. O resultado não depende do valor.
+            O motor 'duckdb' usa as threads do próprio DuckDB; 'fft' é serial.
+        usar_cache: Reaproveita estágios de convolução salvos em disco
+            (apenas motor 'numpy' sem probabilidades)
+        campeonato: Pilotos e eventos a simular (padrão: CAMPEONATO)
+        probabilidades: {evento: {piloto: {posição: probabilidade}}} para o
+            modo ponderado (apenas motor 'numpy'); None conta combinações
+
+    Returns:
+        Histograma de deltas finais (contagens float64 no modo ponderado)
+    """
+    if motor not in MOTORES and motor != MOTOR_AUTOMATICO:
+        raise ValueError(
+            f"Motor desconhecido: {motor!r}. Opções: {', '.join(MOTORES)}, {MOTOR_AUTOMATICO}"
         )
+    if probabilidades is not None and motor not in ('numpy', MOTOR_AUTOMATICO):
+        raise ValueError(f"Modo ponderado disponível apenas no motor 'numpy', não {motor!r}")
+
+    deltas_eventos = _gerar_deltas_eventos(campeonato, motor)
+    if motor == MOTOR_AUTOMATICO:
+        motor = 'numpy' if probabilidades is not None else escolher_motor(campeonato, deltas_eventos)
+    pesos_eventos = None
+    if probabilidades is not None:
+        print("  Modo ponderado: massa de probabilidade por estado")
+        pesos_eventos = _gerar_pesos_eventos(campeonato, probabilidades)
+        usar_cache = False
+
+        # Resultados impossíveis (probabilidade zero) não geram estados
+        possiveis = [pesos > 0 for pesos in pesos_eventos]
+        deltas_eventos = [d[m] for d, m in zip(deltas_eventos, possiveis)]
+        pesos_eventos = [p[m] for p, m in zip(pesos_eventos, possiveis)]
+
+    # Codec dimensionado para a soma de todos os eventos
+    codec = CodecEstado.para_eventos(deltas_eventos)
+    if not codec.compacto:
+        print("  Estados não cabem em uma chave int64: convolução por linhas")
+
+    print("\n[2/3] Convoluindo eventos...")
+    if motor == 'duckdb':
+        with duckdb.connect() as conn:
+            tabela = _convoluir_duckdb(conn, campeonato, deltas_eventos)
+            dados = conn.execute(f"SELECT * FROM {tabela}").fetchnumpy()
+
+        colunas = colunas_deltas(campeonato.pilotos)
+        linhas = np.column_stack([dados[c] for c in colunas]).astype(np.int16)
+        chaves, contagens = agregar(codec.codificar(linhas), dados['num_combinacoes'])
+        return HistogramaDeltas(chaves, contagens, codec, campeonato.pilotos)
+
+    if motor == 'fft':
+        chaves, contagens = _convoluir_fft(campeonato, deltas_eventos, codec)
+        return HistogramaDeltas(chaves, contagens, codec, campeonato.pilotos)
+
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    if trabalhadores > 1:
+        print(f"  Paralelo: {trabalhadores} processos")
+        contexto = ProcessPoolExecutor(max_workers=trabalhadores)
+    else:
+        contexto = nullcontext()
+
+    with contexto as executor:
+        opcoes = dict(executor=executor, num_fatias=trabalhadores * FATIAS_POR_TRABALHADOR)
+        if motor == 'counter':
+            chaves, contagens = _convoluir_counter(campeonato, deltas_eventos, codec, **opcoes)
+        else:
+            chaves, contagens = _convoluir_numpy(
+                campeonato, deltas_eventos, codec, usar_cache=usar_cache,
+                pesos_eventos=pesos_eventos, **opcoes
+            )
+
+    # Só o motor numpy com cache grava os estágios (e a redução do histograma final)
+    return HistogramaDeltas(
+        chaves, contagens, codec, campeonato.pilotos, usar_cache=motor == 'numpy' and usar_cache,
+    )
 
-        campeao, metodo = determinar_campeao(pts_final, wins_final, seconds_final, thirds_final)
-
-        cenarios.append({
-            # Deltas
-            'delta_pts_norris': delta.norris.pontos,
-            'delta_pts_piastri': delta.piastri.pontos,
-            'delta_pts_verstappen': delta.verstappen.pontos,
-            'delta_wins_norris': delta.norris.vitoria,
-            'delta_wins_piastri': delta.piastri.vitoria,
-            'delta_wins_verstappen': delta.verstappen.vitoria,
-            # Finais
-            'pts_final_norris': pts_final[0],
-            'pts_final_piastri': pts_final[1],
-            'pts_final_verstappen': pts_final[2],
-            'wins_final_norris': wins_final[0],
-            'wins_final_piastri': wins_final[1],
-            'wins_final_verstappen': wins_final[2],
+
+def lotes_cenarios(
+    histograma: HistogramaDeltas,
+    tamanho_lote: int = LOTE_DECODIFICACAO,
+    campeonato: Campeonato = CAMPEONATO,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Gera a tabela de cenários em lotes colunares Arrow.
+
+    Cada lote decodifica um trecho do histograma, soma a classificação
+    atual e determina o campeão; só um lote fica em memória por vez.
+
+    Args:
+        histograma: Histograma de deltas finais
+        tamanho_lote: Estados por lote
+        campeonato: Fornece a classificação atual dos pilotos do histograma
+
+    Yields:
+        RecordBatch com as colunas de cenarios_campeao (probabilidade em vez
+        de num_combinacoes para histogramas ponderados)
+    """
+    pilotos = histograma.pilotos
+    atual = campeonato.classificacao()
+    ponderado = np.issubdtype(histograma.contagens.dtype, np.floating)
+    coluna_peso, tipo_peso = colunas_tabela(pilotos, ponderado)[-1]
+
+    for inicio in range(0, len(histograma), tamanho_lote):
+        fim = inicio + tamanho_lote
+        deltas = histograma.deltas(inicio, fim)
+        finais = deltas + atual
+        campeoes, metodos = determinar_campeoes(finais, pilotos)
+
+        colunas = {}
+        for nome, origem in (('delta_{}_{}', deltas), ('{}_final_{}', finais)):
+            for j, (estatistica, tipo) in enumerate(ESTATISTICAS_TABELA):
+                for i, p in enumerate(pilotos):
+                    colunas[nome.format(estatistica, p)] = pa.array(
+                        origem[:, i, j], type=TIPOS_ARROW[tipo]
+                    )
+
+        yield pa.RecordBatch.from_pydict({
+            # Deltas e finais
+            **colunas,
             # Resultado
-            'campeao': campeao,
-            'metodo_decisao': metodo,
-            'num_combinacoes': num_combinacoes,
+            'campeao': pa.DictionaryArray.from_arrays(campeoes.astype(np.int8), list(pilotos)),
+            'metodo_decisao': pa.DictionaryArray.from_arrays(metodos.astype(np.int8), METODOS),
+            coluna_peso: pa.array(histograma.contagens[inicio:fim], type=TIPOS_ARROW[tipo_peso]),
         })
 
-    total_comb = sum(c['num_combinacoes'] for c in cenarios)
-    print(f"\n  Total de estados únicos: {len(cenarios):,}")
-    print(f"  Total de combinações representadas: {total_comb:,}")
 
-    return cenarios
+def simular_cenarios(
+    motor: str = 'numpy',
+    trabalhadores: int | None = 1,
+    usar_cache: bool = True,
+    campeonato: Campeonato = CAMPEONATO,
+    probabilidades: Probabilidades | None = None,
+) -> pa.RecordBatchReader:
+    """
+    Simula todos os cenários usando convolução de deltas.
+
+    Calcula o histograma de deltas (simular_deltas) e devolve um leitor
+    Arrow que determina o campeão de cada estado final, com a classificação
+    atual, à medida que os lotes são consumidos.
+
+    Args:
+        motor: Motor de convolução ('numpy', 'counter', 'duckdb' ou 'fft', ver
+            MOTORES), ou 'auto' para escolher_motor
+        trabalhadores: Processos para as fases de convolução (ver simular_deltas)
+        usar_cache: Reaproveita estágios de convolução salvos em disco
+        campeonato: Pilotos, eventos e classificação (padrão: CAMPEONATO)
+        probabilidades: Distribuições de posição para o modo ponderado
+            (ver simular_deltas); a última coluna passa a ser probabilidade
+
+    Returns:
+        Leitor de RecordBatches com deltas, pontuação final e campeão
+    """
+    print("=" * 60)
+    print("SIMULAÇÃO DE CENÁRIOS DE CAMPEONATO F1 2025")
+    print("=" * 60)
+
+    histograma = simular_deltas(
+        motor=motor, trabalhadores=trabalhadores, usar_cache=usar_cache, campeonato=campeonato,
+        probabilidades=probabilidades,
+    )
+
+    # Fase 3: Determinar campeão para cada estado (sob demanda, em lotes)
+    print("\n[3/3] Determinando campeão para cada estado (em lotes)...")
+    print(f"  Total de estados únicos: {len(histograma):,}")
+    if probabilidades is None:
+        print(f"  Total de combinações representadas: {int(histograma.contagens.sum()):,}")
+    else:
+        print(f"  Massa de probabilidade total: {histograma.contagens.sum():.6f}")
+
+    return leitor_cenarios(histograma, campeonato)
+
+
+def leitor_cenarios(
+    histograma: HistogramaDeltas,
+    campeonato: Campeonato = CAMPEONATO,
+) -> pa.RecordBatchReader:
+    """Leitor Arrow sobre lotes_cenarios (vazio se o histograma não tem estados)."""
+    ponderado = np.issubdtype(histograma.contagens.dtype, np.floating)
+    return pa.RecordBatchReader.from_batches(
+        esquema_cenarios(histograma.pilotos, ponderado),
+        lotes_cenarios(histograma, campeonato=campeonato),
+    )
 
 
 # =============================================================================
 # BANCO DE DADOS
 # =============================================================================
 
-def criar_tabela(conn: duckdb.DuckDBPyConnection) -> None:
-    """Cria tabela cenarios_campeao."""
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS cenarios_campeao (
-            delta_pts_norris INTEGER,
-            delta_pts_piastri INTEGER,
-            delta_pts_verstappen INTEGER,
-            delta_wins_norris INTEGER,
-            delta_wins_piastri INTEGER,
-            delta_wins_verstappen INTEGER,
-            pts_final_norris INTEGER,
-            pts_final_piastri INTEGER,
-            pts_final_verstappen INTEGER,
-            wins_final_norris INTEGER,
-            wins_final_piastri INTEGER,
-            wins_final_verstappen INTEGER,
-            campeao VARCHAR,
-            metodo_decisao VARCHAR,
-            num_combinacoes INTEGER
+def colunas_tabela(
+    pilotos: tuple[str, ...] = tuple(PILOTOS),
+    ponderado: bool = False,
+) -> list[tuple[str, str]]:
+    """
+    Colunas de cenarios_campeao, na ordem da tabela.
+
+    Args:
+        pilotos: Pilotos da disputa, na ordem das colunas
+        ponderado: Se True, a última coluna é probabilidade (DOUBLE)
+
+    Returns:
+        Lista de (nome, tipo SQL): deltas e finais de cada estatística por
+        piloto, seguidos de campeão, método e número de combinações (ou
+        probabilidade)
+    """
+    colunas = []
+    for nome in ('delta_{}_{}', '{}_final_{}'):
+        for estatistica, tipo in ESTATISTICAS_TABELA:
+            colunas += [(nome.format(estatistica, p), tipo) for p in pilotos]
+
+    return colunas + [
+        ('campeao', 'VARCHAR'),
+        ('metodo_decisao', 'VARCHAR'),
+        ('probabilidade', 'DOUBLE') if ponderado else ('num_combinacoes', 'BIGINT'),
+    ]
+
+
+def esquema_cenarios(
+    pilotos: tuple[str, ...] = tuple(PILOTOS),
+    ponderado: bool = False,
+) -> pa.Schema:
+    """
+    Esquema Arrow dos lotes de lotes_cenarios, tirado de colunas_tabela.
+
+    Campeão e método são dicionários com índices int8; as demais colunas
+    seguem TIPOS_ARROW.
+    """
+    return pa.schema([
+        (nome, pa.dictionary(pa.int8(), pa.string()) if tipo == 'VARCHAR' else TIPOS_ARROW[tipo])
+        for nome, tipo in colunas_tabela(pilotos, ponderado)
+    ])
+
+
+def criar_tabela(
+    conn: duckdb.DuckDBPyConnection,
+    pilotos: tuple[str, ...] = tuple(PILOTOS),
+    tabela: str = 'cenarios_campeao',
+) -> None:
+    """Cria tabela de cenários (padrão: cenarios_campeao) com colunas para cada piloto."""
+    definicoes = ',\n            '.join(f'{nome} {tipo}' for nome, tipo in colunas_tabela(pilotos))
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {tabela} (
+            {definicoes}
         )
     """)
 
 
-def popular_banco(conn: duckdb.DuckDBPyConnection, cenarios: list[dict]) -> None:
-    """Popula banco via DataFrame para máxima performance."""
-    import pandas as pd
+def popular_banco(
+    conn: duckdb.DuckDBPyConnection,
+    cenarios: pa.RecordBatchReader,
+    tabela: str = 'cenarios_campeao',
+) -> None:
+    """
+    Popula banco a partir de um fluxo Arrow.
 
+    O DuckDB consome o leitor lote a lote, então a memória fica limitada
+    a um lote e não à tabela inteira.
+    """
     print("\nPopulando banco de dados...")
-    df = pd.DataFrame(cenarios)
-    conn.execute("INSERT INTO cenarios_campeao SELECT * FROM df")
+    conn.register('lotes_cenarios', cenarios)
+    try:
+        inseridos = conn.execute(
+            f"INSERT INTO {tabela} SELECT * FROM lotes_cenarios"
+        ).fetchone()[0]
+    finally:
+        conn.unregister('lotes_cenarios')
     conn.commit()
-    print(f"  Inseridos {len(cenarios):,} estados.")
+    print(f"  Inseridos {inseridos:,} estados.")
+
+
+def _sql_cenarios(tabela: str, maximos: np.ndarray, campeonato: Campeonato) -> str:
+    """
+    Monta o SELECT que completa os estados de tabela com finais e campeão.
+
+    Replica determinar_campeoes em SQL: cada piloto recebe uma chave
+    BIGINT que empilha pontos, vitórias, 2º, 3º e a ordem do nome em base
+    mista; o campeão tem a maior chave e o método é o primeiro dígito em
+    que campeão e vice diferem.
+
+    Args:
+        tabela: Tabela com colunas_deltas() e num_combinacoes
+        maximos: Máximo atingível de cada coluna de deltas
+        campeonato: Pilotos e classificação atual
+
+    Returns:
+        SELECT com as colunas de cenarios_campeao, na ordem de colunas_tabela()
+    """
+    pilotos = campeonato.pilotos
+    atual = campeonato.classificacao()
+    estatisticas = [e for e, _ in ESTATISTICAS_TABELA]
+    num_pilotos = len(pilotos)
+
+    # Bases e pesos da chave (critérios mais significativos primeiro)
+    bases = (atual + np.reshape(maximos, atual.shape)).max(axis=0) + 1
+    pesos = [num_pilotos * int(np.prod(bases[c + 1:])) for c in range(len(bases))]
+    ordem_nome = np.argsort(np.argsort(pilotos))
+
+    finais = [
+        f'delta_{e}_{p} + {atual[i, j]} AS {e}_final_{p}'
+        for j, e in enumerate(estatisticas)
+        for i, p in enumerate(pilotos)
+    ]
+    chaves = [
+        ' + '.join(f'{e}_final_{p}::BIGINT * {pesos[j]}' for j, e in enumerate(estatisticas))
+        + f' + {ordem_nome[i]} AS chave_{p}'
+        for i, p in enumerate(pilotos)
+    ]
+    campeao = ' '.join(f"WHEN chave_{p} = ordem[1] THEN '{p}'" for p in pilotos)
+    metodo = ' '.join(
+        f"WHEN ordem[1] // {pesos[j]} % {bases[j]} <> ordem[2] // {pesos[j]} % {bases[j]} "
+        f"THEN '{METODOS[j]}'"
+        for j in range(len(estatisticas))
+    )
+    colunas = [nome for nome, _ in colunas_tabela(pilotos)[:-3]]
+
+    return f"""
+        SELECT {', '.join(colunas)},
+               CASE {campeao} END AS campeao,
+               CASE {metodo} ELSE '{METODOS[-1]}' END AS metodo_decisao,
+               num_combinacoes
+        FROM (
+            SELECT *, list_sort([{', '.join(f'chave_{p}' for p in pilotos)}], 'DESC') AS ordem
+            FROM (
+                SELECT *, {', '.join(chaves)}
+                FROM (SELECT *, {', '.join(finais)} FROM {tabela})
+            )
+        )
+    """
 
 
-def gerar_estatisticas(conn: duckdb.DuckDBPyConnection) -> dict:
-    """Gera estatísticas dos cenários."""
+def popular_banco_sql(
+    conn: duckdb.DuckDBPyConnection,
+    campeonato: Campeonato = CAMPEONATO,
+) -> None:
+    """
+    Simula e popula cenarios_campeao inteiramente dentro do DuckDB.
+
+    Só a geração de deltas roda em Python; convolução, determinação do
+    campeão e inserção são consultas SQL (ver convolucao_sql e
+    _sql_cenarios).
+    """
+    print("=" * 60)
+    print("SIMULAÇÃO DE CENÁRIOS DE CAMPEONATO F1 2025")
+    print("=" * 60)
+
+    deltas_eventos = _gerar_deltas_eventos(campeonato, 'duckdb')
+    maximos = CodecEstado.para_eventos(deltas_eventos).maximos
+
+    print("\n[2/3] Convoluindo eventos...")
+    tabela = _convoluir_duckdb(conn, campeonato, deltas_eventos)
+
+    print("\n[3/3] Determinando campeão para cada estado (SQL)...")
+    try:
+        inseridos = conn.execute(
+            f"INSERT INTO cenarios_campeao {_sql_cenarios(tabela, maximos, campeonato)}"
+        ).fetchone()[0]
+    finally:
+        conn.execute(f"DROP TABLE IF EXISTS {tabela}")
+    conn.commit()
+    print(f"  Inseridos {inseridos:,} estados.")
+
+
+def gerar_estatisticas(conn: duckdb.DuckDBPyConnection, prefixo: str = '') -> dict:
+    """Gera estatísticas dos cenários a partir dos resumos materializados."""
     stats = {}
 
     # Totais
-    result = conn.execute("""
-        SELECT COUNT(*) as estados, SUM(num_combinacoes) as combinacoes
-        FROM cenarios_campeao
+    result = conn.execute(f"""
+        SELECT SUM(estados) as estados, SUM(combinacoes) as combinacoes
+        FROM {prefixo}resumo_campeao
     """).fetchone()
     stats['total_estados'] = result[0]
     stats['total_combinacoes'] = result[1]
 
     # Por campeão
-    stats['por_campeao'] = conn.execute("""
-        SELECT campeao,
-               SUM(num_combinacoes) as combinacoes,
-               COUNT(*) as estados,
-               ROUND(100.0 * SUM(num_combinacoes) /
-                     (SELECT SUM(num_combinacoes) FROM cenarios_campeao), 4) as chance
-        FROM cenarios_campeao
-        GROUP BY campeao
+    stats['por_campeao'] = conn.execute(f"""
+        SELECT campeao, combinacoes, estados, ROUND(chance, 4) as chance
+        FROM {prefixo}resumo_campeao
         ORDER BY combinacoes DESC
     """).fetchall()
 
     # Por método
-    stats['por_metodo'] = conn.execute("""
-        SELECT metodo_decisao,
-               SUM(num_combinacoes) as combinacoes,
-               COUNT(*) as estados
-        FROM cenarios_campeao
-        GROUP BY metodo_decisao
+    stats['por_metodo'] = conn.execute(f"""
+        SELECT metodo_decisao, combinacoes, estados
+        FROM {prefixo}resumo_metodo
         ORDER BY combinacoes DESC
     """).fetchall()
 
     # Campeão + método
-    stats['campeao_metodo'] = conn.execute("""
-        SELECT campeao, metodo_decisao,
-               SUM(num_combinacoes) as combinacoes
-        FROM cenarios_campeao
-        GROUP BY campeao, metodo_decisao
+    stats['campeao_metodo'] = conn.execute(f"""
+        SELECT campeao, metodo_decisao, combinacoes
+        FROM {prefixo}resumo_campeao_metodo
         ORDER BY campeao, combinacoes DESC
     """).fetchall()
 
@@ -437,80 +1299,171 @@ def imprimir_estatisticas(stats: dict) -> None:
 # EXECUÇÃO PRINCIPAL
 # =============================================================================
 
-def criar_views_agregadas(conn: duckdb.DuckDBPyConnection) -> None:
-    """Cria views agregadas para consultas rápidas."""
+def criar_tabelas_resumo(
+    conn: duckdb.DuckDBPyConnection,
+    pilotos: tuple[str, ...] = tuple(PILOTOS),
+    tabela: str = 'cenarios_campeao',
+    prefixo: str = '',
+) -> None:
+    """
+    Materializa os resumos lidos pelo dashboard.
+
+    Cada tabela tem poucas linhas e é recriada a cada build, junto com o
+    registro em simulation_runs (ver executar), então o dashboard não
+    reagrega cenarios_campeao a cada acesso:
 
-    # View: resumo por campeão
-    conn.execute("""
-        CREATE OR REPLACE VIEW v_resumo_campeao AS
+    - resumo_cenarios: todos os agrupamentos de uma só passada (GROUPING
+      SETS), com o nível de cada linha em nivel (ver NIVEIS_RESUMO)
+    - resumo_campeao: combinações, estados e chance (%) por campeão
+    - resumo_metodo: combinações, estados e porcentagem por método
+    - resumo_campeao_metodo: combinações, estados e porcentagem por par
+    - distribuicao_pontos: combinações e estados por (piloto, pontos finais)
+
+    Args:
+        conn: Conexão DuckDB de escrita
+        pilotos: Pilotos da tabela (colunas pts_final_*)
+        tabela: Tabela de cenários resumida
+        prefixo: Prefixo dos nomes dos resumos e views (ex: 'mc_' para
+            mc_resumo_campeao e v_mc_resumo_campeao), para resumir outra
+            tabela sem sobrescrever os resumos de cenarios_campeao
+    """
+    # Todos os agrupamentos em uma única passada; o total de cada nível é o geral
+    conn.execute(f"""
+        CREATE OR REPLACE TABLE {prefixo}resumo_cenarios AS
         SELECT
+            GROUPING(campeao, metodo_decisao) AS nivel,
             campeao,
-            SUM(num_combinacoes) as total_combinacoes,
-            COUNT(*) as total_estados,
-            ROUND(100.0 * SUM(num_combinacoes) /
-                  (SELECT SUM(num_combinacoes) FROM cenarios_campeao), 2) as chance_pct
-        FROM cenarios_campeao
-        GROUP BY campeao
-        ORDER BY total_combinacoes DESC
+            metodo_decisao,
+            SUM(num_combinacoes)::BIGINT AS combinacoes,
+            COUNT(*) AS estados,
+            100.0 * SUM(num_combinacoes) / SUM(SUM(num_combinacoes)) OVER (
+                PARTITION BY GROUPING(campeao, metodo_decisao)
+            ) AS pct
+        FROM {tabela}
+        GROUP BY GROUPING SETS ((campeao, metodo_decisao), (campeao), (metodo_decisao), ())
+        ORDER BY nivel, combinacoes DESC
     """)
 
-    # View: resumo por método de decisão
-    conn.execute("""
-        CREATE OR REPLACE VIEW v_resumo_metodo AS
+    for resumo, grupo, porcentagem in (
+        ('resumo_campeao', 'campeao', 'chance'),
+        ('resumo_metodo', 'metodo_decisao', 'pct'),
+        ('resumo_campeao_metodo', 'campeao, metodo_decisao', 'pct'),
+    ):
+        nivel = NIVEIS_RESUMO[resumo.removeprefix('resumo_')]
+        conn.execute(f"""
+            CREATE OR REPLACE TABLE {prefixo}{resumo} AS
+            SELECT {grupo}, combinacoes, estados, pct AS {porcentagem}
+            FROM {prefixo}resumo_cenarios
+            WHERE nivel = {nivel}
+            ORDER BY combinacoes DESC
+        """)
+
+    # Pontos finais de todos os pilotos em uma única passada (UNPIVOT)
+    colunas = ', '.join(f'pts_final_{p} AS {p}' for p in pilotos)
+    conn.execute(f"""
+        CREATE OR REPLACE TABLE {prefixo}distribuicao_pontos AS
         SELECT
-            metodo_decisao,
-            SUM(num_combinacoes) as total_combinacoes,
-            ROUND(100.0 * SUM(num_combinacoes) /
-                  (SELECT SUM(num_combinacoes) FROM cenarios_campeao), 2) as pct
-        FROM cenarios_campeao
-        GROUP BY metodo_decisao
-        ORDER BY total_combinacoes DESC
+            piloto,
+            pontos,
+            SUM(num_combinacoes) AS combinacoes,
+            COUNT(*) AS estados
+        FROM (
+            UNPIVOT (SELECT {colunas}, num_combinacoes FROM {tabela})
+            ON {', '.join(pilotos)}
+            INTO NAME piloto VALUE pontos
+        )
+        GROUP BY piloto, pontos
+        ORDER BY piloto, pontos
     """)
 
+    # Nomes antigos das views, agora sobre os resumos materializados
+    for resumo in ('resumo_campeao', 'resumo_metodo'):
+        conn.execute(
+            f"CREATE OR REPLACE VIEW v_{prefixo}{resumo} AS SELECT * FROM {prefixo}{resumo}"
+        )
+
     # View: cenários de empate em pontos (decisão por vitórias ou além)
-    conn.execute("""
-        CREATE OR REPLACE VIEW v_cenarios_empate AS
+    conn.execute(f"""
+        CREATE OR REPLACE VIEW v_{prefixo}cenarios_empate AS
         SELECT *
-        FROM cenarios_campeao
+        FROM {tabela}
         WHERE metodo_decisao != 'pontos'
         ORDER BY num_combinacoes DESC
     """)
 
-    print("Views agregadas criadas: v_resumo_campeao, v_resumo_metodo, v_cenarios_empate")
+    resumos = ('resumo_cenarios', 'resumo_campeao', 'resumo_metodo', 'resumo_campeao_metodo',
+               'distribuicao_pontos')
+    print(f"Resumos materializados: {', '.join(prefixo + r for r in resumos)}")
 
 
-def executar(conn: duckdb.DuckDBPyConnection, force: bool = False) -> dict:
+def executar(
+    conn: duckdb.DuckDBPyConnection,
+    force: bool = False,
+    motor: str = MOTOR_AUTOMATICO,
+    trabalhadores: int | None = 1,
+    usar_cache: bool = True,
+    campeonato: Campeonato = CAMPEONATO,
+) -> dict:
     """
     Executa simulação completa.
 
     Args:
         conn: Conexão DuckDB
-        force: Se True, recalcula mesmo que dados existam
+        force: Se True, recalcula mesmo que dados existam. Sem force, só
+            recalcula se a execução registrada em simulation_runs tem outros
+            parâmetros (hash_campeonato) ou outra VERSAO_SIMULADOR
+        motor: Motor de convolução (ver MOTORES). Com 'duckdb' a simulação
+            inteira roda em SQL na própria conexão (popular_banco_sql); o
+            padrão 'auto' só usa 'fft' com cubos densos (escolher_motor)
+        trabalhadores: Processos usados na convolução (None = todos os núcleos)
+        usar_cache: Reaproveita estágios de convolução salvos em disco
+        campeonato: Pilotos, eventos e classificação (padrão: CAMPEONATO)
 
     Returns:
         Estatísticas da simulação
     """
-    from database.connection import is_populated
+    from database.connection import (
+        clear_simulation_run,
+        get_simulation_run,
+        is_populated,
+        record_simulation_run,
+    )
 
     tabela = 'cenarios_campeao'
+    parametros = hash_campeonato(campeonato)
 
-    # Verificar se já está populado
-    if not force and is_populated(conn, tabela):
+    # Verificar se já está populado com os mesmos parâmetros (uma linha em simulation_runs)
+    if not force and is_populated(conn, tabela, parametros, VERSAO_SIMULADOR):
         print(f"Tabela '{tabela}' já populada. Use force=True para recalcular.")
         return gerar_estatisticas(conn)
+    if not force and get_simulation_run(conn, tabela) is not None:
+        print(f"Tabela '{tabela}' desatualizada (parâmetros ou versão mudaram). Recalculando...")
 
-    # Recriar tabela
-    conn.execute(f"DROP TABLE IF EXISTS {tabela}")
-    criar_tabela(conn)
-
-    # Simular
-    cenarios = simular_cenarios()
+    inicio = time.perf_counter()
 
-    # Popular
-    popular_banco(conn, cenarios)
+    # Recriar tabela (sem registro até o fim: um build interrompido não conta como pronto)
+    clear_simulation_run(conn, tabela)
+    conn.execute(f"DROP TABLE IF EXISTS {tabela}")
+    criar_tabela(conn, campeonato.pilotos)
 
-    # Criar views
-    criar_views_agregadas(conn)
+    # Simular e popular
+    if motor == 'duckdb':
+        popular_banco_sql(conn, campeonato)
+    else:
+        cenarios = simular_cenarios(
+            motor=motor, trabalhadores=trabalhadores, usar_cache=usar_cache,
+            campeonato=campeonato,
+        )
+        popular_banco(conn, cenarios)
+
+    # Resumos e registro da execução na mesma transação
+    conn.execute("BEGIN TRANSACTION")
+    criar_tabelas_resumo(conn, campeonato.pilotos, tabela)
+    num_linhas = conn.execute("SELECT SUM(estados) FROM resumo_campeao").fetchone()[0]
+    record_simulation_run(
+        conn, tabela, parametros, VERSAO_SIMULADOR, num_linhas, time.perf_counter() - inicio
+    )
+    conn.execute("COMMIT")
 
     # Estatísticas
     stats = gerar_estatisticas(conn)
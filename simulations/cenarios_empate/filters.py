@@ -6,16 +6,16 @@ Utiliza SQL parametrizado para queries no DuckDB.
 import streamlit as st
 import pandas as pd
 
-from database import get_connection
+from database import read_lock, session_cursor
 
 
-@st.cache_resource
 def _get_db_connection():
-    """Retorna conexão cacheada com o banco."""
-    return get_connection()
+    """Retorna o cursor somente leitura da sessão (consultar sob @read_lock())."""
+    return session_cursor(st.session_state)
 
 
 @st.cache_data
+@read_lock()
 def carregar_opcoes_filtros() -> dict:
     """
     Carrega opções únicas para os filtros da sidebar.
@@ -46,6 +46,7 @@ def carregar_opcoes_filtros() -> dict:
 
 
 @st.cache_data
+@read_lock()
 def carregar_dados_filtrados(
     tipo_empate: str | None = None,
     pilotos_empatados: str | None = None,
@@ -94,6 +95,7 @@ def carregar_dados_filtrados(
 
 
 @st.cache_data
+@read_lock()
 def carregar_total_cenarios() -> int:
     """Retorna o total de cenários no banco."""
     conn = _get_db_connection()
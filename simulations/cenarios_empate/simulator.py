@@ -8,17 +8,26 @@ Posições fora dos pontos representadas como 99.
 """
 
 import csv
-from itertools import product
+import time
 from pathlib import Path
 
+import duckdb
+import numpy as np
+import pyarrow as pa
+
 from config.settings import (
     PONTOS_SPRINT, PONTOS_CORRIDA,
     POSICOES_SPRINT, POSICOES_CORRIDA,
     PILOTOS_SIMULADOR
 )
 from database import (
-    get_connection,
+    get_cursor,
+    read_lock,
+    write_connection,
     is_populated,
+    table_exists,
+    hash_parameters,
+    record_simulation_run,
     create_cenarios_empate_table
 )
 
@@ -26,44 +35,99 @@ from database import (
 DATA_DIR = Path(__file__).parent / 'data'
 CSV_PATH = DATA_DIR / 'cenarios_empate.csv'
 
+# Incrementar quando a regra de geração dos cenários mudar (força rebuild)
+VERSAO_SIMULADOR = 1
 
-def posicoes_validas(pos1: int, pos2: int, pos3: int) -> bool:
-    """
-    Verifica se a combinação de posições é válida.
-    Dois pilotos não podem ocupar a mesma posição pontuada.
-    Posição 99 (fora dos pontos) pode ser compartilhada.
-    """
-    posicoes = [pos1, pos2, pos3]
-    posicoes_pontuadas = [p for p in posicoes if p != 99]
-    return len(posicoes_pontuadas) == len(set(posicoes_pontuadas))
+# Colunas da tabela de cenários, na ordem do CSV
+COLUNAS = [
+    'sprint_norris', 'sprint_piastri', 'sprint_verstappen',
+    'corrida_norris', 'corrida_piastri', 'corrida_verstappen',
+    'pts_norris', 'pts_piastri', 'pts_verstappen',
+    'ganhos_norris', 'ganhos_piastri', 'ganhos_verstappen',
+    'pontos_empate', 'tipo_empate', 'pilotos_empatados'
+]
 
 
-def calcular_pontos(pontos_atuais: int, pos_sprint: int, pos_corrida: int) -> int:
-    """Calcula pontos finais somando pontos da sprint e corrida aos atuais."""
-    return pontos_atuais + PONTOS_SPRINT[pos_sprint] + PONTOS_CORRIDA[pos_corrida]
+def hash_parametros() -> str:
+    """Hash da classificação e das tabelas de pontos usadas na geração."""
+    return hash_parameters({
+        'pontos_atuais': {p: d['pontos'] for p, d in PILOTOS_SIMULADOR.items()},
+        'pontos_sprint': PONTOS_SPRINT,
+        'pontos_corrida': PONTOS_CORRIDA,
+        'posicoes_sprint': POSICOES_SPRINT,
+        'posicoes_corrida': POSICOES_CORRIDA,
+    })
 
 
-def identificar_empate(pts_norris: int, pts_piastri: int, pts_verstappen: int):
+def _grade_posicoes(posicoes: list[int]) -> np.ndarray:
     """
-    Identifica se há empate na primeira posição.
+    Gera as combinações válidas de posições dos 3 pilotos em um evento.
+
+    Mesma ordem de product(posicoes, repeat=3). Dois pilotos não podem
+    ocupar a mesma posição pontuada; 99 (fora dos pontos) pode ser
+    compartilhada.
 
     Returns:
-        Tupla (tipo_empate, pilotos_empatados) ou (None, None) se não há empate no topo.
+        Array (n, 3) com as posições de Norris, Piastri e Verstappen
     """
-    pontos = {
-        'Norris': pts_norris,
-        'Piastri': pts_piastri,
-        'Verstappen': pts_verstappen
-    }
+    grade = np.stack(np.meshgrid(posicoes, posicoes, posicoes, indexing='ij'), axis=-1)
+    grade = grade.reshape(-1, 3)
+
+    validas = np.ones(len(grade), dtype=bool)
+    for a, b in ((0, 1), (0, 2), (1, 2)):
+        validas &= (grade[:, a] != grade[:, b]) | (grade[:, a] == 99)
 
-    max_pontos = max(pontos.values())
-    lideres = [piloto for piloto, pts in pontos.items() if pts == max_pontos]
+    return grade[validas]
 
-    if len(lideres) >= 2:
-        tipo = 'triplo' if len(lideres) == 3 else 'duplo'
-        return tipo, ' & '.join(sorted(lideres))
 
-    return None, None
+def gerar_colunas_cenarios() -> dict[str, np.ndarray]:
+    """
+    Gera todos os cenários de empate como colunas NumPy.
+
+    Monta as grades de posições válidas da sprint e da corrida uma única
+    vez, soma os pontos de todas as combinações por broadcasting e mantém
+    só as linhas com empate na primeira posição.
+
+    Returns:
+        Dicionário {coluna: array}, com as colunas de COLUNAS na mesma
+        ordem de linhas de gerar_cenarios
+    """
+    pilotos = list(PILOTOS_SIMULADOR)
+    nomes = [p.capitalize() for p in pilotos]
+    atuais = np.array([PILOTOS_SIMULADOR[p]['pontos'] for p in pilotos])
+
+    sprint = _grade_posicoes(POSICOES_SPRINT)
+    corrida = _grade_posicoes(POSICOES_CORRIDA)
+    pontos_sprint = np.vectorize(PONTOS_SPRINT.get)(sprint)
+    pontos_corrida = np.vectorize(PONTOS_CORRIDA.get)(corrida)
+
+    # Todas as combinações sprint x corrida: (num_sprint * num_corrida, 3)
+    ganhos = (pontos_sprint[:, None, :] + pontos_corrida[None, :, :]).reshape(-1, 3)
+    pts = ganhos + atuais
+    pontos_empate = pts.max(axis=1)
+
+    # Empate no topo: 2 ou mais pilotos com a pontuação máxima
+    lideres = pts == pontos_empate[:, None]
+    empate = lideres.sum(axis=1) >= 2
+    linhas = np.flatnonzero(empate)
+    idx_sprint, idx_corrida = np.divmod(linhas, len(corrida))
+
+    # Rótulo dos empatados a partir da máscara de líderes (bit i = piloto i)
+    rotulos = np.array([
+        ' & '.join(sorted(n for i, n in enumerate(nomes) if codigo >> i & 1))
+        for codigo in range(2 ** len(nomes))
+    ], dtype=object)
+    codigos = lideres[linhas] @ (1 << np.arange(len(nomes)))
+
+    return {
+        **{f'sprint_{p}': sprint[idx_sprint, i] for i, p in enumerate(pilotos)},
+        **{f'corrida_{p}': corrida[idx_corrida, i] for i, p in enumerate(pilotos)},
+        **{f'pts_{p}': pts[linhas, i] for i, p in enumerate(pilotos)},
+        **{f'ganhos_{p}': ganhos[linhas, i] for i, p in enumerate(pilotos)},
+        'pontos_empate': pontos_empate[linhas],
+        'tipo_empate': np.where(lideres[linhas].all(axis=1), 'triplo', 'duplo').astype(object),
+        'pilotos_empatados': rotulos[codigos],
+    }
 
 
 def gerar_cenarios() -> list[dict]:
@@ -74,66 +138,9 @@ def gerar_cenarios() -> list[dict]:
     Returns:
         Lista de dicionários com dados de cada cenário de empate.
     """
-    cenarios = []
-    pilotos = PILOTOS_SIMULADOR
-
-    # Produto cartesiano de todas as posições possíveis para os 3 pilotos
-    # na sprint e na corrida
-    for sprint_nor, sprint_pia, sprint_ver in product(POSICOES_SPRINT, repeat=3):
-        # Validar posições da sprint
-        if not posicoes_validas(sprint_nor, sprint_pia, sprint_ver):
-            continue
-
-        for corrida_nor, corrida_pia, corrida_ver in product(POSICOES_CORRIDA, repeat=3):
-            # Validar posições da corrida
-            if not posicoes_validas(corrida_nor, corrida_pia, corrida_ver):
-                continue
-
-            # Calcular pontos finais
-            pts_norris = calcular_pontos(
-                pilotos['norris']['pontos'],
-                sprint_nor, corrida_nor
-            )
-            pts_piastri = calcular_pontos(
-                pilotos['piastri']['pontos'],
-                sprint_pia, corrida_pia
-            )
-            pts_verstappen = calcular_pontos(
-                pilotos['verstappen']['pontos'],
-                sprint_ver, corrida_ver
-            )
-
-            # Verificar empate na primeira posição
-            tipo_empate, pilotos_empatados = identificar_empate(
-                pts_norris, pts_piastri, pts_verstappen
-            )
-
-            if tipo_empate:
-                # Calcular pontos ganhos na etapa
-                ganhos_norris = PONTOS_SPRINT[sprint_nor] + PONTOS_CORRIDA[corrida_nor]
-                ganhos_piastri = PONTOS_SPRINT[sprint_pia] + PONTOS_CORRIDA[corrida_pia]
-                ganhos_verstappen = PONTOS_SPRINT[sprint_ver] + PONTOS_CORRIDA[corrida_ver]
-                pontos_empate = max(pts_norris, pts_piastri, pts_verstappen)
-
-                cenarios.append({
-                    'sprint_norris': sprint_nor,
-                    'sprint_piastri': sprint_pia,
-                    'sprint_verstappen': sprint_ver,
-                    'corrida_norris': corrida_nor,
-                    'corrida_piastri': corrida_pia,
-                    'corrida_verstappen': corrida_ver,
-                    'pts_norris': pts_norris,
-                    'pts_piastri': pts_piastri,
-                    'pts_verstappen': pts_verstappen,
-                    'ganhos_norris': ganhos_norris,
-                    'ganhos_piastri': ganhos_piastri,
-                    'ganhos_verstappen': ganhos_verstappen,
-                    'pontos_empate': pontos_empate,
-                    'tipo_empate': tipo_empate,
-                    'pilotos_empatados': pilotos_empatados
-                })
-
-    return cenarios
+    colunas = gerar_colunas_cenarios()
+    valores = [colunas[c].tolist() for c in COLUNAS]
+    return [dict(zip(COLUNAS, linha)) for linha in zip(*valores)]
 
 
 def exportar_csv(cenarios: list[dict], arquivo: Path = None) -> None:
@@ -148,13 +155,7 @@ def exportar_csv(cenarios: list[dict], arquivo: Path = None) -> None:
         print("Nenhum cenário de empate encontrado.")
         return
 
-    colunas = [
-        'sprint_norris', 'sprint_piastri', 'sprint_verstappen',
-        'corrida_norris', 'corrida_piastri', 'corrida_verstappen',
-        'pts_norris', 'pts_piastri', 'pts_verstappen',
-        'ganhos_norris', 'ganhos_piastri', 'ganhos_verstappen',
-        'pontos_empate', 'tipo_empate', 'pilotos_empatados'
-    ]
+    colunas = COLUNAS
 
     with open(arquivo, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=colunas)
@@ -165,60 +166,98 @@ def exportar_csv(cenarios: list[dict], arquivo: Path = None) -> None:
     print(f"Total de cenários: {len(cenarios)}")
 
 
-def exportar_db(cenarios: list[dict]) -> None:
+def exportar_db(
+    cenarios: list[dict] | dict[str, np.ndarray],
+    duracao_geracao: float = 0.0,
+) -> None:
     """
     Exporta os cenários para o banco de dados DuckDB.
 
+    Os cenários são entregues ao DuckDB como uma única tabela Arrow
+    registrada e inseridos com INSERT ... SELECT em uma transação, em vez
+    de linha a linha. A execução é registrada em simulation_runs na mesma
+    transação.
+
     Args:
-        cenarios: Lista de dicionários com os cenários de empate.
+        cenarios: Lista de dicionários (gerar_cenarios) ou colunas
+            (gerar_colunas_cenarios) com os cenários de empate.
+        duracao_geracao: Segundos gastos gerando os cenários, somados à
+            duração registrada
     """
-    if not cenarios:
+    inicio = time.perf_counter()
+    if isinstance(cenarios, dict):
+        tabela = pa.table({c: cenarios[c] for c in COLUNAS})
+    else:
+        tabela = pa.table({c: [cenario[c] for cenario in cenarios] for c in COLUNAS})
+
+    if tabela.num_rows == 0:
         print("Nenhum cenário de empate encontrado.")
         return
 
-    conn = get_connection()
-    create_cenarios_empate_table(conn)
-
-    # Limpar tabela antes de inserir
-    conn.execute("DELETE FROM cenarios_empate")
-
-    # Inserir em batch usando executemany
-    colunas = [
-        'sprint_norris', 'sprint_piastri', 'sprint_verstappen',
-        'corrida_norris', 'corrida_piastri', 'corrida_verstappen',
-        'pts_norris', 'pts_piastri', 'pts_verstappen',
-        'ganhos_norris', 'ganhos_piastri', 'ganhos_verstappen',
-        'pontos_empate', 'tipo_empate', 'pilotos_empatados'
-    ]
-
-    placeholders = ', '.join(['?' for _ in colunas])
-    insert_sql = f"INSERT INTO cenarios_empate ({', '.join(colunas)}) VALUES ({placeholders})"
+    with write_connection() as conn:
+        create_cenarios_empate_table(conn)
+        conn.register('lote_cenarios_empate', tabela)
 
-    # Converter lista de dicts para lista de tuplas
-    valores = [tuple(c[col] for col in colunas) for c in cenarios]
-    conn.executemany(insert_sql, valores)
+        # Limpar e inserir na mesma transação
+        conn.execute("BEGIN TRANSACTION")
+        conn.execute("DELETE FROM cenarios_empate")
+        conn.execute(f"""
+            INSERT INTO cenarios_empate ({', '.join(COLUNAS)})
+            SELECT {', '.join(COLUNAS)} FROM lote_cenarios_empate
+        """)
+        record_simulation_run(
+            conn, 'cenarios_empate', hash_parametros(), VERSAO_SIMULADOR, tabela.num_rows,
+            duracao_geracao + time.perf_counter() - inicio,
+        )
+        conn.execute("COMMIT")
 
-    conn.close()
-    print(f"Exportado para banco de dados: {len(cenarios)} cenários")
+    print(f"Exportado para banco de dados: {tabela.num_rows} cenários")
 
 
 def ensure_populated() -> None:
     """
     Garante que a tabela cenarios_empate está populada.
 
-    Se a tabela não existe ou está vazia, gera os cenários e popula o banco.
-    Deve ser chamada no início da aplicação.
+    Se a tabela não foi construída, ou foi construída com outra
+    classificação, outras tabelas de pontos ou outra VERSAO_SIMULADOR, gera
+    os cenários e popula o banco. Deve ser chamada no início da aplicação.
+    A verificação é uma consulta de uma linha em simulation_runs, com um
+    cursor somente leitura; só o build abre o arquivo para escrita.
+
+    O build precisa do arquivo só para si. Se outro processo (ex: outra
+    réplica do dashboard) o mantém aberto e a tabela já existe, segue com
+    a tabela atual, desatualizada, e avisa.
+
+    Raises:
+        RuntimeError: Se o banco está aberto por outro processo e a tabela
+            ainda não existe
     """
-    conn = get_connection()
-
-    if not is_populated(conn, 'cenarios_empate'):
-        print("Banco não populado. Gerando cenários de empate...")
-        conn.close()
-        cenarios = gerar_cenarios()
-        exportar_db(cenarios)
-        print("Cenários de empate populados com sucesso!")
-    else:
-        conn.close()
+    with read_lock():
+        cursor = get_cursor()
+        try:
+            populado = is_populated(cursor, 'cenarios_empate', hash_parametros(), VERSAO_SIMULADOR)
+            existe = table_exists(cursor, 'cenarios_empate')
+        finally:
+            cursor.close()
+
+    if populado:
+        return
+
+    print("Banco não populado ou desatualizado. Gerando cenários de empate...")
+    inicio = time.perf_counter()
+    colunas = gerar_colunas_cenarios()
+    try:
+        exportar_db(colunas, time.perf_counter() - inicio)
+    except duckdb.IOException as erro:
+        if not existe:
+            raise RuntimeError(
+                "Banco de dados aberto por outro processo; não foi possível criar "
+                "cenarios_empate. Feche os outros processos do dashboard e tente de novo."
+            ) from erro
+        print(f"Aviso: banco aberto por outro processo ({erro}); "
+              "usando a tabela cenarios_empate existente, possivelmente desatualizada.")
+        return
+    print("Cenários de empate populados com sucesso!")
 
 
 def imprimir_resumo(cenarios: list[dict]) -> None:
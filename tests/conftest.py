@@ -0,0 +1,39 @@
+"""
+Fixtures compartilhadas dos testes de Cenários de Campeão F1 2025.
+
+Rodar da raiz do repositório: python -m pytest -q
+"""
+
+from dataclasses import replace
+
+import pytest
+
+from config.settings import PONTOS_SPRINT, PONTOS_CORRIDA
+from database import connection
+from simulations.cenarios_campeao import cache
+from simulations.cenarios_campeao.simulator import CAMPEONATO, Campeonato, Evento
+
+
+@pytest.fixture
+def campeonato_reduzido() -> Campeonato:
+    """Sub-campeonato de 2 eventos (sprint top 4, corrida top 5): roda em segundos."""
+    return replace(CAMPEONATO, eventos=(
+        Evento('Sprint', [1, 2, 3, 4], PONTOS_SPRINT),
+        Evento('Corrida', [1, 2, 3, 4, 5], PONTOS_CORRIDA),
+    ))
+
+
+@pytest.fixture
+def cache_temporario(tmp_path, monkeypatch):
+    """Aponta o cache de estágios para um diretório temporário."""
+    monkeypatch.setattr(cache, 'CACHE_DIR', tmp_path / 'cache')
+    return tmp_path / 'cache'
+
+
+@pytest.fixture
+def banco_temporario(tmp_path, monkeypatch):
+    """Aponta o banco DuckDB para um arquivo temporário."""
+    monkeypatch.setattr(connection, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(connection, 'DB_PATH', tmp_path / 'f1_simulations.duckdb')
+    yield connection.DB_PATH
+    connection.close_shared_connection()
@@ -0,0 +1,58 @@
+"""Tabela cenarios_campeao: leitor Arrow e escrita no DuckDB."""
+
+import duckdb
+import numpy as np
+
+from simulations.cenarios_campeao.codec import CodecEstado
+from simulations.cenarios_campeao.simulator import (
+    HistogramaDeltas,
+    criar_tabela,
+    esquema_cenarios,
+    leitor_cenarios,
+    popular_banco,
+    popular_banco_sql,
+    simular_cenarios,
+    simular_deltas,
+)
+
+
+def _contar(cenarios, campeonato) -> int:
+    """Insere os cenários em um banco em memória e conta as linhas."""
+    conn = duckdb.connect()
+    criar_tabela(conn, campeonato.pilotos)
+    popular_banco(conn, cenarios)
+    return conn.execute("SELECT COUNT(*) FROM cenarios_campeao").fetchone()[0]
+
+
+def test_leitor_sem_estados(campeonato_reduzido):
+    vazio = np.empty(0, dtype=np.int64)
+    histograma = HistogramaDeltas(vazio, vazio, CodecEstado(np.full(12, 40)),
+                                  campeonato_reduzido.pilotos)
+
+    leitor = leitor_cenarios(histograma, campeonato_reduzido)
+    assert leitor.schema == esquema_cenarios(campeonato_reduzido.pilotos)
+    assert _contar(leitor, campeonato_reduzido) == 0
+
+
+def test_leitor_com_esquema_da_tabela(campeonato_reduzido):
+    histograma = simular_deltas(campeonato=campeonato_reduzido, usar_cache=False)
+
+    leitor = leitor_cenarios(histograma, campeonato_reduzido)
+    assert _contar(leitor, campeonato_reduzido) == len(histograma)
+
+
+def test_sql_igual_ao_python(campeonato_reduzido):
+    pilotos = campeonato_reduzido.pilotos
+    conn = duckdb.connect()
+    criar_tabela(conn, pilotos)
+    popular_banco_sql(conn, campeonato_reduzido)
+    criar_tabela(conn, pilotos, tabela='cenarios_python')
+    popular_banco(conn, simular_cenarios(campeonato=campeonato_reduzido, usar_cache=False),
+                  tabela='cenarios_python')
+
+    sql, python = (
+        conn.execute(f"SELECT * FROM {tabela} ORDER BY ALL").fetchall()
+        for tabela in ('cenarios_campeao', 'cenarios_python')
+    )
+    assert len(sql) > 0
+    assert sql == python
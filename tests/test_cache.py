@@ -0,0 +1,65 @@
+"""Cache em disco dos estágios de convolução."""
+
+from dataclasses import replace
+
+import numpy as np
+
+from simulations.cenarios_campeao.cache import (
+    carregar_maior_prefixo,
+    hashes_prefixos,
+    salvar_estagio,
+)
+from simulations.cenarios_campeao.codec import CodecEstado
+from simulations.cenarios_campeao.simulator import reavaliar_campeao, simular_deltas
+
+
+def test_maior_prefixo_vazio(campeonato_reduzido, cache_temporario):
+    hashes = hashes_prefixos(campeonato_reduzido.eventos, campeonato_reduzido.pilotos)
+    codec = CodecEstado(np.full(12, 40))
+
+    assert carregar_maior_prefixo(hashes, codec) == (0, None)
+
+
+def test_maior_prefixo_ida_e_volta(campeonato_reduzido, cache_temporario):
+    histograma = simular_deltas(campeonato=campeonato_reduzido, usar_cache=False)
+    hashes = hashes_prefixos(campeonato_reduzido.eventos, campeonato_reduzido.pilotos)
+    salvar_estagio(hashes[-1], histograma.chaves, histograma.contagens, histograma.codec)
+
+    # Um evento a mais: o maior prefixo em cache é o de 2 eventos, com o mesmo codec
+    k, (chaves, contagens) = carregar_maior_prefixo(hashes + ['ausente'], histograma.codec)
+    assert k == 2
+    np.testing.assert_array_equal(chaves, histograma.chaves)
+    np.testing.assert_array_equal(contagens, histograma.contagens)
+
+    # Codec maior (mais eventos): os estados são recodificados
+    codec = CodecEstado(histograma.codec.maximos * 2)
+    k, (chaves, contagens) = carregar_maior_prefixo(hashes, codec)
+    assert k == 2
+    np.testing.assert_array_equal(
+        codec.decodificar(chaves), histograma.codec.decodificar(histograma.chaves)
+    )
+    np.testing.assert_array_equal(contagens, histograma.contagens)
+
+
+def test_simulacao_com_cache_igual_sem_cache(campeonato_reduzido, cache_temporario):
+    sem_cache = simular_deltas(campeonato=campeonato_reduzido, usar_cache=False)
+    primeira = simular_deltas(campeonato=campeonato_reduzido)
+    assert any(cache_temporario.glob('*.npz'))
+    segunda = simular_deltas(campeonato=campeonato_reduzido)
+
+    for histograma in (primeira, segunda):
+        np.testing.assert_array_equal(histograma.chaves, sem_cache.chaves)
+        np.testing.assert_array_equal(histograma.contagens, sem_cache.contagens)
+
+
+def test_reducao_identificada_pelo_conteudo(campeonato_reduzido, cache_temporario):
+    histograma = simular_deltas(campeonato=campeonato_reduzido)
+    esperado = reavaliar_campeao(histograma)
+    assert len(list(cache_temporario.glob('*.pontos.npz'))) == 1
+
+    # Mesmos estados em outra ordem: a redução salva não vale para eles
+    ordem = np.argsort(histograma.chaves)[::-1]
+    invertido = replace(histograma, chaves=histograma.chaves[ordem],
+                        contagens=histograma.contagens[ordem])
+    assert reavaliar_campeao(invertido) == esperado
+    assert len(list(cache_temporario.glob('*.pontos.npz'))) == 2
@@ -0,0 +1,84 @@
+"""Condições de título contra a enumeração completa dos resultados."""
+
+from dataclasses import replace
+from itertools import product
+
+import numpy as np
+import pytest
+
+from config.settings import PONTOS_SPRINT, PONTOS_CORRIDA
+from simulations.cenarios_campeao.condicoes import resolver_piloto
+from simulations.cenarios_campeao.simulator import (
+    FORA_PONTOS,
+    Evento,
+    determinar_campeoes,
+)
+
+
+def _resultados(campeonato) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Todos os resultados dos eventos restantes.
+
+    Returns:
+        (posicoes, campeoes, ganhos): posições (n, eventos, pilotos), índice
+        do campeão e pontos ganhos (n, pilotos) de cada resultado
+    """
+    num_pilotos = len(campeonato.pilotos)
+    por_evento = []
+    for evento in campeonato.eventos:
+        opcoes = list(evento.posicoes) + [FORA_PONTOS]
+        por_evento.append(np.array([
+            p for p in product(opcoes, repeat=num_pilotos)
+            if len({x for x in p if x != FORA_PONTOS}) == sum(x != FORA_PONTOS for x in p)
+        ]))
+
+    indices = np.stack(np.meshgrid(*[np.arange(len(e)) for e in por_evento], indexing='ij'), -1)
+    indices = indices.reshape(-1, len(por_evento))
+    posicoes = np.stack([e[indices[:, k]] for k, e in enumerate(por_evento)], axis=1)
+
+    finais = np.repeat(campeonato.classificacao()[None], len(posicoes), axis=0)
+    for k, evento in enumerate(campeonato.eventos):
+        pos = posicoes[:, k]
+        pontos = np.array([evento.tabela_pontos.get(p, 0) for p in range(FORA_PONTOS + 1)])
+        finais[..., 0] += pontos[pos]
+        finais[..., 1] += pos == 1
+        finais[..., 2] += pos == 2
+        finais[..., 3] += pos == 3
+    campeoes, _ = determinar_campeoes(finais, campeonato.pilotos)
+    return posicoes, campeoes, finais[..., 0] - campeonato.classificacao()[:, 0]
+
+
+@pytest.fixture(params=['padrao', 'apertado'])
+def campeonato(request, campeonato_reduzido):
+    if request.param == 'padrao':
+        return campeonato_reduzido
+    # Três eventos e classificação próxima: rivais dependem das posições do piloto
+    return replace(
+        campeonato_reduzido,
+        eventos=(
+            Evento('Sprint', [1, 2, 3], PONTOS_SPRINT),
+            Evento('Corrida 1', [1, 2, 3, 4], PONTOS_CORRIDA),
+            Evento('Corrida 2', [1, 2, 3, 4], PONTOS_CORRIDA),
+        ),
+        pontos={'norris': 50, 'piastri': 40, 'verstappen': 38},
+    )
+
+
+@pytest.mark.parametrize('com_rivais', [True, False])
+def test_condicoes_garantem_o_titulo(campeonato, com_rivais):
+    posicoes, campeoes, ganhos = _resultados(campeonato)
+    pilotos = campeonato.pilotos
+
+    for indice, piloto in enumerate(pilotos):
+        for agrupar in (True, False):
+            condicoes = resolver_piloto(piloto, campeonato, com_rivais, agrupar)
+            for condicao in condicoes:
+                atende = np.ones(len(posicoes), dtype=bool)
+                for k, (_, maxima) in enumerate(condicao.posicoes):
+                    if maxima is not None:
+                        atende &= posicoes[:, k, indice] <= maxima
+                for rival, limite in condicao.limites_rivais:
+                    atende &= ganhos[:, pilotos.index(rival)] <= limite
+
+                assert atende.any(), condicao.descrever()
+                assert (campeoes[atende] == indice).all(), condicao.descrever()
@@ -0,0 +1,90 @@
+"""Conexão compartilhada: consultas x build no mesmo processo e entre processos."""
+
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from database import read_lock, session_cursor, write_connection
+from simulations.cenarios_empate import simulator as empate
+
+
+@pytest.fixture
+def outro_processo(banco_temporario):
+    """Outro processo com o banco aberto em modo somente leitura."""
+    def abrir():
+        processo = subprocess.Popen(
+            [sys.executable, '-c',
+             'import duckdb, sys, time; c = duckdb.connect(sys.argv[1], read_only=True); '
+             'print(flush=True); time.sleep(60)',
+             str(banco_temporario)],
+            stdout=subprocess.PIPE,
+        )
+        processo.stdout.readline()
+        processos.append(processo)
+
+    processos = []
+    yield abrir
+    for processo in processos:
+        processo.kill()
+        processo.wait()
+
+
+def test_escrita_espera_consultas(banco_temporario):
+    with write_connection() as conn:
+        conn.execute("CREATE TABLE t AS SELECT range AS x FROM range(1000)")
+
+    estado = {}
+    escreveu = threading.Event()
+
+    def escrever():
+        with write_connection() as conn:
+            conn.execute("INSERT INTO t VALUES (-1)")
+        escreveu.set()
+
+    with read_lock():
+        cursor = session_cursor(estado)
+        cursor.execute("SELECT SUM(x) FROM t")
+        escritor = threading.Thread(target=escrever)
+        escritor.start()
+
+        # A escrita espera a consulta; o cursor continua aberto
+        assert not escreveu.wait(0.2)
+        assert cursor.fetchone()[0] == 499500
+
+    escritor.join(10)
+    assert escreveu.is_set()
+    with read_lock():
+        assert session_cursor(estado).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1001
+
+
+def test_escrita_dentro_de_leitura(banco_temporario):
+    with read_lock(), pytest.raises(RuntimeError):
+        with write_connection():
+            pass
+
+
+def test_banco_aberto_por_outro_processo_sem_tabela(outro_processo):
+    with write_connection():
+        pass
+    outro_processo()
+
+    with pytest.raises(RuntimeError, match='outro processo'):
+        empate.ensure_populated()
+
+
+def test_banco_aberto_por_outro_processo_com_tabela(outro_processo, capsys):
+    empate.ensure_populated()
+    with write_connection() as conn:
+        conn.execute("UPDATE simulation_runs SET hash_parametros = 'antigo'")
+        total = conn.execute("SELECT COUNT(*) FROM cenarios_empate").fetchone()[0]
+    outro_processo()
+
+    # Segue com a tabela existente, desatualizada
+    empate.ensure_populated()
+    assert 'Aviso: banco aberto por outro processo' in capsys.readouterr().out
+    with read_lock():
+        assert session_cursor({}).execute(
+            "SELECT COUNT(*) FROM cenarios_empate"
+        ).fetchone()[0] == total
@@ -0,0 +1,45 @@
+"""Desempate vetorizado (determinar_campeoes) contra a regra escalar original."""
+
+import numpy as np
+import pytest
+
+from simulations.cenarios_campeao.simulator import METODOS, determinar_campeoes
+
+
+def desempate_escalar(finais: np.ndarray, pilotos: tuple[str, ...]) -> tuple[str, str]:
+    """Regra original: ordena (pontos, vitórias, 2º, 3º, nome) e compara 1º com 2º."""
+    stats = sorted(
+        (tuple(int(v) for v in finais[i]) + (pilotos[i],) for i in range(len(pilotos))),
+        reverse=True,
+    )
+    primeiro, segundo = stats[0], stats[1]
+    for criterio, metodo in enumerate(METODOS[:-1]):
+        if primeiro[criterio] > segundo[criterio]:
+            return primeiro[-1], metodo
+    return primeiro[-1], METODOS[-1]
+
+
+@pytest.mark.parametrize('pilotos', [
+    ('norris', 'piastri', 'verstappen'),
+    ('verstappen', 'norris'),
+    ('russell', 'leclerc', 'norris', 'piastri', 'verstappen'),
+])
+def test_desempate_igual_ao_escalar(pilotos):
+    # Valores pequenos forçam empates em todos os critérios
+    rng = np.random.default_rng(2025)
+    finais = rng.integers(0, 3, size=(5000, len(pilotos), 4))
+    finais[:, :, 0] += 400
+
+    campeoes, metodos = determinar_campeoes(finais, pilotos)
+
+    esperados = [desempate_escalar(f, pilotos) for f in finais]
+    assert [(pilotos[c], METODOS[m]) for c, m in zip(campeoes, metodos)] == esperados
+    assert set(METODOS) == {m for _, m in esperados}
+
+
+def test_empate_total_vence_maior_nome():
+    finais = np.array([[[400, 7, 5, 3]] * 3])
+    campeoes, metodos = determinar_campeoes(finais, ('piastri', 'verstappen', 'norris'))
+
+    assert campeoes[0] == 1
+    assert METODOS[metodos[0]] == 'empate_total'
@@ -0,0 +1,33 @@
+"""Exportação dos cenários de empate para o DuckDB."""
+
+import duckdb
+
+from database import create_cenarios_empate_table, write_connection
+from simulations.cenarios_empate.simulator import (
+    COLUNAS,
+    exportar_db,
+    gerar_cenarios,
+    gerar_colunas_cenarios,
+)
+
+CONSULTA = f"SELECT {', '.join(COLUNAS)} FROM cenarios_empate ORDER BY ALL"
+
+
+def test_exportar_db_igual_a_insercao_linha_a_linha(banco_temporario):
+    cenarios = gerar_cenarios()
+
+    # Referência: o caminho antigo, uma linha por vez com executemany
+    referencia = duckdb.connect()
+    create_cenarios_empate_table(referencia)
+    referencia.executemany(
+        f"INSERT INTO cenarios_empate ({', '.join(COLUNAS)}) "
+        f"VALUES ({', '.join('?' * len(COLUNAS))})",
+        [[c[coluna] for coluna in COLUNAS] for c in cenarios],
+    )
+    esperado = referencia.execute(CONSULTA).fetchall()
+
+    # Tabela Arrow montada dos dicionários e direto das colunas NumPy
+    for origem in (cenarios, gerar_colunas_cenarios()):
+        exportar_db(origem)
+        with write_connection() as conn:
+            assert conn.execute(CONSULTA).fetchall() == esperado
@@ -0,0 +1,57 @@
+"""Equivalência dos motores de convolução em um sub-campeonato."""
+
+import numpy as np
+import pytest
+
+from simulations.cenarios_campeao.convolucao_fft import densidade
+from simulations.cenarios_campeao.simulator import (
+    MOTOR_AUTOMATICO,
+    MOTORES,
+    escolher_motor,
+    gerar_deltas,
+    simular_deltas,
+)
+
+
+def _histograma(campeonato, **opcoes) -> tuple[np.ndarray, np.ndarray]:
+    """(chaves, contagens) ordenados por chave."""
+    histograma = simular_deltas(campeonato=campeonato, usar_cache=False, **opcoes)
+    ordem = np.argsort(histograma.chaves)
+    return histograma.chaves[ordem], histograma.contagens[ordem]
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+def test_paralelo_igual_ao_serial(campeonato_reduzido, motor):
+    chaves, contagens = _histograma(campeonato_reduzido, motor=motor, trabalhadores=1)
+    chaves_p, contagens_p = _histograma(campeonato_reduzido, motor=motor, trabalhadores=2)
+
+    np.testing.assert_array_equal(chaves_p, chaves)
+    np.testing.assert_array_equal(contagens_p, contagens)
+
+    # Todas as combinações brutas dos dois eventos
+    pilotos = len(campeonato_reduzido.pilotos)
+    assert contagens.sum() == np.prod([len(gerar_deltas(e, pilotos))
+                                       for e in campeonato_reduzido.eventos])
+
+
+@pytest.mark.parametrize('motor', [m for m in MOTORES if m != 'numpy'] + [MOTOR_AUTOMATICO])
+def test_motores_iguais_ao_numpy(campeonato_reduzido, motor):
+    chaves, contagens = _histograma(campeonato_reduzido, motor='numpy')
+    chaves_m, contagens_m = _histograma(campeonato_reduzido, motor=motor)
+
+    np.testing.assert_array_equal(chaves_m, chaves)
+    np.testing.assert_array_equal(contagens_m, contagens)
+
+
+def test_fft_so_com_cubos_densos(campeonato_reduzido):
+    pilotos = len(campeonato_reduzido.pilotos)
+    deltas = [gerar_deltas(e, pilotos) for e in campeonato_reduzido.eventos]
+    colunas_pontos = list(range(0, 4 * pilotos, 4))
+
+    # Antes do último evento só há os deltas da sprint: bem menos que as células
+    assert densidade(deltas, colunas_pontos) < 1
+    assert densidade(deltas[:1], colunas_pontos) == 0
+    assert escolher_motor(campeonato_reduzido, deltas) == 'numpy'
+
+    # Muitos eventos enchem os cubos de pontos
+    assert escolher_motor(campeonato_reduzido, [deltas[0]] * 8) == 'fft'